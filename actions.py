@@ -0,0 +1,173 @@
+"""
+Tool calls in the LLM's reply, detected while the reply is still streaming.
+
+The system prompt asks for `ACTION: <tool> | <argument>` lines. Models also
+sometimes answer with a JSON call such as {"tool": "open_app", "arg": "chrome"}.
+Previously the reply was only parsed after it had fully streamed, so the
+ACTION line was shown, and in voice_jarvis spoken, before the tool ran.
+
+Only calls to a tool in agent.TOOLS count; anything else, such as a JSON
+object with a "name" key in an ordinary answer, is released as text.
+
+ActionStream looks at the start of every line. It holds back only as many
+characters as are needed to rule out "ACTION:" or "{", so normal text is
+forwarded without delay while action lines are swallowed. Each complete call
+is available from `pop()` right away, so it can be dispatched before the
+model has finished. Consecutive action lines are all collected. Once a
+non-action line follows them, `done` is set and the caller should stop the
+generation: anything after the calls is the explanation the prompt tells the
+model not to give.
+"""
+
+import json
+from dataclasses import dataclass
+
+from agent import TOOLS
+
+PREFIX = "ACTION:"
+
+
+@dataclass
+class ActionCall:
+    tool: str
+    arg: str
+
+
+def parse_action(text: str) -> ActionCall | None:
+    """Parse one `ACTION: tool | arg` line or a JSON tool call object naming a known tool."""
+    text = text.strip()
+    if text.startswith(PREFIX):
+        tool, sep, arg = text[len(PREFIX):].partition("|")
+        if tool.strip() in TOOLS:
+            return ActionCall(tool.strip(), arg.strip() if sep else "")
+        return None
+
+    if text.startswith("{"):
+        try:
+            obj = json.loads(text)
+        except ValueError:
+            return None
+        if not isinstance(obj, dict):
+            return None
+        tool = obj.get("tool") or obj.get("name")
+        arg = obj.get("arg", obj.get("argument", obj.get("arguments", obj.get("input", ""))))
+        if isinstance(arg, dict):
+            # {"name": "search_google", "arguments": {"query": "…"}}: single-argument tools
+            arg = next(iter(arg.values()), "") if len(arg) == 1 else json.dumps(arg)
+        if isinstance(tool, str) and tool in TOOLS:
+            return ActionCall(tool, "" if arg is None else str(arg))
+    return None
+
+
+class ActionStream:
+    def __init__(self):
+        self.calls = []         # every call seen so far
+        self.done = False       # an action block has ended; stop generating
+        self._pending = []      # calls not yet returned by pop()
+        self._mode = "start"    # start | text | action | json
+        self._line = ""         # held-back characters of the current line
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+
+    def pop(self) -> list[ActionCall]:
+        """Calls completed since the last pop, ready to dispatch."""
+        calls, self._pending = self._pending, []
+        return calls
+
+    def _complete(self, text: str) -> bool:
+        call = parse_action(text)
+        if call is None:
+            return False
+        self.calls.append(call)
+        self._pending.append(call)
+        return True
+
+    def feed(self, token: str) -> str:
+        """Consume a token; returns the part that is ordinary reply text."""
+        out = []
+        for ch in token:
+            if self.done:
+                break
+            if self._mode == "text":
+                out.append(ch)
+                if ch == "\n":
+                    self._mode = "start"
+                continue
+
+            self._line += ch
+            if self._mode == "start":
+                self._decide(out)
+            elif self._mode == "action":
+                if ch == "\n":
+                    if self._complete(self._line):
+                        self._line, self._mode = "", "start"
+                    elif self.calls:
+                        self.done = True
+                    else:
+                        # Not a known tool: the line was ordinary text after all
+                        out.append(self._line)
+                        self._line, self._mode = "", "start"
+            elif self._mode == "json":
+                self._scan_json(ch, out)
+        return "".join(out)
+
+    def _decide(self, out):
+        head = self._line.lstrip()
+        if not head:
+            if self._line.endswith("\n") and not self.calls:
+                out.append(self._line)
+                self._line = ""
+            return
+        if head.startswith(PREFIX):
+            self._mode = "action"
+        elif head[0] == "{":
+            self._mode, self._depth = "json", 0
+            self._in_string = self._escaped = False
+            for c in head:
+                self._track(c)
+        elif PREFIX.startswith(head):
+            return  # could still become "ACTION:"
+        elif self.calls:
+            self.done = True
+        else:
+            out.append(self._line)
+            self._line, self._mode = "", "text"
+            if out[-1].endswith("\n"):
+                self._mode = "start"
+
+    def _track(self, c):
+        if self._in_string:
+            if self._escaped:
+                self._escaped = False
+            elif c == "\\":
+                self._escaped = True
+            elif c == '"':
+                self._in_string = False
+        elif c == '"':
+            self._in_string = True
+        elif c == "{":
+            self._depth += 1
+        elif c == "}":
+            self._depth -= 1
+
+    def _scan_json(self, ch, out):
+        self._track(ch)
+        if self._depth > 0:
+            return
+        if self._complete(self._line):
+            self._line, self._mode = "", "start"
+        elif self.calls:
+            self.done = True
+        else:
+            out.append(self._line)
+            self._line, self._mode = "", "text"
+
+    def flush(self) -> str:
+        """End of the stream: finish a trailing call, or release held-back text."""
+        line, self._line = self._line, ""
+        if self.done or not line.strip():
+            return "" if self.calls else line
+        if self._mode in ("action", "json") and self._complete(line):
+            return ""
+        return "" if self.calls else line
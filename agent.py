@@ -1,18 +1,155 @@
+"""
+Tool dispatcher.
+
+Every tool call goes through one ToolRuntime:
+  - a bounded worker pool (TOOL_WORKERS), so tool calls never run on the
+    event loop and a burst of them can't spawn unbounded threads
+  - a per-tool timeout; the caller gets a "timed out" result and moves on
+    (run_command additionally kills the command itself)
+  - streaming: tools that accept `on_output` report output as it arrives
+  - opt-in TTL caching for idempotent tools
+
+`execute_tool` is the blocking entry point (voice_jarvis, intents.try_tools);
+`run_tool` is the async one used by app.py.
+"""
+
+import asyncio
+import inspect
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from dataclasses import dataclass
+
+from config import TOOL_WORKERS, TOOL_TIMEOUT_S, COMMAND_TIMEOUT_S
 from tools import open_app, get_time, search_google, run_command
 
+
+@dataclass
+class ToolSpec:
+    func: callable
+    timeout: float = TOOL_TIMEOUT_S
+    cache_ttl: float = 0.0      # > 0: results are reused for this many seconds
+
+    @property
+    def streams(self) -> bool:
+        return "on_output" in inspect.signature(self.func).parameters
+
+
 TOOLS = {
-    "open_app": open_app,
-    "get_time": lambda x: get_time(),
-    "search_google": search_google,
-    "run_command": run_command,
+    "open_app": ToolSpec(open_app, timeout=5.0),
+    "get_time": ToolSpec(lambda x: get_time(), timeout=1.0, cache_ttl=1.0),
+    "search_google": ToolSpec(search_google, timeout=5.0),
+    # run_command enforces its own timeout on the process; the margin covers cleanup
+    "run_command": ToolSpec(run_command, timeout=COMMAND_TIMEOUT_S + 2.0),
 }
 
 
-def execute_tool(tool, arg):
-    if tool not in TOOLS:
-        return "Unknown tool"
+class ToolRuntime:
+    def __init__(self, tools=TOOLS, max_workers: int = TOOL_WORKERS):
+        self.tools = tools
+        self.max_workers = max_workers
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tool")
+        self._cache = {}            # (tool, arg) -> (expires_at, result)
+        self._lock = threading.Lock()
+        self.active = 0
+        self.peak = 0
+        self.cache_hits = 0
+        self.timeouts = 0
+
+    def _cached(self, tool, arg):
+        with self._lock:
+            entry = self._cache.get((tool, arg))
+            if entry and entry[0] > time.monotonic():
+                self.cache_hits += 1
+                return entry[1]
+            return None
+
+    def _run(self, spec: ToolSpec, tool, arg, on_output):
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            if spec.streams:
+                result = spec.func(arg, on_output=on_output)
+            else:
+                result = spec.func(arg)
+        except Exception as e:
+            return str(e)
+        finally:
+            with self._lock:
+                self.active -= 1
+
+        if spec.cache_ttl > 0:
+            with self._lock:
+                self._cache[(tool, arg)] = (time.monotonic() + spec.cache_ttl, result)
+        return result
+
+    def _submit(self, tool, arg, on_output):
+        """Returns (spec, cached result or None, future or None)."""
+        spec = self.tools.get(tool)
+        if spec is None:
+            return None, "Unknown tool", None
+        if spec.cache_ttl > 0:
+            cached = self._cached(tool, arg)
+            if cached is not None:
+                return spec, cached, None
+        return spec, None, self._pool.submit(self._run, spec, tool, arg, on_output)
+
+    def _timed_out(self, tool, spec):
+        self.timeouts += 1
+        print(f"⏱️  Tool {tool} timed out after {spec.timeout:g}s")
+        return f"{tool} timed out after {spec.timeout:g}s"
+
+    def execute(self, tool, arg, on_output=None):
+        spec, result, fut = self._submit(tool, arg, on_output)
+        if fut is None:
+            return result
+        try:
+            return fut.result(timeout=spec.timeout)
+        except FutureTimeout:
+            return self._timed_out(tool, spec)
+
+    async def run(self, tool, arg, on_output=None):
+        """Async execute; `on_output(text)` is called on the event loop."""
+        if on_output is not None:
+            loop = asyncio.get_running_loop()
+            callback = on_output
+            on_output = lambda text: loop.call_soon_threadsafe(callback, text)
+
+        spec, result, fut = self._submit(tool, arg, on_output)
+        if fut is None:
+            return result
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(fut), spec.timeout)
+        except asyncio.TimeoutError:
+            return self._timed_out(tool, spec)
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.max_workers,
+            "active": self.active,
+            "peak": self.peak,
+            "cache_hits": self.cache_hits,
+            "timeouts": self.timeouts,
+        }
+
+
+_runtime = None
+_runtime_lock = threading.Lock()
+
+
+def get_runtime() -> ToolRuntime:
+    global _runtime
+    if _runtime is None:
+        with _runtime_lock:
+            if _runtime is None:
+                _runtime = ToolRuntime()
+    return _runtime
+
+
+def execute_tool(tool, arg, on_output=None):
+    return get_runtime().execute(tool, arg, on_output)
+
 
-    try:
-        return TOOLS[tool](arg)
-    except Exception as e:
-        return str(e)
\ No newline at end of file
+async def run_tool(tool, arg, on_output=None):
+    return await get_runtime().run(tool, arg, on_output)
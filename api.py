@@ -1,6 +1,6 @@
 from fastapi import FastAPI
 from pydantic import BaseModel
-import ollama
+from llm import get_session
 
 app = FastAPI()
 
@@ -14,12 +14,9 @@ class Query(BaseModel):
 @app.post("/chat")
 def chat(query: Query):
     try:
-        response = ollama.chat(
-            model=MODEL,
-            messages=[{"role": "user", "content": query.message}]
-        )
+        reply = get_session(MODEL).chat([{"role": "user", "content": query.message}])
 
-        return {"reply": response["message"]["content"]}
+        return {"reply": reply}
 
     except Exception as e:
         return {"error": str(e)}
\ No newline at end of file
@@ -5,45 +5,62 @@ A native desktop window will open automatically.
 Voice recording happens on the Python side (sounddevice), not in the browser.
 """
 
+import io
 import os
+import re
 import json
-import base64
 import asyncio
-import subprocess
-import tempfile
 import threading
 import time
+import wave
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import aclosing
 
 import uvicorn
-import sounddevice as sd
 import numpy as np
-import scipy.io.wavfile as wav
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
-
-import ollama
-from faster_whisper import WhisperModel
-from memory import store_memory, recall_memory
-from tools import open_app, get_time, search_google, run_command
-from agent import execute_tool
-from knowledge.rag import search_knowledge
+from fastapi.responses import FileResponse, PlainTextResponse
+
+import tracing
+from tracing import TurnTrace, metrics, profiler
+from memory import store_memory
+from agent import run_tool
+from actions import ActionStream
+from intents import route_intent
+from knowledge.rag import index_knowledge
+from retrieval import retrieve, RetrievedContext
+from response_cache import get_response_cache
+from startup import startup
+from llm import get_session
+from embeddings import get_embedder
+from sessions import ClientSession, SessionRegistry, GenerationScheduler
+from config import BARGE_IN_ENABLED, BARGE_IN_MIN_SPEECH_MS, BARGE_IN_DURING_PLAYBACK, CANCEL_TIMEOUT_S
+from tts import get_engine
+from audio_protocol import AudioStream
+from speech_pipeline import AsyncSpeechPipeline
+from audio_capture import MicrophoneListener
+from stt import StreamingTranscriber, get_stt, read_clip
 
 # ─── Config ──────────────────────────────────────────────────────────────
 MODEL_NAME = "llama3:latest"
 VOICE_MODEL = "voices/en_US-lessac-medium.onnx"
 SAMPLE_RATE = 16000
-RECORD_DURATION = 4  # seconds, same as voice_jarvis.py
 
-# ─── Lazy-load Whisper ───────────────────────────────────────────────────
-_whisper = None
+def warm_llm():
+    if not get_session(MODEL_NAME).warm(SYSTEM_PROMPT):
+        raise RuntimeError("Ollama did not answer the warmup request")
+
 
-def get_whisper():
-    global _whisper
-    if _whisper is None:
-        print("⏳ Loading Whisper model …")
-        _whisper = WhisperModel("base", compute_type="int8")
-    return _whisper
+def load_models_in_background():
+    """Start loading every model in parallel (see startup.py)."""
+    startup.add("llm", warm_llm)
+    startup.add("embedder", lambda: get_embedder().load())
+    startup.add("whisper", lambda: get_stt().load())
+    startup.add("tts", lambda: get_engine().load(VOICE_MODEL))
+    # Bring the knowledge index up to date (only new/changed files are embedded)
+    startup.add("knowledge", lambda: print(f"📚 Knowledge index: {index_knowledge()}"), after=("embedder",))
+    startup.start()
 
 # ─── System Prompt ───────────────────────────────────────────────────────
 SYSTEM_PROMPT = """
@@ -80,201 +97,435 @@ async def root():
     return FileResponse("static/index.html")
 
 
+# ─── Metrics + profiler ─────────────────────────────────────────────────
+@app.get("/metrics")
+async def metrics_endpoint():
+    """Per-stage latency histograms and live load, in Prometheus text format."""
+    gauges = (
+        "# TYPE jarvis_sessions gauge\n"
+        f"jarvis_sessions {len(sessions)}\n"
+        "# TYPE jarvis_generations_active gauge\n"
+        f"jarvis_generations_active {scheduler.active}\n"
+        "# TYPE jarvis_generations_waiting gauge\n"
+        f"jarvis_generations_waiting {scheduler.waiting()}\n"
+    )
+    cache = get_response_cache().stats()
+    gauges += (
+        "# TYPE jarvis_response_cache_hits_total counter\n"
+        f"jarvis_response_cache_hits_total {cache['hits']}\n"
+        "# TYPE jarvis_response_cache_misses_total counter\n"
+        f"jarvis_response_cache_misses_total {cache['misses']}\n"
+        "# TYPE jarvis_response_cache_saved_seconds_total counter\n"
+        f"jarvis_response_cache_saved_seconds_total {cache['saved_seconds']}\n"
+        "# TYPE jarvis_response_cache_entries gauge\n"
+        f"jarvis_response_cache_entries {cache['entries']}\n"
+    )
+    return PlainTextResponse(metrics.render() + gauges, media_type="text/plain; version=0.0.4")
+
+
+@app.get("/cache")
+async def cache_endpoint():
+    """Response cache hit rate and the latency its hits saved."""
+    return get_response_cache().stats()
+
+
+@app.get("/readiness")
+async def readiness_endpoint():
+    """Which models have loaded and which features (text, context, voice) are usable."""
+    return startup.snapshot()
+
+
+@app.post("/debug/profile")
+async def profile_endpoint(enabled: bool | None = None):
+    """Switch the sampling profiler on/off (toggle if `enabled` is omitted); stopping returns the hottest frames."""
+    if enabled is None:
+        return await asyncio.to_thread(profiler.toggle)
+    if enabled:
+        profiler.start()
+        return {"running": True}
+    return await asyncio.to_thread(profiler.stop)
+
+
+# ─── Transcription ──────────────────────────────────────────────────────
+@app.post("/transcribe")
+async def transcribe_endpoint(request: Request):
+    """Transcribe a 16 kHz 16-bit mono WAV body; uploads that arrive together are decoded as one batch."""
+    if not startup.ready("whisper"):
+        raise HTTPException(503, "Whisper is still loading")
+    try:
+        audio = read_clip(io.BytesIO(await request.body()))
+    except (ValueError, EOFError, wave.Error) as e:
+        raise HTTPException(400, f"Expected a 16 kHz 16-bit WAV: {e or 'not a WAV file'}")
+    return {"text": await asyncio.wrap_future(get_stt().submit(audio))}
+
+
 # ─── Helper: TTS ────────────────────────────────────────────────────────
-def generate_tts(text: str) -> str | None:
-    """Run Piper TTS and return base64-encoded WAV, or None on failure."""
+# Audio goes to the frontend as binary PCM frames tagged with the turn id
+# (see audio_protocol.py), so playback starts on the first frame and the
+# client can drop audio from a turn that was cancelled.
+async def send_audio(session: ClientSession, stream: AudioStream, synth):
+    """Stream one synthesized clip to the frontend as binary PCM frames."""
+    tracing.record("tts", synth.seconds)
+    tracing.mark("first_audio")
+    for frame in stream.frames(synth.pcm, synth.sample_rate):
+        await session.send_bytes(frame)
+
+
+async def speak(session: ClientSession, stream: AudioStream, text: str):
+    """Synthesize `text` with the resident Piper engine and stream it; failures are logged."""
+    if not text or not text.strip():
+        return
     try:
-        out_path = tempfile.NamedTemporaryFile(suffix=".wav", delete=False).name
-        subprocess.run(
-            ["python", "-m", "piper", "--model", VOICE_MODEL, "--output-file", out_path],
-            input=text.encode(),
-            check=True,
-            capture_output=True,
-        )
-        with open(out_path, "rb") as f:
-            audio_b64 = base64.b64encode(f.read()).decode()
-        os.unlink(out_path)
-        return audio_b64
+        synth = await asyncio.to_thread(get_engine().synthesize, text, VOICE_MODEL)
     except Exception as e:
         print(f"TTS error: {e}")
-        return None
+        return
+    await send_audio(session, stream, synth)
+
+
+# ─── Helper: replay a cached answer ─────────────────────────────────────
+async def replay(session: ClientSession, turn_id: int, stream: AudioStream, cached):
+    """Send a cached reply as one token, then its stored audio (synthesized now if there is none)."""
+    cache = get_response_cache()
+    start = time.perf_counter()
+    await session.send({"type": "stream_start", "turn": turn_id, "cached": True})
+    tracing.mark("first_token")
+    await session.send({"type": "token", "text": cached.reply})
+    await session.send({"type": "stream_end"})
+    synth = await asyncio.to_thread(cache.synthesis, cached)
+    if synth is not None:
+        await send_audio(session, stream, synth)
+    else:
+        await speak(session, stream, cached.reply)
+    await session.send_bytes(stream.end())
+    cache.replayed(cached, time.perf_counter() - start)
+    print(f"💬 Cached reply replayed in {time.perf_counter() - start:.2f}s (took {cached.seconds:.2f}s to generate)")
 
 
-# ─── Helper: parse ACTION ───────────────────────────────────────────────
-def parse_action(text: str):
-    if not text.startswith("ACTION:"):
-        return None, None
-    try:
-        action = text.replace("ACTION:", "").strip()
-        tool, arg = action.split("|", 1)
-        return tool.strip(), arg.strip()
-    except Exception:
-        return None, None
-
-
-# ─── Helper: keyword-based tool detection ───────────────────────────────
-def try_tools(user_text: str):
-    text = user_text.lower()
-    if "open chrome" in text or "chrome" in text:
-        return open_app("chrome")
-    if "open safari" in text or "safari" in text:
-        return open_app("safari")
-    if "open vscode" in text or "open code" in text or "visual studio" in text:
-        return open_app("vscode")
-    if "open terminal" in text or "terminal" in text:
-        return open_app("terminal")
-    if "open youtube" in text or "youtube" in text:
-        return open_app("youtube")
-    if "time" in text:
-        return get_time()
-    if "search" in text:
-        query = text.replace("search", "").strip()
-        return search_google(query)
-    if text.startswith("run"):
-        cmd = text.replace("run", "", 1).strip()
-        return run_command(cmd)
-    return None
-
-
-# ─── Helper: Record audio using sounddevice ─────────────────────────────
-def record_audio() -> str:
-    """Record RECORD_DURATION seconds from mic, save to temp WAV, return path."""
-    audio = sd.rec(
-        int(SAMPLE_RATE * RECORD_DURATION),
-        samplerate=SAMPLE_RATE,
-        channels=1,
-        dtype=np.int16,
-    )
-    sd.wait()
-    tmp = tempfile.NamedTemporaryFile(suffix=".wav", delete=False)
-    wav.write(tmp.name, SAMPLE_RATE, audio)
-    return tmp.name
+# ─── Helper: run a tool ─────────────────────────────────────────────────
+async def run_tool_for(session: ClientSession, turn_id: int, tool: str, arg: str) -> str:
+    """Run a tool on the bounded tool pool, streaming its output to the client as it arrives."""
+    sends = []
+
+    def on_output(text):
+        sends.append(asyncio.create_task(session.send({"type": "tool_output", "text": text, "turn": turn_id})))
+
+    with tracing.span("tool"):
+        result = await run_tool(tool, arg, on_output)
+    await asyncio.gather(*sends, return_exceptions=True)
+    return result
+
+
+# ─── Helper: Record + transcribe audio ──────────────────────────────────
+mic = MicrophoneListener(SAMPLE_RATE)
+_transcriber = None
+
+def get_transcriber() -> StreamingTranscriber:
+    global _transcriber
+    if _transcriber is None:
+        _transcriber = StreamingTranscriber(get_stt(), SAMPLE_RATE)
+    return _transcriber
+
+
+def record_audio(on_partial=None, on_speech=None) -> np.ndarray:
+    """Block until the VAD detects a complete utterance and return it as float32 PCM.
+
+    While the user is speaking, `on_speech(speech_ms)` is called for every
+    captured chunk, the utterance is decoded incrementally and
+    `on_partial(stable_text, hypothesis)` is called whenever a decode ran.
+    """
+    transcriber = get_transcriber()
+    transcriber.reset()
+
+    def on_audio(audio):
+        if on_speech:
+            on_speech(mic.detector.speech_ms)
+        before = transcriber.hypothesis
+        stable = transcriber.update(audio)
+        if on_partial and (stable or transcriber.hypothesis != before):
+            on_partial(stable, transcriber.hypothesis)
+
+    return mic.listen(on_audio=on_audio)
+
+
+def transcribe_audio(audio: np.ndarray) -> str:
+    """Finish the utterance: only the not-yet-committed tail is decoded here."""
+    return get_transcriber().finalize(audio)
+
 
+# ─── Helper: Memory + RAG lookup ────────────────────────────────────────
+# Voice turns start retrieval on the partial transcript while the user is
+# still talking; a final transcript that matches reuses the result.
+prefetch_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="prefetch")
 
-# ─── Helper: Transcribe audio ───────────────────────────────────────────
-def transcribe_audio(audio_path: str) -> str:
-    segments, _ = get_whisper().transcribe(audio_path)
-    text = "".join(seg.text for seg in segments).strip()
-    return text
+def normalize_text(text: str) -> str:
+    return " ".join(re.findall(r"[\w']+", text.lower()))
 
 
 # ─── Connected WebSocket clients ────────────────────────────────────────
-# We use a simple global to hold the active WebSocket + conversation
-active_ws = None
-active_ws_lock = threading.Lock()
-conversation_messages = [{"role": "system", "content": SYSTEM_PROMPT}]
-voice_listening = True  # controlled by frontend toggle
+# One ClientSession per socket (own history, voice toggle, turns); the
+# scheduler bounds concurrent LLM generations across all of them.
+sessions = SessionRegistry()
+scheduler = GenerationScheduler()
 
 
 # ─── Process a user message (shared between voice & text) ───────────────
-async def process_message(ws: WebSocket, user_text: str):
-    """Handle a user message: tools → LLM stream → TTS → send to frontend."""
-    global conversation_messages
+async def process_message(session: ClientSession, user_text: str, prefetched=None, trace=None):
+    """Handle a user message: tools → LLM stream → TTS → send to frontend.
+
+    Everything blocking (embeddings, Chroma, TTS) runs in the default executor,
+    tools run on the bounded tool pool and the LLM is streamed through the
+    async Ollama client, so the event loop stays free for other sockets and
+    voice-loop sends during a turn.
+    `prefetched` is an optional Future of retrieve(user_text); `trace` is the
+    voice loop's TurnTrace when the turn started at the microphone.
+    """
+    turn_id = session.next_turn_id()
+    trace = trace or TurnTrace()
+    trace.id = f"{session.id}.{turn_id}"
+    tracing.bind(trace)
+    status = "error"
+    try:
+        await respond(session, turn_id, user_text, prefetched)
+        status = "ok"
+    except asyncio.CancelledError:
+        status = "cancelled"
+        raise
+    finally:
+        trace.finish(status)
+
+
+async def respond(session: ClientSession, turn_id: int, user_text: str, prefetched=None):
+    """The body of a turn; process_message wraps it with the turn's trace."""
+    audio = AudioStream(turn_id)
 
     # ── Quick tool check ──
-    tool_result = try_tools(user_text)
-    if tool_result:
-        await ws.send_text(json.dumps({"type": "tool_result", "text": tool_result}))
-        audio_b64 = generate_tts(tool_result)
-        if audio_b64:
-            await ws.send_text(json.dumps({"type": "audio", "data": audio_b64}))
+    with tracing.span("intent"):
+        intent = route_intent(user_text)
+    if intent:
+        tool_result = await run_tool_for(session, turn_id, intent.tool, intent.arg)
+        await session.send({"type": "tool_result", "text": tool_result, "turn": turn_id})
+        await speak(session, audio, tool_result)
+        await session.send_bytes(audio.end())
         return
 
     # ── Memory + RAG context ──
-    memories = recall_memory(user_text)
-    memory_ctx = ""
-    if memories:
-        memory_ctx = "\nRelevant past memory:\n" + "\n".join(memories)
-
-    knowledge_ctx = ""
-    knowledge = search_knowledge(user_text)
-    if knowledge:
-        knowledge_ctx = "\nRelevant knowledge:\n" + knowledge
-
-    enriched = user_text + memory_ctx + knowledge_ctx
-    conversation_messages.append({"role": "user", "content": enriched})
-
-    # ── Stream LLM response ──
-    await ws.send_text(json.dumps({"type": "stream_start"}))
-
-    stream = ollama.chat(model=MODEL_NAME, messages=conversation_messages, stream=True)
-    reply = ""
-    for chunk in stream:
-        token = chunk["message"]["content"]
-        reply += token
-        await ws.send_text(json.dumps({"type": "token", "text": token}))
-
-    await ws.send_text(json.dumps({"type": "stream_end"}))
-
-    # ── Check if LLM triggered a tool action ──
-    tool, arg = parse_action(reply.strip())
-    if tool:
-        result = execute_tool(tool, arg)
-        await ws.send_text(json.dumps({"type": "tool_result", "text": f"[{tool}] {result}"}))
-        audio_b64 = generate_tts(result)
-        if audio_b64:
-            await ws.send_text(json.dumps({"type": "audio", "data": audio_b64}))
-    else:
-        conversation_messages.append({"role": "assistant", "content": reply})
+    with tracing.span("retrieve"):
+        if not startup.ready("embedder"):
+            # Text chat doesn't wait for the embedder; context joins once it has loaded
+            context = RetrievedContext()
+        elif prefetched is not None:
+            context = await asyncio.wrap_future(prefetched)
+        else:
+            context = await asyncio.to_thread(retrieve, user_text)
+    for stage, seconds in context.timings.items():
+        if stage != "total":
+            tracing.record(stage, seconds)
+
+    # ── Asked before? Replay the stored answer and its speech ──
+    conversation = session.conversation
+    cache = get_response_cache()
+    prior = conversation.history[-2:]   # the exchange this question follows
+    with tracing.span("cache"):
+        cached = await asyncio.to_thread(cache.get, user_text, context.knowledge, prior)
+    if cached is not None:
+        await replay(session, turn_id, audio, cached)
+        conversation.add_user(user_text)
+        conversation.add_assistant(cached.reply)
         store_memory("User: " + user_text)
-        store_memory("Jarvis: " + reply)
+        store_memory("Jarvis: " + cached.reply)
+        return
+
+    # Retrieved context goes with this request only, not into the stored history
+    conversation.add_user(user_text)
+    messages = conversation.build(context.render())
+
+    # ── Stream LLM response, speaking sentences as they complete ──
+    # Tool calls are cut out of the stream as soon as their line starts, run
+    # while the model is still going, and end the generation once the block
+    # of calls is over.
+    spoken = []
+
+    async def deliver(synth):
+        spoken.append(synth)
+        await send_audio(session, audio, synth)
 
-        audio_b64 = generate_tts(reply)
-        if audio_b64:
-            await ws.send_text(json.dumps({"type": "audio", "data": audio_b64}))
+    pipeline = AsyncSpeechPipeline(deliver, VOICE_MODEL)
+    actions = ActionStream()
+    dispatched = []
+
+    async def run_in_order(prev, call):
+        if prev is not None:
+            await asyncio.wait([prev])
+        return await run_tool_for(session, turn_id, call.tool, call.arg)
+
+    def dispatch():
+        for call in actions.pop():
+            prev = dispatched[-1][1] if dispatched else None
+            dispatched.append((call, asyncio.create_task(run_in_order(prev, call))))
+
+    async def forward(text):
+        if text:
+            await session.send({"type": "token", "text": text})
+            pipeline.feed(text)
+
+    try:
+        reply = ""
+        queued = generating = time.perf_counter()
+        async with scheduler.slot(session):
+            tracing.record("queue", time.perf_counter() - queued, queued)
+            await session.send({"type": "stream_start", "turn": turn_id})
+            started, first = time.perf_counter(), None
+            async with aclosing(get_session(MODEL_NAME).astream(messages)) as stream:
+                async for token in stream:
+                    if first is None:
+                        first = time.perf_counter()
+                        tracing.record("llm_prefill", first - started, started)
+                        tracing.mark("first_token")
+                    reply += token
+                    await forward(actions.feed(token))
+                    dispatch()
+                    if actions.done:
+                        print(f"⚡ Generation stopped after {len(actions.calls)} tool call(s)")
+                        break
+            if first is not None:
+                tracing.record("llm_decode", time.perf_counter() - first, first)
+            await forward(actions.flush())
+            dispatch()
+            await session.send({"type": "stream_end"})
+
+        await pipeline.finish()
+        generated = time.perf_counter() - generating
+
+        # ── Report tool results, in the order the calls were made ──
+        for call, task in dispatched:
+            result = await task
+            await session.send({"type": "tool_result", "text": f"[{call.tool}] {result}", "turn": turn_id})
+            await speak(session, audio, result)
+        await session.send_bytes(audio.end())
+
+        if not dispatched:
+            conversation.add_assistant(reply)
+            # queued for the background memory writer; no waiting here
+            store_memory("User: " + user_text)
+            store_memory("Jarvis: " + reply)
+            # Audio is kept only if every sentence was synthesized; written off the turn
+            synths = spoken if len(spoken) == pipeline.sentences else []
+            asyncio.get_running_loop().run_in_executor(
+                None, cache.put, user_text, context.knowledge, reply, synths, generated, prior)
+
+    except asyncio.CancelledError:
+        # Barge-in / cancel: leaving the stream closes the Ollama request;
+        # drop any sentences still waiting for synthesis or delivery
+        pipeline.cancel()
+        for _, task in dispatched:
+            task.cancel()
+        raise
 
 
 # ─── Voice Listening Loop (runs in background thread) ────────────────────
 def voice_loop(loop):
-    """Continuously record → transcribe → process, just like voice_jarvis.py."""
-    global active_ws, voice_listening
-
-    # Wait for Whisper to be ready
-    get_whisper()
+    """Continuously record → transcribe → process, just like voice_jarvis.py.
+
+    There is one microphone, so voice input goes to the most recently active
+    session that has listening enabled. Turns run without blocking the loop,
+    so Jarvis keeps listening while it thinks and speaks; new speech
+    (barge-in) cancels the reply in progress, except while the client is
+    playing the reply aloud, when the microphone would pick up Jarvis itself.
+    """
+    # Wait for Whisper and the TTS voice (loading in the background since launch)
+    if not (startup.wait("whisper") and startup.wait("tts")):
+        print("⚠️  Voice input unavailable: Whisper or the TTS voice failed to load")
+        return
+    get_stt().load()
+    get_engine().load(VOICE_MODEL)
     print("🎙️  Voice loop started — always listening")
 
+    def send(session, msg, wait=True):
+        fut = asyncio.run_coroutine_threadsafe(session.send(msg), loop)
+        if wait:
+            fut.result(timeout=2)
+
+    def interrupt(session):
+        return asyncio.run_coroutine_threadsafe(session.interrupt(), loop)
+
     while True:
-        # Wait until we have an active websocket and listening is enabled
-        if active_ws is None or not voice_listening:
+        # Wait until some connected client has listening enabled
+        session = sessions.voice_target()
+        if session is None:
             time.sleep(0.5)
             continue
 
         try:
-            # Notify frontend: listening
-            asyncio.run_coroutine_threadsafe(
-                active_ws.send_text(json.dumps({"type": "status", "state": "listening"})),
-                loop
-            ).result(timeout=2)
+            # Notify frontend: listening (unless it's busy showing a reply)
+            if not session.busy:
+                send(session, {"type": "status", "state": "listening"})
+
+            # Wait for the next utterance, streaming partial transcripts
+            prefetch = {}
+            barged_in = []
+            onset = []
+            echo = []   # speech began while the client was playing the reply aloud
+
+            def can_barge_in():
+                return BARGE_IN_ENABLED and (BARGE_IN_DURING_PLAYBACK or not echo)
+
+            def on_speech(speech_ms):
+                if not onset:
+                    onset.append(time.perf_counter())
+                    if session.playing:
+                        echo.append(True)
+                if (can_barge_in() and not barged_in and session.busy
+                        and speech_ms >= BARGE_IN_MIN_SPEECH_MS):
+                    barged_in.append(interrupt(session))
+
+            def on_partial(stable, hypothesis):
+                if stable:
+                    send(session, {"type": "voice_input_partial", "text": stable}, wait=False)
+                key = normalize_text(hypothesis)
+                if key and key not in prefetch and startup.ready("embedder"):
+                    prefetch.clear()
+                    prefetch[key] = prefetch_pool.submit(retrieve, hypothesis)
+
+            audio = record_audio(on_partial, on_speech)
+
+            # The window may have closed or paused voice while we were listening
+            if sessions.voice_target() is not session:
+                continue
 
-            # Record audio
-            audio_path = record_audio()
+            # Most likely Jarvis's own voice from the speakers, not the user
+            if echo and not BARGE_IN_DURING_PLAYBACK:
+                continue
 
-            # Notify frontend: processing
-            asyncio.run_coroutine_threadsafe(
-                active_ws.send_text(json.dumps({"type": "status", "state": "thinking"})),
-                loop
-            ).result(timeout=2)
+            # The turn's trace starts at speech onset
+            heard = time.perf_counter()
+            trace = TurnTrace(started=onset[0] if onset else heard - len(audio) / SAMPLE_RATE)
+            trace.record("record", heard - trace.t0, trace.t0)
 
             # Transcribe
-            user_text = transcribe_audio(audio_path)
-            os.unlink(audio_path)
+            with trace.span("transcribe"):
+                user_text = transcribe_audio(audio)
 
             if not user_text or len(user_text.strip()) < 2:
                 continue
 
             print(f"\n🗣️  You said: {user_text}")
 
-            # Send user text to frontend
-            asyncio.run_coroutine_threadsafe(
-                active_ws.send_text(json.dumps({"type": "voice_input", "text": user_text})),
-                loop
-            ).result(timeout=2)
+            # A new request supersedes whatever is still running
+            if session.busy and can_barge_in():
+                with trace.span("interrupt"):
+                    interrupt(session).result(timeout=CANCEL_TIMEOUT_S + 1)
+
+            # Notify frontend: processing, and show what was said
+            send(session, {"type": "status", "state": "thinking"})
+            send(session, {"type": "voice_input", "text": user_text})
 
-            # Process the message
+            # Run the turn in the background and go straight back to listening
+            prefetched = prefetch.get(normalize_text(user_text))
             asyncio.run_coroutine_threadsafe(
-                process_message(active_ws, user_text),
+                session.run_turn(process_message(session, user_text, prefetched, trace)),
                 loop
-            ).result(timeout=120)
+            )
 
         except Exception as e:
             print(f"Voice loop error: {e}")
@@ -284,11 +535,12 @@ def voice_loop(loop):
 # ─── WebSocket endpoint ─────────────────────────────────────────────────
 @app.websocket("/ws/chat")
 async def websocket_chat(ws: WebSocket):
-    global active_ws, voice_listening
     await ws.accept()
 
-    with active_ws_lock:
-        active_ws = ws
+    session = ClientSession(ws, SYSTEM_PROMPT)
+    sessions.add(session)
+    print(f"Client connected (session {session.id}, {len(sessions)} open)")
+    await session.send(startup.snapshot())
 
     try:
         while True:
@@ -297,21 +549,34 @@ async def websocket_chat(ws: WebSocket):
 
             # Handle voice toggle from frontend
             if payload.get("type") == "voice_toggle":
-                voice_listening = payload.get("enabled", True)
-                print(f"🎙️  Voice listening: {'ON' if voice_listening else 'OFF'}")
+                session.voice_enabled = payload.get("enabled", True)
+                session.last_active = time.monotonic()
+                print(f"🎙️  Voice listening (session {session.id}): {'ON' if session.voice_enabled else 'OFF'}")
+                continue
+
+            # The client started or stopped playing reply audio (echo guard for barge-in)
+            if payload.get("type") == "playback":
+                session.playing = bool(payload.get("active"))
                 continue
 
-            # Handle text messages
+            # Stop the reply in progress (LLM stream, TTS and client audio)
+            if payload.get("type") == "cancel":
+                await session.interrupt()
+                continue
+
+            # Handle text messages; turns run as tasks so this loop keeps
+            # reading while a reply streams
             user_text = payload.get("text", "").strip()
             if not user_text:
                 continue
 
-            await process_message(ws, user_text)
+            session.start_turn(process_message(session, user_text))
 
     except WebSocketDisconnect:
-        print("Client disconnected")
-        with active_ws_lock:
-            active_ws = None
+        print(f"Client disconnected (session {session.id})")
+    finally:
+        session.cancel()
+        sessions.remove(session)
 
 
 # ─── Run as Desktop App ──────────────────────────────────────────────────
@@ -320,27 +585,26 @@ if __name__ == "__main__":
 
     PORT = 8000
 
-    # Mutable container to share the event loop between threads
-    _loop_holder = [None]
+    loop = asyncio.new_event_loop()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=PORT, log_level="warning", loop="asyncio"))
 
     def start_server():
-        _loop_holder[0] = asyncio.new_event_loop()
-        asyncio.set_event_loop(_loop_holder[0])
-        config = uvicorn.Config(app, host="127.0.0.1", port=PORT, log_level="warning", loop="asyncio")
-        server = uvicorn.Server(config)
-        _loop_holder[0].run_until_complete(server.serve())
+        asyncio.set_event_loop(loop)
+        loop.run_until_complete(server.serve())
 
-    # Start the API server
+    # Load every model in the background; open windows are told as each one
+    # becomes ready. Text chat works meanwhile.
+    startup.subscribe(lambda snapshot: asyncio.run_coroutine_threadsafe(sessions.broadcast(snapshot), loop))
+    load_models_in_background()
+
+    # Start the API server and open the window as soon as it accepts connections
     server_thread = threading.Thread(target=start_server, daemon=True)
     server_thread.start()
+    while not server.started:
+        time.sleep(0.02)
 
-    # Wait for server to start and event loop to be created
-    while _loop_holder[0] is None:
-        time.sleep(0.1)
-    time.sleep(1)
-
-    # Start the voice listening loop
-    voice_thread = threading.Thread(target=voice_loop, args=(_loop_holder[0],), daemon=True)
+    # Start the voice listening loop (it waits for Whisper and the voice itself)
+    voice_thread = threading.Thread(target=voice_loop, args=(loop,), daemon=True)
     voice_thread.start()
 
     # Open native desktop window
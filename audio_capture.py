@@ -0,0 +1,223 @@
+"""
+Voice-activity-detected microphone capture.
+
+A single `sd.InputStream` stays open and feeds fixed-size frames into an
+energy-based utterance detector. The detector keeps a short pre-roll so the
+first syllable isn't clipped, ends an utterance after a hangover of silence,
+and hands back float32 numpy audio that faster-whisper accepts directly (no
+WAV round-trip). The detector itself has no audio-device dependency, so it can
+be driven offline from recorded PCM with `utterances_from_wav`.
+"""
+
+import collections
+import queue
+import wave
+
+import numpy as np
+
+from config import (
+    VAD_FRAME_MS,
+    VAD_THRESHOLD,
+    VAD_PRE_ROLL_MS,
+    VAD_HANGOVER_MS,
+    VAD_MIN_SPEECH_MS,
+    VAD_MAX_UTTERANCE_S,
+)
+
+
+def to_float32(pcm: np.ndarray) -> np.ndarray:
+    """Convert int16 (or float) PCM to mono float32 in [-1, 1]."""
+    if pcm.ndim > 1:
+        pcm = pcm[:, 0]
+    if pcm.dtype == np.int16:
+        return pcm.astype(np.float32) / 32768.0
+    return pcm.astype(np.float32, copy=False)
+
+
+class UtteranceDetector:
+    """Energy VAD with an adaptive noise floor, pre-roll and hangover.
+
+    A frame counts as speech when its RMS exceeds both `threshold` and
+    `noise_ratio` times the running noise floor, so a noisy room raises the
+    bar automatically. Feed arbitrary-length chunks; completed utterances are
+    returned as float32 arrays.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int = 16000,
+        frame_ms: int = VAD_FRAME_MS,
+        threshold: float = VAD_THRESHOLD,
+        pre_roll_ms: int = VAD_PRE_ROLL_MS,
+        hangover_ms: int = VAD_HANGOVER_MS,
+        min_speech_ms: int = VAD_MIN_SPEECH_MS,
+        max_utterance_s: float = VAD_MAX_UTTERANCE_S,
+        noise_ratio: float = 3.0,
+    ):
+        self.sample_rate = sample_rate
+        self.frame_len = int(sample_rate * frame_ms / 1000)
+        self.threshold = threshold
+        self.noise_ratio = noise_ratio
+        self.hangover_frames = max(1, hangover_ms // frame_ms)
+        self.min_speech_frames = max(1, min_speech_ms // frame_ms)
+        self.max_frames = int(max_utterance_s * 1000 / frame_ms)
+        self._pre_roll = collections.deque(maxlen=max(0, pre_roll_ms // frame_ms))
+        self._noise_floor = threshold / noise_ratio
+        self.reset()
+
+    def reset(self):
+        self._pending = np.zeros(0, dtype=np.float32)
+        self._pre_roll.clear()
+        self._frames = []
+        self._speech_frames = 0
+        self._silent_run = 0
+
+    @property
+    def in_speech(self) -> bool:
+        return bool(self._frames)
+
+    @property
+    def speech_ms(self) -> int:
+        """Milliseconds of speech-classified audio in the utterance in progress."""
+        return self._speech_frames * self.frame_len * 1000 // self.sample_rate
+
+    def current(self) -> np.ndarray:
+        """Audio of the utterance in progress (empty when idle)."""
+        if not self._frames:
+            return np.zeros(0, dtype=np.float32)
+        return np.concatenate(self._frames)
+
+    def is_speech(self, frame: np.ndarray) -> bool:
+        rms = float(np.sqrt(np.mean(np.square(frame)))) * 32768.0
+        speech = rms > max(self.threshold, self._noise_floor * self.noise_ratio)
+        if not speech:
+            self._noise_floor = 0.95 * self._noise_floor + 0.05 * rms
+        return speech
+
+    def feed(self, pcm: np.ndarray) -> list[np.ndarray]:
+        audio = np.concatenate([self._pending, to_float32(pcm)])
+        n = len(audio) // self.frame_len * self.frame_len
+        self._pending = audio[n:]
+
+        utterances = []
+        for start in range(0, n, self.frame_len):
+            done = self._feed_frame(audio[start:start + self.frame_len])
+            if done is not None:
+                utterances.append(done)
+        return utterances
+
+    def _feed_frame(self, frame: np.ndarray):
+        speech = self.is_speech(frame)
+
+        if not self._frames:
+            if speech:
+                self._frames = list(self._pre_roll) + [frame]
+                self._pre_roll.clear()
+                self._speech_frames = 1
+                self._silent_run = 0
+            else:
+                self._pre_roll.append(frame)
+            return None
+
+        self._frames.append(frame)
+        if speech:
+            self._speech_frames += 1
+            self._silent_run = 0
+        else:
+            self._silent_run += 1
+
+        if self._silent_run >= self.hangover_frames or len(self._frames) >= self.max_frames:
+            return self._finish()
+        return None
+
+    def _finish(self):
+        frames, speech_frames = self._frames, self._speech_frames
+        self._frames, self._speech_frames, self._silent_run = [], 0, 0
+        if speech_frames < self.min_speech_frames:
+            return None  # a click or a cough, not an utterance
+        return np.concatenate(frames)
+
+    def flush(self):
+        """End any utterance in progress (e.g. at end of a recording)."""
+        self._pending = np.zeros(0, dtype=np.float32)
+        return self._finish() if self._frames else None
+
+
+class MicrophoneListener:
+    """Continuously open input stream feeding an UtteranceDetector."""
+
+    def __init__(self, sample_rate: int = 16000, **vad_options):
+        self.sample_rate = sample_rate
+        self.detector = UtteranceDetector(sample_rate, **vad_options)
+        self._frames = queue.Queue()
+        self._stream = None
+
+    def _callback(self, indata, frames, time_info, status):
+        self._frames.put(indata[:, 0].copy())
+
+    def start(self):
+        if self._stream is None:
+            import sounddevice as sd
+
+            self._stream = sd.InputStream(
+                samplerate=self.sample_rate,
+                channels=1,
+                dtype="int16",
+                blocksize=self.detector.frame_len,
+                callback=self._callback,
+            )
+            self._stream.start()
+
+    def stop(self):
+        if self._stream is not None:
+            self._stream.stop()
+            self._stream.close()
+            self._stream = None
+
+    def drain(self):
+        """Drop audio captured while we weren't listening (e.g. our own TTS)."""
+        while True:
+            try:
+                self._frames.get_nowait()
+            except queue.Empty:
+                break
+        self.detector.reset()
+
+    def listen(self, timeout: float | None = None, on_audio=None) -> np.ndarray | None:
+        """Block until the next complete utterance; None on timeout.
+
+        `on_audio`, if given, is called with the utterance-so-far after each
+        captured chunk while speech is in progress (for partial transcripts).
+        """
+        self.start()
+        self.drain()
+        while True:
+            try:
+                chunk = self._frames.get(timeout=timeout)
+            except queue.Empty:
+                return self.detector.flush()
+            for utterance in self.detector.feed(chunk):
+                return utterance
+            if on_audio is not None and self.detector.in_speech:
+                on_audio(self.detector.current())
+
+
+def read_wav(path: str) -> tuple[np.ndarray, int]:
+    """Read a 16-bit PCM WAV into an int16 array and its sample rate."""
+    with wave.open(path, "rb") as w:
+        pcm = np.frombuffer(w.readframes(w.getnframes()), dtype=np.int16)
+        if w.getnchannels() > 1:
+            pcm = pcm.reshape(-1, w.getnchannels())[:, 0]
+        return pcm, w.getframerate()
+
+
+def utterances_from_wav(path: str, chunk_ms: int = 100, **vad_options):
+    """Replay a recording through the detector as if it came from the mic."""
+    pcm, rate = read_wav(path)
+    detector = UtteranceDetector(rate, **vad_options)
+    step = int(rate * chunk_ms / 1000)
+    for start in range(0, len(pcm), step):
+        yield from detector.feed(pcm[start:start + step])
+    last = detector.flush()
+    if last is not None:
+        yield last
@@ -0,0 +1,67 @@
+"""
+Binary audio frames for the WebSocket.
+
+Synthesized speech is sent as binary WebSocket messages instead of base64
+WAV inside JSON. Each message is a 16-byte little-endian header followed by
+raw 16-bit mono PCM:
+
+    offset  size  field
+    0       1     version      (1)
+    1       1     codec        (0 = PCM s16le)
+    2       2     flags        (bit 0: last frame of the turn)
+    4       4     turn id      (which reply this audio belongs to)
+    8       4     sequence     (per turn, starting at 0)
+    12      4     sample rate  (Hz)
+
+Long clips are split into frames of FRAME_SAMPLES so the client can start
+playing the first one while the rest is still in flight. A header-only frame
+with the `last` flag marks the end of a turn's audio. static/app.js decodes
+the same layout.
+"""
+
+import struct
+
+VERSION = 1
+CODEC_PCM16 = 0
+FLAG_LAST = 1
+HEADER = struct.Struct("<BBHIII")
+FRAME_SAMPLES = 4096  # ~0.19s at 22.05 kHz
+
+
+def pack_frame(turn_id: int, seq: int, pcm: bytes, sample_rate: int, last: bool = False) -> bytes:
+    flags = FLAG_LAST if last else 0
+    return HEADER.pack(VERSION, CODEC_PCM16, flags, turn_id, seq, sample_rate) + pcm
+
+
+def unpack_frame(data: bytes) -> dict:
+    version, codec, flags, turn_id, seq, sample_rate = HEADER.unpack_from(data)
+    return {
+        "version": version,
+        "codec": codec,
+        "last": bool(flags & FLAG_LAST),
+        "turn_id": turn_id,
+        "seq": seq,
+        "sample_rate": sample_rate,
+        "pcm": data[HEADER.size:],
+    }
+
+
+class AudioStream:
+    """Frames one turn's audio with a running sequence number."""
+
+    def __init__(self, turn_id: int, frame_samples: int = FRAME_SAMPLES):
+        self.turn_id = turn_id
+        self.frame_bytes = frame_samples * 2
+        self.seq = 0
+        self.sample_rate = 0
+
+    def frames(self, pcm: bytes, sample_rate: int):
+        self.sample_rate = sample_rate
+        for start in range(0, len(pcm), self.frame_bytes):
+            yield pack_frame(self.turn_id, self.seq, pcm[start:start + self.frame_bytes], sample_rate)
+            self.seq += 1
+
+    def end(self) -> bytes:
+        frame = pack_frame(self.turn_id, self.seq, b"", self.sample_rate, last=True)
+        self.seq += 1
+        return frame
@@ -0,0 +1,110 @@
+"""
+Tool-call turns: how much generation and UI traffic an ACTION reply costs.
+
+Uses the stubbed app from bench_sessions. The stub model streams
+a scripted reply that starts with tool call(s) and then rambles on (as
+models do despite the prompt). get_time stands in for the tool. For each
+script the client records the time until the tool result arrives, how many
+tokens were shown in the UI, and how many of the script's tokens the model
+actually had to generate before the stream was closed.
+
+Run from the repo root:  python -m benchmarks.bench_actions
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import threading
+import time
+
+os.environ.setdefault("JARVIS_VECTOR_STORE", "memory")
+os.environ.setdefault("JARVIS_DATA_DIR", tempfile.mkdtemp(prefix="jarvis-bench-"))
+os.environ.setdefault("JARVIS_RESPONSE_CACHE", "0")
+
+import uvicorn
+import websockets
+
+from benchmarks.bench_sessions import SilentPipeline, free_port
+import app
+from retrieval import RetrievedContext
+
+RAMBLE = " I have gone ahead and done that for you. Let me know if there is anything else I can help with today." * 3
+
+SCRIPTS = {
+    "action line": "ACTION: get_time | \n" + RAMBLE,
+    "two actions": "ACTION: get_time | \nACTION: get_time | now\n" + RAMBLE,
+    "json call": '{"tool": "get_time", "arg": ""}\n' + RAMBLE,
+    "plain reply": "It is a lovely day to learn something new." + RAMBLE,
+    "json in text": 'Here is the record:\n{"name": "Alice", "age": 30}\n' + RAMBLE,
+}
+
+
+class ScriptedModel:
+    def __init__(self, rate):
+        self.delay = 1.0 / rate
+        self.script = ""
+        self.generated = 0
+
+    async def astream(self, messages):
+        self.generated = 0
+        for token in self.script.split(" "):
+            await asyncio.sleep(self.delay)
+            self.generated += 1
+            yield token + " "
+
+
+async def turn(url):
+    async with websockets.connect(url) as ws:
+        await ws.send(json.dumps({"type": "voice_toggle", "enabled": False}))
+        start = time.perf_counter()
+        await ws.send(json.dumps({"text": "do the thing"}))
+        shown, first_result, results = 0, None, 0
+        while True:
+            data = await ws.recv()
+            if isinstance(data, bytes):
+                if data[2] & 1:   # last audio frame of the turn
+                    break
+                continue
+            msg = json.loads(data)
+            if msg["type"] == "token":
+                shown += 1
+            elif msg["type"] == "tool_result":
+                results += 1
+                first_result = first_result or time.perf_counter() - start
+        return shown, first_result, results, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rate", type=float, default=40, help="stub tokens/sec")
+    args = parser.parse_args()
+
+    model = ScriptedModel(args.rate)
+    app.get_session = lambda name: model
+    app.retrieve = lambda text: RetrievedContext()
+    app.route_intent = lambda text: None
+    app.store_memory = lambda text: None
+    app.AsyncSpeechPipeline = SilentPipeline
+
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config(app.app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+
+    url = f"ws://127.0.0.1:{port}/ws/chat"
+    print(f"stub model at {args.rate:g} tok/s")
+    for name, script in SCRIPTS.items():
+        model.script = script
+        shown, first_result, results, total = asyncio.run(turn(url))
+        total_tokens = len(script.split(" "))
+        result = f"first result {first_result * 1000:5.0f}ms" if first_result else "no tool call      "
+        print(f"{name:<12} {result}  results {results}  tokens shown {shown:3d}  "
+              f"generated {model.generated:3d}/{total_tokens}  turn {total:.2f}s")
+    server.should_exit = True
+
+
+if __name__ == "__main__":
+    main()
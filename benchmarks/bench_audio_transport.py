@@ -0,0 +1,131 @@
+"""
+Audio transport: base64 WAV in JSON vs binary PCM frames over a WebSocket.
+
+A local websockets server plays one spoken reply (a few sentences of
+synthetic 22.05 kHz speech; each sentence "synthesizes" in duration × RTF)
+to a client, either the old way — one JSON message with a base64 WAV per
+sentence — or as audio_protocol frames. An optional link speed throttles
+sends to model a slower connection than loopback.
+
+Reports bytes on the wire and time to first sample: from the start of the
+turn until the client holds decoded PCM it could start playing.
+
+Run from the repo root:  python -m benchmarks.bench_audio_transport --mbps 20
+"""
+
+import argparse
+import asyncio
+import base64
+import io
+import json
+import socket
+import statistics
+import time
+import wave
+
+import numpy as np
+import websockets
+
+from audio_protocol import AudioStream, unpack_frame
+from tts import Synthesis, to_wav
+
+SAMPLE_RATE = 22050
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def pct(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(p / 100 * len(values)))]
+
+
+def make_sentences(durations, rtf):
+    out = []
+    for i, seconds in enumerate(durations):
+        t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+        pcm = (np.sin(2 * np.pi * (180 + 20 * i) * t) * 8000).astype(np.int16).tobytes()
+        out.append(Synthesis(f"sentence {i}", pcm, SAMPLE_RATE, seconds * rtf))
+    return out
+
+
+async def throttled_send(ws, data, bytes_per_s):
+    if bytes_per_s:
+        await asyncio.sleep(len(data) / bytes_per_s)
+    await ws.send(data)
+
+
+def server(mode, sentences, bytes_per_s):
+    async def handler(ws):
+        await ws.recv()  # turn starts
+        audio = AudioStream(turn_id=1)
+        for synth in sentences:
+            await asyncio.sleep(synth.seconds)
+            if mode == "json":
+                msg = json.dumps({"type": "audio", "data": base64.b64encode(to_wav(synth)).decode()})
+                await throttled_send(ws, msg, bytes_per_s)
+            else:
+                for frame in audio.frames(synth.pcm, synth.sample_rate):
+                    await throttled_send(ws, frame, bytes_per_s)
+        await ws.send(audio.end() if mode == "binary" else json.dumps({"type": "stream_end"}))
+    return handler
+
+
+async def client(url, mode):
+    async with websockets.connect(url, max_size=None) as ws:
+        start = time.perf_counter()
+        await ws.send("go")
+        first, wire = None, 0
+        while True:
+            data = await ws.recv()
+            wire += len(data.encode() if isinstance(data, str) else data)
+            if mode == "json":
+                msg = json.loads(data)
+                if msg["type"] == "stream_end":
+                    break
+                with wave.open(io.BytesIO(base64.b64decode(msg["data"]))) as wf:
+                    pcm = np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16)
+            else:
+                frame = unpack_frame(data)
+                if frame["last"]:
+                    break
+                pcm = np.frombuffer(frame["pcm"], dtype=np.int16)
+            if first is None and len(pcm):
+                first = time.perf_counter() - start
+        return first, wire
+
+
+async def run(mode, sentences, bytes_per_s, trials):
+    port = free_port()
+    async with websockets.serve(server(mode, sentences, bytes_per_s), "127.0.0.1", port, max_size=None):
+        return [await client(f"ws://127.0.0.1:{port}", mode) for _ in range(trials)]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--trials", type=int, default=10)
+    parser.add_argument("--rtf", type=float, default=0.1, help="synthesis time / audio time")
+    parser.add_argument("--mbps", type=float, default=0, help="link speed in Mbit/s (0 = unthrottled loopback)")
+    parser.add_argument("--durations", type=float, nargs="+", default=[2.4, 3.1, 1.8])
+    args = parser.parse_args()
+
+    sentences = make_sentences(args.durations, args.rtf)
+    pcm_bytes = sum(len(s.pcm) for s in sentences)
+    bytes_per_s = args.mbps * 1e6 / 8
+    print(f"reply     {sum(args.durations):.1f}s of audio, {pcm_bytes / 1024:.0f} KiB PCM, "
+          f"link {'loopback' if not args.mbps else f'{args.mbps:g} Mbit/s'}")
+
+    for mode in ("json", "binary"):
+        results = asyncio.run(run(mode, sentences, bytes_per_s, args.trials))
+        firsts = [r[0] for r in results]
+        wire = results[0][1]
+        print(f"{mode:<8}  wire {wire / 1024:7.0f} KiB ({wire / pcm_bytes:.2f}× PCM)  "
+              f"first sample p50 {statistics.median(firsts) * 1000:6.1f}ms  "
+              f"p95 {pct(firsts, 95) * 1000:6.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
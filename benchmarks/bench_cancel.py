@@ -0,0 +1,79 @@
+"""
+Cancellation latency: how fast a `cancel` message stops a streaming reply.
+
+Uses the same stubbed app as bench_sessions, with a deliberately slow model
+(default 5 tokens/s) so a cancel that waited for the next token would show
+up as ~200 ms. For each trial a client sends a message, waits for the first
+token, sends `cancel` and measures the time until the `cancelled` reply. It
+also checks that the stub generation really stopped (no active streams).
+
+Run from the repo root:  python -m benchmarks.bench_cancel --trials 20
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import tempfile
+import threading
+import time
+
+os.environ.setdefault("JARVIS_VECTOR_STORE", "memory")
+os.environ.setdefault("JARVIS_DATA_DIR", tempfile.mkdtemp(prefix="jarvis-bench-"))
+os.environ.setdefault("JARVIS_RESPONSE_CACHE", "0")
+
+import uvicorn
+import websockets
+
+from benchmarks.bench_sessions import StubModel, SilentPipeline, free_port, pct
+import app
+from retrieval import RetrievedContext
+
+
+async def trial(url, model):
+    async with websockets.connect(url) as ws:
+        await ws.send(json.dumps({"type": "voice_toggle", "enabled": False}))
+        await ws.send(json.dumps({"text": "tell me a long story"}))
+        while json.loads(await ws.recv())["type"] != "token":
+            pass
+        start = time.perf_counter()
+        await ws.send(json.dumps({"type": "cancel"}))
+        while json.loads(await ws.recv())["type"] != "cancelled":
+            pass
+        latency = time.perf_counter() - start
+        return latency, model.active
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--trials", type=int, default=20)
+    parser.add_argument("--rate", type=float, default=5, help="stub tokens/sec")
+    args = parser.parse_args()
+
+    model = StubModel(tokens=1000, rate=args.rate)
+    app.get_session = lambda name: model
+    app.retrieve = lambda text: RetrievedContext()
+    app.route_intent = lambda text: None
+    app.store_memory = lambda text: None
+    app.AsyncSpeechPipeline = SilentPipeline
+
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config(app.app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+
+    url = f"ws://127.0.0.1:{port}/ws/chat"
+    results = [asyncio.run(trial(url, model)) for _ in range(args.trials)]
+    server.should_exit = True
+
+    latencies = [r[0] for r in results]
+    print(f"trials        {len(results)}  (stub at {args.rate:g} tok/s)")
+    print(f"cancel → ack  p50 {statistics.median(latencies) * 1000:.1f}ms  "
+          f"p95 {pct(latencies, 95) * 1000:.1f}ms  max {max(latencies) * 1000:.1f}ms")
+    print(f"streams left running after cancel: {max(r[1] for r in results)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Conversation context benchmark: prompt size per turn over a long session.
+
+Replays N synthetic turns, each with retrieved context attached, and prints
+the prompt token count for the old unbounded message list next to the
+budgeted Conversation. The summarizer is a deterministic stand-in that keeps
+the last SUMMARY_MAX_WORDS words, so no LLM is needed.
+
+Run from the repo root:  python -m benchmarks.bench_context --turns 200
+"""
+
+import argparse
+import random
+
+from config import SUMMARY_MAX_WORDS
+from conversation import Conversation, estimate_tokens
+
+SYSTEM_PROMPT = "You are Jarvis, a smart, calm, and helpful AI voice assistant. " * 8
+
+
+def fake_summarize(summary, turns):
+    words = (summary + " " + " ".join(m["content"] for m in turns)).split()
+    return " ".join(words[-SUMMARY_MAX_WORDS:])
+
+
+def sentence(rng, n):
+    return " ".join(rng.choice(["the", "project", "meeting", "budget", "notes", "voice", "model"]) for _ in range(n))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--turns", type=int, default=200)
+    parser.add_argument("--every", type=int, default=20, help="print every N turns")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    conv = Conversation(SYSTEM_PROMPT, summarize=fake_summarize)
+    unbounded = [{"role": "system", "content": SYSTEM_PROMPT}]
+    tokens = lambda msgs: sum(estimate_tokens(m["content"]) for m in msgs)
+
+    print(f"{'turn':>5} {'unbounded':>10} {'budgeted':>9}")
+    sizes = []
+    for turn in range(1, args.turns + 1):
+        user = sentence(rng, 15)
+        context = "\nRelevant knowledge:\n" + sentence(rng, 200)
+        reply = sentence(rng, 60)
+
+        unbounded.append({"role": "user", "content": user + context})
+        old_size = tokens(unbounded)
+        unbounded.append({"role": "assistant", "content": reply})
+
+        conv.add_user(user)
+        new_size = tokens(conv.build(context))
+        conv.add_assistant(reply)
+        conv.wait()
+
+        sizes.append(new_size)
+        if turn % args.every == 0 or turn == 1:
+            print(f"{turn:>5} {old_size:>10} {new_size:>9}")
+
+    tail = sizes[len(sizes) // 2:]
+    print(f"budgeted prompt over 2nd half: min {min(tail)}, max {max(tail)} tokens")
+
+
+if __name__ == "__main__":
+    main()
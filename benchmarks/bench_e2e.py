@@ -0,0 +1,298 @@
+"""
+End-to-end benchmark: whole turns through Jarvis on stand-in backends.
+
+Ollama, Whisper, Piper, the embedding model and the sound devices are
+replaced by the deterministic stand-ins in benchmarks/stubs.py (latency,
+token rate and audio length are flags), so the run needs no microphone,
+GPU or model downloads and can gate a CI job. Everything else (sessions,
+scheduler, retrieval over an in-memory store, memory writer, speech
+pipeline, binary audio) is the real code. Scenarios:
+
+  text      --clients WebSocket clients each send --turns messages (process_message)
+  voice     the app's voice loop hears --wav --voice-turns times through a replayed mic;
+            the client waits for each reply before the next utterance plays
+  terminal  voice_jarvis.py's listen_once() on the same recording
+
+Latencies come from the turn traces (tracing.py). Voice turns are measured
+from the end of the utterance (after the VAD hangover), text turns from the
+moment the message arrived. For each scenario the run reports turns/sec and
+p50/p95 time to first token (TTFT) and time to first audio (TTFA), then
+compares them with benchmarks/baselines/bench_e2e.json: a metric more than
+--tolerance worse than the baseline fails the run (exit status 1).
+
+The response cache is off unless --response-cache is given: the voice
+scenarios repeat one recording, so every turn after the first would be a
+replay. With it on, the run also prints the cache's hit rate and saved
+latency.
+
+Text-turn TTFA depends on how the clients' sentences queue for the one
+Piper voice, which can settle into a different rhythm from run to run
+(about ±20%); the default tolerance allows for that.
+
+Run from the repo root:  python -m benchmarks.bench_e2e [--save-baseline] [--verbose]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+os.environ.setdefault("JARVIS_VECTOR_STORE", "memory")
+os.environ.setdefault("JARVIS_DATA_DIR", tempfile.mkdtemp(prefix="jarvis-bench-"))
+os.environ.setdefault("JARVIS_RESPONSE_CACHE", "0")
+
+from benchmarks import stubs
+
+BASELINE = os.path.join(os.path.dirname(__file__), "baselines", "bench_e2e.json")
+SCENARIOS = ("text", "voice", "terminal")
+LATENCIES = ("ttft_p50", "ttft_p95", "ttfa_p50", "ttfa_p95")
+
+
+def pct(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(p / 100 * len(values)))]
+
+
+def free_port():
+    import socket
+
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def read_traces(path, n, timeout=5.0):
+    """The first `n` turn records in `path`; waits briefly for turns still finishing."""
+    deadline = time.perf_counter() + timeout
+    while True:
+        traces = []
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                traces = [json.loads(line) for line in f if line.strip()]
+        if len(traces) >= n or time.perf_counter() > deadline:
+            return traces[:n]
+        time.sleep(0.05)
+
+
+def summarize(traces, elapsed):
+    ttft, ttfa = [], []
+    for t in traces:
+        end_of_speech = t["stages"].get("record", {}).get("total", 0.0)
+        events = t["events"]
+        if "first_token" in events:
+            ttft.append(events["first_token"] - end_of_speech)
+        if "first_audio" in events:
+            ttfa.append(events["first_audio"] - end_of_speech)
+    result = {"turns": len(traces), "turns_per_s": round(len(traces) / elapsed, 3)}
+    for name, values in (("ttft", ttft), ("ttfa", ttfa)):
+        if values:
+            result[f"{name}_p50"] = round(pct(values, 50), 4)
+            result[f"{name}_p95"] = round(pct(values, 95), 4)
+    return result
+
+
+# ─── Scenarios ──────────────────────────────────────────────────────────
+def start_server(app):
+    """Serve the app on its own event loop thread, as app.py does; returns (server, loop, port)."""
+    import uvicorn
+
+    loop = asyncio.new_event_loop()
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config(app.app, host="127.0.0.1", port=port, log_level="warning", loop="asyncio"))
+
+    def serve():
+        asyncio.set_event_loop(loop)
+        loop.run_until_complete(server.serve())
+
+    threading.Thread(target=serve, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server, loop, port
+
+
+async def wait_turn_end(ws):
+    from audio_protocol import unpack_frame
+
+    while True:
+        data = await ws.recv()
+        if isinstance(data, bytes) and unpack_frame(data)["last"]:
+            return
+
+
+async def text_client(url, i, turns, utterance, stagger=0.25):
+    import websockets
+
+    async with websockets.connect(url, max_size=None) as ws:
+        await ws.send(json.dumps({"type": "voice_toggle", "enabled": False}))
+        # Fixed start offsets: clients sharing the TTS voice fall into the
+        # same rhythm every run instead of a random one
+        await asyncio.sleep(i * stagger)
+        for t in range(turns):
+            await ws.send(json.dumps({"text": f"{utterance} ({i}.{t})"}))
+            await wait_turn_end(ws)
+
+
+async def voice_client(url, turns, gate):
+    import websockets
+
+    async with websockets.connect(url, max_size=None) as ws:
+        await ws.send(json.dumps({"type": "voice_toggle", "enabled": True}))
+        for _ in range(turns):
+            await wait_turn_end(ws)
+            gate.release()
+        await ws.send(json.dumps({"type": "voice_toggle", "enabled": False}))
+
+
+def run_text(app, port, args):
+    async def clients():
+        url = f"ws://127.0.0.1:{port}/ws/chat"
+        await asyncio.gather(*(text_client(url, i, args.turns, args.utterance) for i in range(args.clients)))
+
+    asyncio.run(clients())
+    return args.clients * args.turns
+
+
+def run_voice(app, loop, port, args):
+    gate = threading.Semaphore(1)
+    app.mic = stubs.make_microphone([args.wav] * args.voice_turns, app.SAMPLE_RATE, args.speed, gate)
+    app._transcriber = None
+    threading.Thread(target=app.voice_loop, args=(loop,), daemon=True).start()
+    asyncio.run(voice_client(f"ws://127.0.0.1:{port}/ws/chat", args.voice_turns, gate))
+    return args.voice_turns
+
+
+def run_terminal(args):
+    import voice_jarvis
+
+    voice_jarvis.mic = stubs.make_microphone([args.wav] * args.voice_turns, voice_jarvis.SAMPLE_RATE, args.speed)
+    voice_jarvis.transcriber = None
+    for _ in range(args.voice_turns):
+        voice_jarvis.listen_once()
+    return args.voice_turns
+
+
+# ─── Baseline ───────────────────────────────────────────────────────────
+def compare(results, baseline, tolerance, slack=0.010):
+    """Print each metric next to its baseline; returns the regressions."""
+    regressions = []
+    for scenario, metrics in results.items():
+        base = baseline.get(scenario)
+        if not base:
+            print(f"{scenario:<9} no baseline")
+            continue
+        for key, value in metrics.items():
+            ref = base.get(key)
+            if key == "turns" or ref is None:
+                continue
+            if key == "turns_per_s":
+                worse = value < ref * (1 - tolerance)
+            else:
+                worse = value > ref * (1 + tolerance) + slack
+            delta = (value - ref) / ref if ref else 0.0
+            flag = "  REGRESSION" if worse else ""
+            print(f"{scenario:<9} {key:<12} {value:8.3f}  baseline {ref:8.3f}  {delta:+7.1%}{flag}")
+            if worse:
+                regressions.append(f"{scenario}.{key}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--clients", type=int, default=3, help="concurrent text clients")
+    parser.add_argument("--turns", type=int, default=5, help="messages per text client")
+    parser.add_argument("--voice-turns", type=int, default=5, help="utterances per voice scenario")
+    parser.add_argument("--wav", default="input.wav", help="recorded utterance (16 kHz, 16-bit mono)")
+    parser.add_argument("--utterance", default="tell me something interesting about the ocean",
+                        help="what the messages say (and what the Whisper stand-in hears)")
+    parser.add_argument("--speed", type=float, default=2.0, help="mic replay / playback speed vs real time")
+    parser.add_argument("--ttft", type=float, default=0.25, help="stub LLM prefill seconds")
+    parser.add_argument("--rate", type=float, default=40, help="stub LLM tokens/sec")
+    parser.add_argument("--stt-rtf", type=float, default=0.1, help="stub Whisper seconds per audio second")
+    parser.add_argument("--tts-rtf", type=float, default=0.05, help="stub Piper seconds per audio second")
+    parser.add_argument("--response-cache", action="store_true", help="replay repeated questions from the cache")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative regression")
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--verbose", action="store_true", help="show the app's own logging")
+    args = parser.parse_args()
+
+    settings = {k: getattr(args, k) for k in ("clients", "turns", "voice_turns", "wav", "utterance",
+                                               "speed", "ttft", "rate", "stt_rtf", "tts_rtf")}
+    if args.response_cache:
+        settings["response_cache"] = True
+    stubs.install(
+        args.utterance,
+        llm={"ttft": args.ttft, "rate": args.rate},
+        whisper=stubs.StubWhisper(args.utterance, rtf=args.stt_rtf),
+        voice=stubs.StubVoice(rtf=args.tts_rtf),
+        playback_speed=args.speed,
+    )
+
+    import app
+    import tracing
+    from response_cache import get_response_cache
+
+    get_response_cache().enabled = args.response_cache
+
+    quiet = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+    server = loop = port = None
+    results = {}
+    trace_dir = tempfile.mkdtemp(prefix="jarvis-traces-")
+    for scenario in args.scenarios:
+        tracing.TRACE_PATH = os.path.join(trace_dir, f"{scenario}.jsonl")
+        print(f"▶ {scenario} …", file=sys.stderr)
+        with quiet:
+            if scenario != "terminal" and server is None:
+                server, loop, port = start_server(app)
+            start = time.perf_counter()
+            if scenario == "text":
+                turns = run_text(app, port, args)
+            elif scenario == "voice":
+                turns = run_voice(app, loop, port, args)
+            else:
+                turns = run_terminal(args)
+            traces = read_traces(tracing.TRACE_PATH, turns)
+            elapsed = time.perf_counter() - start
+        results[scenario] = summarize(traces, elapsed)
+    if server is not None:
+        server.should_exit = True
+
+    print(f"\n{'scenario':<9} {'turns':>5} {'turns/s':>8} {'TTFT p50':>9} {'p95':>7} {'TTFA p50':>9} {'p95':>7}")
+    for scenario, r in results.items():
+        cols = [f"{r.get(k, float('nan')):.3f}s" for k in LATENCIES]
+        print(f"{scenario:<9} {r['turns']:>5} {r['turns_per_s']:>8.2f} {cols[0]:>9} {cols[1]:>7} {cols[2]:>9} {cols[3]:>7}")
+    if args.response_cache:
+        print(f"\nResponse cache: {get_response_cache().stats()}")
+    print()
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({"settings": settings, "results": results}, f, indent=2)
+            f.write("\n")
+        print(f"Baseline saved to {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --save-baseline to record one")
+        return
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    if baseline.get("settings") != settings:
+        print("⚠️  Baseline was recorded with different settings; deltas are not comparable")
+    regressions = compare(results, baseline["results"], args.tolerance)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {args.tolerance:.0%}: {', '.join(regressions)}")
+        sys.exit(1)
+    print("\nNo regressions")
+
+
+if __name__ == "__main__":
+    main()
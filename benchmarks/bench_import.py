@@ -0,0 +1,140 @@
+"""
+Startup benchmark: how long until the window can open, and what it costs.
+
+Launches a fresh interpreter with `python -X importtime` that imports app,
+starts the web server and (with --models) loads every model in the
+background the way app.py's __main__ does. Reports:
+
+  - time to `import app` and to the server accepting connections
+    (when the window appears), from the child's first line of code
+  - with --models, when each component (startup.py) became ready
+  - the slowest imports by cumulative time, from -X importtime
+  - whether any heavy module was imported before it was needed
+
+--against REV runs the same launch on an older revision (extracted with
+git archive), to see what a change did to startup.
+
+Run from the repo root:  python -m benchmarks.bench_import [--models] [--against HEAD~1]
+"""
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import tarfile
+import tempfile
+import time
+
+HEAVY = ("ollama", "faster_whisper", "ctranslate2", "sounddevice", "chromadb",
+         "sentence_transformers", "torch", "piper", "onnxruntime")
+IMPORT_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+CHILD = r"""
+import asyncio, json, sys, threading, time
+t0 = time.perf_counter()
+import app
+t1 = time.perf_counter()
+import uvicorn
+loop = asyncio.new_event_loop()
+server = uvicorn.Server(uvicorn.Config(app.app, host="127.0.0.1", port=0, log_level="warning", loop="asyncio"))
+threading.Thread(target=lambda: loop.run_until_complete(server.serve()), daemon=True).start()
+while not server.started:
+    time.sleep(0.005)
+t2 = time.perf_counter()
+result = {"import_s": t1 - t0, "server_s": t2 - t0, "modules": sorted(sys.modules)}
+if sys.argv[1] == "models":
+    app.load_models_in_background()
+    for name in app.startup.snapshot()["components"]:
+        app.startup.wait(name)
+    result["ready_s"] = time.perf_counter() - t0
+    result["components"] = app.startup.snapshot()["components"]
+server.should_exit = True
+print(json.dumps(result))
+"""
+
+
+def parse_importtime(stderr):
+    """(module, self µs, cumulative µs, depth) for each line -X importtime wrote."""
+    rows = []
+    for line in stderr.splitlines():
+        m = IMPORT_LINE.match(line)
+        if m:
+            rows.append((m.group(4), int(m.group(1)), int(m.group(2)), len(m.group(3)) // 2))
+    return rows
+
+
+def launch(cwd, models):
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [cwd, os.environ.get("PYTHONPATH")])))
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", CHILD, "models" if models else "server"],
+        cwd=cwd, env=env, capture_output=True, text=True,
+    )
+    wall = time.perf_counter() - start
+    if proc.returncode != 0:
+        sys.exit(f"Launch failed in {cwd}:\n{proc.stderr[-2000:]}")
+    # Loader threads may still be printing after the result line
+    result = json.loads([line for line in proc.stdout.splitlines() if line.startswith("{")][-1])
+    result["wall_s"] = wall
+    result["imports"] = parse_importtime(proc.stderr)
+    return result
+
+
+def checkout(rev, dest):
+    """Extract `rev` of the repo into `dest` (no effect on the working tree)."""
+    archive = subprocess.run(["git", "archive", "--format=tar", rev], capture_output=True, check=True).stdout
+    with tempfile.TemporaryFile() as f:
+        f.write(archive)
+        f.seek(0)
+        with tarfile.open(fileobj=f) as tar:
+            tar.extractall(dest)
+
+
+def report(label, r, top):
+    print(f"── {label} ──")
+    print(f"import app          {r['import_s']:7.3f}s")
+    print(f"server accepting    {r['server_s']:7.3f}s   (process wall {r['wall_s']:.3f}s)")
+    if "ready_s" in r:
+        for name, c in r["components"].items():
+            seconds = "-" if c["seconds"] is None else f"{c['seconds']:.3f}s"
+            print(f"  {name:<16} {c['state']:<8} {seconds:>8}")
+        print(f"all models ready    {r['ready_s']:7.3f}s")
+    heavy = [m for m in HEAVY if m in r["modules"]]
+    print(f"heavy modules imported before the server was up: {', '.join(heavy) if heavy else 'none'}")
+    print("slowest imports (cumulative, top level of each package):")
+    tops = {}
+    for name, _, cumulative, _ in r["imports"]:
+        root = name.split(".")[0]
+        tops[root] = max(tops.get(root, 0), cumulative)
+    for root, us in sorted(tops.items(), key=lambda kv: -kv[1])[:top]:
+        print(f"  {us / 1000:8.1f}ms  {root}")
+    print()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--models", action="store_true", help="also load every model in the background")
+    parser.add_argument("--against", metavar="REV", help="compare with a git revision (server start only)")
+    parser.add_argument("--runs", type=int, default=3, help="launches per tree; the fastest is reported")
+    parser.add_argument("--top", type=int, default=12, help="imports to list")
+    args = parser.parse_args()
+
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    trees = [("working tree", root, args.models)]
+    tmp = None
+    if args.against:
+        tmp = tempfile.TemporaryDirectory(prefix="jarvis-rev-")
+        checkout(args.against, tmp.name)
+        trees.append((args.against, tmp.name, False))
+
+    for label, cwd, models in trees:
+        runs = [launch(cwd, models) for _ in range(args.runs)]
+        report(label, min(runs, key=lambda r: r["server_s"]), args.top)
+    if tmp is not None:
+        tmp.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Knowledge indexing benchmark.
+
+Builds a synthetic corpus of a few thousand text files and times a cold
+index, a no-op re-index (everything skipped via the manifest) and an
+incremental re-index after modifying and deleting a slice of the files.
+
+Run from the repo root:  python -m benchmarks.bench_index --files 3000
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+# Keep the benchmark's vectors and manifest out of the real data directory
+os.environ.setdefault("JARVIS_VECTOR_STORE", "memory")
+os.environ.setdefault("JARVIS_DATA_DIR", tempfile.mkdtemp(prefix="jarvis-bench-"))
+
+from knowledge.rag import index_knowledge, collection
+
+VOCAB = (
+    "jarvis memory vector index chunk embed query voice model latency token "
+    "schedule meeting project report budget roadmap python server socket audio "
+    "whisper piper ollama config deploy release review design test cache"
+).split()
+
+
+def make_corpus(folder, n_files, words_per_file, seed=0):
+    rng = random.Random(seed)
+    for i in range(n_files):
+        n = rng.randint(words_per_file // 2, words_per_file * 2)
+        with open(os.path.join(folder, f"doc_{i:05d}.txt"), "w") as f:
+            f.write(" ".join(rng.choice(VOCAB) for _ in range(n)))
+
+
+def timed(label, fn):
+    start = time.perf_counter()
+    stats = fn()
+    elapsed = time.perf_counter() - start
+    rate = stats["chunks"] / elapsed if elapsed else 0
+    print(f"{label:<14} {elapsed:8.2f}s  {stats}  ({rate:,.0f} chunks/s)")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=3000)
+    parser.add_argument("--words", type=int, default=400)
+    parser.add_argument("--churn", type=float, default=0.02, help="fraction of files modified/deleted")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as folder:
+        manifest = os.path.join(folder, ".manifest.json")
+        make_corpus(folder, args.files, args.words)
+        run = lambda: index_knowledge(folder, manifest_path=manifest)
+
+        timed("cold", run)
+        timed("unchanged", run)
+
+        n = max(1, int(args.files * args.churn))
+        for i in range(n):
+            with open(os.path.join(folder, f"doc_{i:05d}.txt"), "a") as f:
+                f.write(" appended edit")
+        for i in range(n, 2 * n):
+            os.remove(os.path.join(folder, f"doc_{i:05d}.txt"))
+        timed("incremental", run)
+
+        print(f"collection size: {collection.count()} chunks")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Intent routing: accuracy on a labeled set and per-utterance latency.
+
+Compares the old substring if-chain (reproduced below without running any
+tools) with intents.IntentRouter on benchmarks/intent_cases.jsonl. Each case
+is an utterance with the expected tool and argument, or null when it should
+go to the LLM. A case is correct only if both the tool and the argument match.
+Mistakes are listed so the rule table can be tuned.
+
+Run from the repo root:  python -m benchmarks.bench_intents [--semantic]
+"""
+
+import argparse
+import json
+import os
+import time
+
+from intents import IntentRouter
+
+CASES = os.path.join(os.path.dirname(__file__), "intent_cases.jsonl")
+
+
+def legacy_route(user_text):
+    """The old try_tools decision, returning (tool, arg) instead of running it."""
+    text = user_text.lower()
+    if "open chrome" in text or "chrome" in text:
+        return "open_app", "chrome"
+    if "open safari" in text or "safari" in text:
+        return "open_app", "safari"
+    if "open vscode" in text or "open code" in text or "visual studio" in text:
+        return "open_app", "vscode"
+    if "open terminal" in text or "terminal" in text:
+        return "open_app", "terminal"
+    if "open youtube" in text or "youtube" in text:
+        return "open_app", "youtube"
+    if "time" in text:
+        return "get_time", ""
+    if "search" in text:
+        return "search_google", text.replace("search", "").strip()
+    if text.startswith("run"):
+        return "run_command", text.replace("run", "", 1).strip()
+    return None, None
+
+
+def evaluate(name, route, cases, repeat):
+    correct, mistakes = 0, []
+    for case in cases:
+        got = route(case["text"])
+        expected = (case["tool"], case["arg"])
+        if got == expected:
+            correct += 1
+        else:
+            mistakes.append((case["text"], expected, got))
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for case in cases:
+            route(case["text"])
+    per_call = (time.perf_counter() - start) / (repeat * len(cases))
+
+    print(f"{name:<8}  accuracy {correct}/{len(cases)} ({correct / len(cases):.0%})  "
+          f"{per_call * 1e6:.1f}µs/utterance")
+    for text, expected, got in mistakes:
+        print(f"    ✗ {text!r}: expected {expected}, got {got}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--semantic", action="store_true", help="enable the MiniLM fallback")
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    with open(CASES) as f:
+        cases = [json.loads(line) for line in f if line.strip()]
+
+    router = IntentRouter(semantic=args.semantic)
+
+    def route(text):
+        intent = router.route(text)
+        return (intent.tool, intent.arg) if intent else (None, None)
+
+    evaluate("legacy", legacy_route, cases, args.repeat)
+    evaluate("router", route, cases, 1 if args.semantic else args.repeat)
+
+
+if __name__ == "__main__":
+    main()
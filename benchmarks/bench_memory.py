@@ -0,0 +1,115 @@
+"""
+Memory recall at scale: latency and quality at 10k / 100k / 1M memories.
+
+Fills a fresh in-memory collection with synthetic unit vectors (no model
+needed) spread over the past year, then plants Q "updated facts": for each
+topic an old memory (a year ago) and a newer one (yesterday), where the old
+one is slightly *closer* to the query, as when a preference changed but the
+old wording matches better. A query counts as a hit if the newer memory
+ranks first.
+
+For every size it reports recall latency (p50/p95) and hit rate for
+similarity-only ranking (MEMORY_RECENCY_WEIGHT = 0, the old behaviour) and
+the blended ranking, plus the time eviction takes to trim 1% of the store.
+
+Run from the repo root:  python -m benchmarks.bench_memory --sizes 10000 100000 1000000
+(1M memories needs a few GB of RAM and takes a while to insert.)
+"""
+
+import argparse
+import os
+import statistics
+import time
+
+os.environ.setdefault("JARVIS_VECTOR_STORE", "memory")
+
+import numpy as np
+
+import memory
+from config import MEMORY_RECENCY_WEIGHT
+from vectorstore import get_client
+
+DIM = 384
+DAY = 86400
+
+
+def unit(v):
+    return v / np.linalg.norm(v, axis=-1, keepdims=True)
+
+
+def noisy(rng, base, amount):
+    return unit(base + amount * unit(rng.standard_normal(base.shape)))
+
+
+def fill(collection, n, now, rng, batch=5000):
+    for start in range(0, n, batch):
+        size = min(batch, n - start)
+        vectors = unit(rng.standard_normal((size, DIM))).astype(np.float32)
+        ts = now - rng.uniform(0, 365 * DAY, size)
+        collection.upsert(
+            ids=[f"f{start + i}" for i in range(size)],
+            embeddings=vectors.tolist(),
+            documents=[f"filler {start + i}" for i in range(size)],
+            metadatas=[{"ts": float(t), "kind": "turn", "role": "user"} for t in ts],
+        )
+
+
+def plant(collection, queries, now, rng):
+    topics = unit(rng.standard_normal((queries, DIM)))
+    old = noisy(rng, topics, 0.45)
+    new = noisy(rng, topics, 0.55)
+    collection.upsert(
+        ids=[f"old{i}" for i in range(queries)] + [f"new{i}" for i in range(queries)],
+        embeddings=np.vstack([old, new]).astype(np.float32).tolist(),
+        documents=[f"old {i}" for i in range(queries)] + [f"new {i}" for i in range(queries)],
+        metadatas=[{"ts": now - 365 * DAY, "kind": "turn", "role": "user"}] * queries
+        + [{"ts": now - DAY, "kind": "turn", "role": "user"}] * queries,
+    )
+    return noisy(rng, topics, 0.3).astype(np.float32)
+
+
+def measure(query_vectors, now, weight):
+    latencies, hits = [], 0
+    for i, q in enumerate(query_vectors):
+        start = time.perf_counter()
+        docs = memory.recall_memory("", k=3, embedding=q, now=now, recency_weight=weight)
+        latencies.append(time.perf_counter() - start)
+        hits += bool(docs) and docs[0] == f"new {i}"
+    latencies.sort()
+    p95 = latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))]
+    return statistics.median(latencies), p95, hits / len(query_vectors)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--queries", type=int, default=100)
+    args = parser.parse_args()
+
+    memory.MEMORY_ARCHIVE_PATH = None  # measure eviction without archive I/O
+    rng = np.random.default_rng(0)
+    now = time.time()
+
+    for n in args.sizes:
+        name = f"bench_memory_{n}"
+        collection = memory.collection = get_client().get_or_create_collection(name)
+
+        start = time.perf_counter()
+        fill(collection, n, now, rng)
+        queries = plant(collection, args.queries, now, rng)
+        fill_s = time.perf_counter() - start
+
+        print(f"{n:>9,} memories (inserted in {fill_s:.1f}s)")
+        for label, weight in (("similarity", 0.0), ("blended", MEMORY_RECENCY_WEIGHT)):
+            p50, p95, hit = measure(queries, now, weight)
+            print(f"    {label:<10} recall p50 {p50 * 1000:6.2f}ms  p95 {p95 * 1000:6.2f}ms  "
+                  f"newest-fact hit@1 {hit:.0%}")
+
+        start = time.perf_counter()
+        evicted = memory.evict(max_items=collection.count() - n // 100)
+        print(f"    evict      {evicted:,} oldest in {time.perf_counter() - start:.2f}s")
+        get_client().delete_collection(name)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Memory writes: time spent in the turn, before and after the write-behind queue.
+
+Stores N conversation lines (with some repeats, as real conversations
+have) into a fresh in-memory store two ways:
+  - direct:  embed + insert per call, as store_memory used to do
+  - queued:  memory.store_memory, which only enqueues
+Reports the per-call latency the turn would see, total time until
+everything is durable (including the final flush), the number of batches,
+and how many repeats or near-duplicates were folded away.
+
+Run from the repo root:  python -m benchmarks.bench_memory_writes --lines 500
+"""
+
+import argparse
+import os
+import random
+import statistics
+import time
+
+os.environ.setdefault("JARVIS_VECTOR_STORE", "memory")
+
+import memory
+from embeddings import get_embedder
+from vectorstore import get_collection
+
+
+def make_lines(n, seed=7):
+    rng = random.Random(seed)
+    topics = ["weather", "python", "music", "dinner", "meeting", "travel", "books", "the garden"]
+    lines = []
+    for i in range(n):
+        if lines and rng.random() < 0.2:
+            lines.append(rng.choice(lines))     # repeated phrase
+        else:
+            who = "User" if i % 2 == 0 else "Jarvis"
+            lines.append(f"{who}: let's talk about {rng.choice(topics)} number {i}")
+    return lines
+
+
+def direct(lines):
+    collection = get_collection("bench_memory_direct")
+    latencies, errors = [], 0
+    for i, text in enumerate(lines):
+        start = time.perf_counter()
+        try:
+            emb = get_embedder().encode_batch([text], cache=False)[0].tolist()
+            collection.add(embeddings=[emb], documents=[text], ids=[f"{i}-{hash(text)}"])
+        except Exception:
+            errors += 1
+        latencies.append(time.perf_counter() - start)
+    return latencies, collection.count()
+
+
+def queued(lines, dedup):
+    memory.collection = get_collection("bench_memory_queued")
+    writer = memory.writer = memory.MemoryWriter(dedup_similarity=dedup)
+    latencies = []
+    for text in lines:
+        start = time.perf_counter()
+        memory.store_memory(text)
+        latencies.append(time.perf_counter() - start)
+    flush_start = time.perf_counter()
+    memory.flush_memory()
+    return latencies, time.perf_counter() - flush_start, writer, memory.collection.count()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--lines", type=int, default=500)
+    parser.add_argument("--dedup", type=float, default=None, help="near-duplicate similarity threshold")
+    args = parser.parse_args()
+
+    lines = make_lines(args.lines)
+    get_embedder().load()
+
+    start = time.perf_counter()
+    lat, stored = direct(lines)
+    total = time.perf_counter() - start
+    print(f"direct  per call p50 {statistics.median(lat) * 1000:6.2f}ms  max {max(lat) * 1000:6.2f}ms  "
+          f"total {total:.2f}s  stored {stored}")
+
+    start = time.perf_counter()
+    lat, flush, writer, stored = queued(lines, args.dedup)
+    total = time.perf_counter() - start
+    print(f"queued  per call p50 {statistics.median(lat) * 1000:6.3f}ms  max {max(lat) * 1000:6.3f}ms  "
+          f"total {total:.2f}s (final flush {flush:.2f}s)  stored {stored}  "
+          f"batches {writer.batches}  near-duplicates skipped {writer.skipped}")
+
+
+if __name__ == "__main__":
+    main()
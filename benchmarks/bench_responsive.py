@@ -0,0 +1,125 @@
+"""
+Event loop responsiveness while a slow reply streams.
+
+Runs the app on the stand-ins from benchmarks/stubs.py with a slow model
+(default 4 tokens/s) and Piper voice, so a reply takes many seconds. While
+client A's reply is streaming, the benchmark repeatedly measures:
+  - toggle:   A sends `voice_toggle` followed by a WebSocket ping; time to the pong
+  - connect:  a second client B connects; time to the readiness message
+and finally A sends `cancel` and waits for `cancelled`. If anything in the
+message path (streaming, retrieval, TTS) blocked the event loop, these
+would wait for the next token or the next synthesized sentence. Exits
+non-zero if any probe takes longer than --bound.
+
+`--blocking` swaps in the synchronous Ollama client on the event loop (the
+old behaviour), to show what the check catches.
+
+Run from the repo root:  python -m benchmarks.bench_responsive --trials 3
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import sys
+import time
+
+from benchmarks.bench_e2e import pct, start_server
+from benchmarks import stubs
+
+REPLY = " ".join(["This is a deliberately slow reply that keeps streaming for a while."] * 6)
+
+
+async def reader(ws, events):
+    """Consume A's messages (so pongs keep flowing) and note the ones the probes wait for."""
+    async for data in ws:
+        if isinstance(data, str):
+            kind = json.loads(data).get("type")
+            if kind in events:
+                events[kind].set()
+
+
+async def trial(url, probes, interval):
+    import websockets
+
+    toggle, connect = [], []
+    async with websockets.connect(url) as a:
+        events = {"token": asyncio.Event(), "cancelled": asyncio.Event()}
+        task = asyncio.create_task(reader(a, events))
+        await a.send(json.dumps({"type": "voice_toggle", "enabled": False}))
+        await a.send(json.dumps({"text": "tell me a long story"}))
+        await events["token"].wait()
+
+        for _ in range(probes):
+            await asyncio.sleep(interval)
+            start = time.perf_counter()
+            await a.send(json.dumps({"type": "voice_toggle", "enabled": False}))
+            await (await a.ping())
+            toggle.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            async with websockets.connect(url) as b:
+                await b.recv()   # startup readiness snapshot
+                connect.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await a.send(json.dumps({"type": "cancel"}))
+        await events["cancelled"].wait()
+        cancel = time.perf_counter() - start
+        task.cancel()
+    return toggle, connect, cancel
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--trials", type=int, default=3)
+    parser.add_argument("--probes", type=int, default=10, help="probes per trial while the reply streams")
+    parser.add_argument("--interval", type=float, default=0.15, help="seconds between probes")
+    parser.add_argument("--rate", type=float, default=4, help="stub LLM tokens/sec")
+    parser.add_argument("--tts-rtf", type=float, default=0.5, help="stub Piper seconds per audio second")
+    parser.add_argument("--bound", type=float, default=0.1, help="max seconds any probe may take")
+    parser.add_argument("--blocking", action="store_true", help="stream with the blocking client on the event loop")
+    parser.add_argument("--verbose", action="store_true", help="show the app's own logging")
+    args = parser.parse_args()
+
+    backends = stubs.install(
+        "tell me a long story",
+        llm={"reply": REPLY, "ttft": 0.1, "rate": args.rate},
+        voice=stubs.StubVoice(rtf=args.tts_rtf),
+    )
+
+    import app
+
+    if args.blocking:
+        session = backends["llm"]
+
+        async def blocking_astream(messages):
+            for token in session.stream(messages):
+                yield token
+
+        session.astream = blocking_astream
+
+    quiet = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+    with quiet:
+        server, loop, port = start_server(app)
+        url = f"ws://127.0.0.1:{port}/ws/chat"
+        results = [asyncio.run(trial(url, args.probes, args.interval)) for _ in range(args.trials)]
+        server.should_exit = True
+
+    toggle = [t for r in results for t in r[0]]
+    connect = [t for r in results for t in r[1]]
+    cancel = [r[2] for r in results]
+    mode = "blocking client" if args.blocking else "async client"
+    print(f"stub model at {args.rate:g} tok/s ({mode}), {args.trials} trials × {args.probes} probes")
+    for name, values in (("toggle", toggle), ("connect", connect), ("cancel", cancel)):
+        print(f"{name:<8} p50 {pct(values, 50) * 1000:6.1f}ms  p95 {pct(values, 95) * 1000:6.1f}ms  "
+              f"max {max(values) * 1000:6.1f}ms")
+    worst = max(toggle + connect + cancel)
+    if worst > args.bound:
+        sys.exit(f"\nSlowest probe {worst * 1000:.0f}ms exceeds the {args.bound * 1000:.0f}ms bound")
+    print(f"\nAll probes within {args.bound * 1000:.0f}ms")
+
+
+if __name__ == "__main__":
+    main()
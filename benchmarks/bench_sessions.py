@@ -0,0 +1,136 @@
+"""
+Multi-client load test: N concurrent WebSocket sessions against a stub model.
+
+Starts app.py's FastAPI app with uvicorn on a free local port, replacing the
+LLM with a stub that streams tokens at a fixed rate (and counts how many
+generations overlap), and retrieval/TTS/memory with no-ops. Every client
+connects, sends one message and waits for `stream_end`. Reports time to
+first token and turn latency percentiles, how many clients were queued, and
+the peak number of concurrent generations (must not exceed
+MAX_CONCURRENT_GENERATIONS).
+
+Run from the repo root:  python -m benchmarks.bench_sessions --clients 50
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import tempfile
+import threading
+import time
+
+os.environ.setdefault("JARVIS_VECTOR_STORE", "memory")
+os.environ.setdefault("JARVIS_DATA_DIR", tempfile.mkdtemp(prefix="jarvis-bench-"))
+os.environ.setdefault("JARVIS_RESPONSE_CACHE", "0")
+
+import uvicorn
+import websockets
+
+import app
+from retrieval import RetrievedContext
+
+
+class StubModel:
+    def __init__(self, tokens, rate):
+        self.tokens, self.delay = tokens, 1.0 / rate
+        self.active = self.peak = 0
+
+    async def astream(self, messages):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            for i in range(self.tokens):
+                await asyncio.sleep(self.delay)
+                yield f"word{i} "
+        finally:
+            self.active -= 1
+
+
+class SilentPipeline:
+    sentences = 0
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def feed(self, token):
+        pass
+
+    def cancel(self):
+        pass
+
+    async def finish(self):
+        pass
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def client(url, i, results):
+    async with websockets.connect(url) as ws:
+        await ws.send(json.dumps({"type": "voice_toggle", "enabled": False}))
+        start = time.perf_counter()
+        await ws.send(json.dumps({"text": f"hello from client {i}"}))
+        ttft, queued = None, False
+        while True:
+            msg = json.loads(await ws.recv())
+            if msg["type"] == "queued":
+                queued = True
+            elif msg["type"] == "token" and ttft is None:
+                ttft = time.perf_counter() - start
+            elif msg["type"] == "stream_end":
+                break
+        results.append({"ttft": ttft, "total": time.perf_counter() - start, "queued": queued})
+
+
+def pct(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(p / 100 * len(values)))]
+
+
+async def run(url, n):
+    results = []
+    start = time.perf_counter()
+    await asyncio.gather(*(client(url, i, results) for i in range(n)))
+    return results, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--tokens", type=int, default=40)
+    parser.add_argument("--rate", type=float, default=200, help="stub tokens/sec per generation")
+    args = parser.parse_args()
+
+    model = StubModel(args.tokens, args.rate)
+    app.get_session = lambda name: model
+    app.retrieve = lambda text: RetrievedContext()
+    app.route_intent = lambda text: None
+    app.store_memory = lambda text: None
+    app.AsyncSpeechPipeline = SilentPipeline
+
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config(app.app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+
+    results, elapsed = asyncio.run(run(f"ws://127.0.0.1:{port}/ws/chat", args.clients))
+    server.should_exit = True
+
+    ttfts = [r["ttft"] for r in results]
+    totals = [r["total"] for r in results]
+    print(f"clients            {len(results)} in {elapsed:.2f}s")
+    print(f"peak generations   {model.peak} (limit {app.scheduler.max_concurrent})")
+    print(f"queued clients     {sum(r['queued'] for r in results)}")
+    print(f"TTFT   p50 {statistics.median(ttfts):.3f}s  p95 {pct(ttfts, 95):.3f}s  max {max(ttfts):.3f}s")
+    print(f"turn   p50 {statistics.median(totals):.3f}s  p95 {pct(totals, 95):.3f}s  max {max(totals):.3f}s")
+
+
+if __name__ == "__main__":
+    main()
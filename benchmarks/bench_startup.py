@@ -0,0 +1,76 @@
+"""
+Vector store startup benchmark: cold vs warm launch.
+
+Each launch runs in a fresh interpreter against the same data directory:
+the first (cold) one creates the store and embeds a synthetic knowledge
+corpus, later (warm) ones should only reopen the collections and find every
+file unchanged. Model load time is reported separately since it is paid on
+every launch regardless of the store.
+
+Run from the repo root:  python -m benchmarks.bench_startup --files 500
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.bench_index import make_corpus
+
+CHILD = r"""
+import json, sys, time
+t0 = time.perf_counter()
+import vectorstore
+from memory import collection as memory
+memory.count()  # collections open lazily
+t1 = time.perf_counter()
+from knowledge.rag import index_knowledge, collection as knowledge
+t2 = time.perf_counter()
+stats = index_knowledge(sys.argv[1])
+t3 = time.perf_counter()
+print(json.dumps({
+    "memory_open_s": t1 - t0,
+    "knowledge_import_s": t2 - t1,
+    "index_s": t3 - t2,
+    "indexed": stats["indexed"],
+    "chunks": knowledge.count(),
+}))
+"""
+
+
+def launch(corpus, data_dir):
+    env = dict(os.environ, JARVIS_DATA_DIR=data_dir, JARVIS_VECTOR_STORE="persistent")
+    start = time.perf_counter()
+    out = subprocess.run(
+        [sys.executable, "-c", CHILD, corpus],
+        env=env, capture_output=True, text=True, check=True,
+    ).stdout
+    result = json.loads(out.strip().splitlines()[-1])
+    result["wall_s"] = time.perf_counter() - start
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=500)
+    parser.add_argument("--warm-runs", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as corpus, tempfile.TemporaryDirectory() as data:
+        make_corpus(corpus, args.files, 400)
+        runs = [("cold", launch(corpus, data))]
+        runs += [(f"warm {i + 1}", launch(corpus, data)) for i in range(args.warm_runs)]
+
+    print(f"{'launch':<8} {'wall':>7} {'mem open':>9} {'kb import':>10} {'index':>7} {'indexed':>8} {'chunks':>7}")
+    for label, r in runs:
+        print(
+            f"{label:<8} {r['wall_s']:7.2f} {r['memory_open_s']:9.2f} {r['knowledge_import_s']:10.2f} "
+            f"{r['index_s']:7.2f} {r['indexed']:8d} {r['chunks']:7d}"
+        )
+
+
+if __name__ == "__main__":
+    main()
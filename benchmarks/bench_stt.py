@@ -0,0 +1,62 @@
+"""
+Speech-to-text engine: one utterance at a time vs batched.
+
+Decodes N copies of a recording (input.wav by default) with the configured
+STTEngine three ways:
+  - sequential:  transcribe_text per utterance, as the voice loop does
+  - batch:       one transcribe_batch call over all of them
+  - submit:      N threads submitting at once through the batcher queue
+Reports wall time, utterances/sec and real-time factor for each, and the
+word error rate of the batched outputs against the sequential ones (the
+batched path does not condition on previous text, so small differences
+are expected). Use the JARVIS_STT_MODEL / config.py settings to compare
+tiers and thread counts; `python stt.py` searches them automatically.
+
+Run from the repo root:  python -m benchmarks.bench_stt --utterances 8
+"""
+
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from stt import SAMPLE_RATE, STTEngine, read_clip, wer
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--wav", default="input.wav", help="recorded utterance (16 kHz, 16-bit mono)")
+    parser.add_argument("--utterances", type=int, default=8)
+    args = parser.parse_args()
+
+    audio = read_clip(args.wav)
+    audios = [audio] * args.utterances
+    engine = STTEngine(autotune=False)
+    engine.load()
+    reference = engine.transcribe_text(audio)  # warmup
+    print(f"Model: {engine.config.model}, {engine.config.threads} threads × {engine.config.num_workers} workers, "
+          f"beam {engine.config.beam_size}, VAD filter {'on' if engine.config.vad_filter else 'off'}")
+    print(f"Reference: {reference!r}\n")
+
+    def sequential():
+        return [engine.transcribe_text(a) for a in audios]
+
+    def submitted():
+        with ThreadPoolExecutor(max_workers=len(audios)) as pool:
+            futures = list(pool.map(engine.submit, audios))
+        return [f.result() for f in futures]
+
+    audio_seconds = len(audio) / SAMPLE_RATE * len(audios)
+    print(f"{'mode':<11} {'wall':>7} {'utt/s':>7} {'RTF':>6} {'WER':>6}")
+    for name, run in (("sequential", sequential),
+                      ("batch", lambda: engine.transcribe_batch(audios)),
+                      ("submit", submitted)):
+        start = time.perf_counter()
+        texts = run()
+        elapsed = time.perf_counter() - start
+        error = sum(wer(reference, t) for t in texts) / len(texts)
+        print(f"{name:<11} {elapsed:7.2f} {len(audios) / elapsed:7.2f} {elapsed / audio_seconds:6.3f} {error:6.1%}")
+    print(f"\nEngine: {engine.stats()}")
+
+
+if __name__ == "__main__":
+    main()
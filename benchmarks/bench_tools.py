@@ -0,0 +1,108 @@
+"""
+Tool runtime checks: timeouts, output cap, concurrency bound, caching and
+event-loop responsiveness.
+
+Runs real shell commands through agent.ToolRuntime (no apps are opened):
+  - timeout:     `sleep 30` with a 0.5s limit must come back in ~0.5s and
+                 the process must be gone
+  - output cap:  `yes` (endless output) must stop at TOOL_OUTPUT_LIMIT chars
+                 and stream its output in chunks
+  - concurrency: N parallel `sleep` calls never exceed the worker count
+  - cache:       repeated get_time calls inside the TTL are served from cache
+  - loop lag:    a 1s command awaited via `run` doesn't block the event loop
+
+Each check prints PASS/FAIL; the exit code is non-zero if any failed.
+
+Run from the repo root:  python -m benchmarks.bench_tools
+"""
+
+import asyncio
+import subprocess
+import sys
+import time
+
+from agent import TOOLS, ToolRuntime, ToolSpec
+from config import TOOL_OUTPUT_LIMIT
+from tools import run_command
+
+results = []
+
+
+def check(name, ok, detail):
+    results.append(ok)
+    print(f"{'PASS' if ok else 'FAIL'}  {name:<12} {detail}")
+
+
+def bench_timeout():
+    marker = f"sleep 30.{time.time_ns() % 1000:03d}"
+    start = time.perf_counter()
+    out = run_command(marker, timeout=0.5)
+    elapsed = time.perf_counter() - start
+    leftover = subprocess.run(["pgrep", "-f", marker], capture_output=True).stdout.strip()
+    check("timeout", elapsed < 1.0 and "timed out" in out and not leftover,
+          f"returned in {elapsed:.2f}s, process {'still running' if leftover else 'killed'}")
+
+
+def bench_output_cap():
+    chunks = []
+    start = time.perf_counter()
+    out = run_command("yes", timeout=5, on_output=chunks.append)
+    elapsed = time.perf_counter() - start
+    body = out.split("\n[output truncated]")[0]
+    check("output cap", len(body) == TOOL_OUTPUT_LIMIT and "truncated" in out and elapsed < 1.0,
+          f"{len(body)} chars kept in {len(chunks)} streamed chunks, {elapsed * 1000:.0f}ms")
+
+
+def bench_concurrency(calls=12, workers=4, seconds=0.3):
+    runtime = ToolRuntime({"run_command": ToolSpec(run_command, timeout=5)}, max_workers=workers)
+
+    async def main():
+        start = time.perf_counter()
+        await asyncio.gather(*(runtime.run("run_command", f"sleep {seconds}") for _ in range(calls)))
+        return time.perf_counter() - start
+
+    elapsed = asyncio.run(main())
+    waves = -(-calls // workers)
+    check("concurrency", runtime.peak <= workers and elapsed < waves * seconds + 0.5,
+          f"{calls} calls, peak {runtime.peak}/{workers} workers, {elapsed:.2f}s (ideal {waves * seconds:.1f}s)")
+
+
+def bench_cache(calls=100):
+    runtime = ToolRuntime({"get_time": TOOLS["get_time"]})
+    for _ in range(calls):
+        runtime.execute("get_time", "")
+    check("cache", runtime.cache_hits >= calls - 2, f"{runtime.cache_hits}/{calls} served from cache")
+
+
+def bench_loop_lag():
+    runtime = ToolRuntime({"run_command": ToolSpec(run_command, timeout=5)})
+
+    async def main():
+        lags = []
+
+        async def ticker():
+            while True:
+                t = time.perf_counter()
+                await asyncio.sleep(0.01)
+                lags.append(time.perf_counter() - t - 0.01)
+
+        task = asyncio.create_task(ticker())
+        await runtime.run("run_command", "sleep 1")
+        task.cancel()
+        return max(lags)
+
+    worst = asyncio.run(main())
+    check("loop lag", worst < 0.05, f"worst event-loop stall {worst * 1000:.1f}ms during a 1s command")
+
+
+def main():
+    bench_timeout()
+    bench_output_cap()
+    bench_concurrency()
+    bench_cache()
+    bench_loop_lag()
+    sys.exit(0 if all(results) else 1)
+
+
+if __name__ == "__main__":
+    main()
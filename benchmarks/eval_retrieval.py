@@ -0,0 +1,82 @@
+"""
+Knowledge retrieval quality: recall@k and latency per search mode.
+
+Indexes the fixture corpus (benchmarks/fixtures/knowledge) into a fresh
+in-memory collection and runs the labelled queries in
+benchmarks/fixtures/knowledge_queries.jsonl (paraphrases, exact identifiers
+and file names) against dense-only, BM25-only and hybrid search. A query is a
+hit at k if a chunk of its labelled source is among the top k passages.
+With --reranker the hybrid results are also reranked by that cross-encoder.
+
+Point --corpus/--queries at your own documents to evaluate them instead.
+
+Run from the repo root:  python -m benchmarks.eval_retrieval [--reranker cross-encoder/ms-marco-MiniLM-L-6-v2]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+
+os.environ.setdefault("JARVIS_VECTOR_STORE", "memory")
+
+from knowledge import rag
+from vectorstore import get_collection
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+KS = (1, 3, 5)
+
+
+def load_queries(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def evaluate(queries, mode, rerank=False):
+    hits = dict.fromkeys(KS, 0)
+    latencies = []
+    for case in queries:
+        start = time.perf_counter()
+        passages = rag.search_passages(case["query"], k=max(KS), mode=mode, rerank=rerank)
+        latencies.append(time.perf_counter() - start)
+        sources = [p["source"] for p in passages]
+        for k in KS:
+            hits[k] += case["source"] in sources[:k]
+    latencies.sort()
+    p95 = latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))]
+    return {k: hits[k] / len(queries) for k in KS}, statistics.median(latencies), p95
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--corpus", default=os.path.join(FIXTURES, "knowledge"))
+    parser.add_argument("--queries", default=os.path.join(FIXTURES, "knowledge_queries.jsonl"))
+    parser.add_argument("--reranker", default=None, help="cross-encoder model for the rerank row")
+    args = parser.parse_args()
+
+    queries = load_queries(args.queries)
+    rag.collection = get_collection("eval_knowledge")
+    rag._bm25 = None
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        stats = rag.index_knowledge(folder=args.corpus, manifest_path=os.path.join(tmp, "manifest.json"))
+        print(f"indexed {stats['files']} files / {stats['chunks']} chunks in "
+              f"{time.perf_counter() - start:.2f}s; {len(queries)} queries")
+
+    rag.get_bm25()
+    runs = [("dense", "dense", False), ("bm25", "bm25", False), ("hybrid", "hybrid", False)]
+    if args.reranker:
+        rag.KNOWLEDGE_RERANKER = args.reranker
+        rag.get_reranker()
+        runs.append(("hybrid+rerank", "hybrid", True))
+
+    for label, mode, rerank in runs:
+        recall, p50, p95 = evaluate(queries, mode, rerank)
+        scores = "  ".join(f"recall@{k} {recall[k]:4.0%}" for k in KS)
+        print(f"{label:<14} {scores}  p50 {p50 * 1000:6.2f}ms  p95 {p95 * 1000:6.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
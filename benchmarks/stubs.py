@@ -0,0 +1,284 @@
+"""
+Deterministic local stand-ins for Jarvis's model and device backends.
+
+Each replaces one backend at the lowest seam the app has, so everything
+above it (sessions, metering, streaming, pipelines, tracing) runs for real:
+
+  - StubOllama / StubAsyncOllama:  ollama.Client / AsyncClient behind a real
+                                   ModelSession (prefill delay, then tokens at
+                                   a fixed rate, with Ollama's final stats chunk)
+  - StubWhisper:                   faster-whisper WhisperModel inside the real
+                                   STTEngine (returns a fixed transcript with
+                                   word timings, after a delay proportional to
+                                   the audio)
+  - StubVoice / StubTTSEngine:     a Piper voice inside the real TTSEngine
+                                   (silence whose length follows the text)
+  - StubEmbedder:                  the MiniLM embedding service (hashed bag of
+                                   words, so similar texts stay similar)
+  - ReplayMicrophone:              the sounddevice microphone; replays WAV
+                                   recordings through the real VAD
+  - stub_sounddevice():            playback for voice_jarvis.py
+
+install() wires them all in; it must run before the app modules are imported
+when the real sounddevice / PortAudio is unavailable (e.g. on CI).
+"""
+
+import asyncio
+import hashlib
+import re
+import sys
+import threading
+import time
+import types
+from collections import deque
+from types import SimpleNamespace
+
+import numpy as np
+
+from config import MODEL, VOICE_MODEL, VAD_HANGOVER_MS
+
+DEFAULT_REPLY = (
+    "The ocean covers about seventy one percent of the planet. "
+    "Its deepest point, the Challenger Deep, is nearly eleven kilometres down."
+)
+
+
+# ─── LLM (Ollama) ───────────────────────────────────────────────────────
+class StubOllama:
+    """Blocking client: `ttft` seconds of prefill, then `reply` at `rate` tokens/s."""
+
+    def __init__(self, reply: str = DEFAULT_REPLY, ttft: float = 0.25, rate: float = 40.0, prompt_tokens: int = 300):
+        self.reply = reply
+        self.ttft = ttft
+        self.delay = 1.0 / rate
+        self.prompt_tokens = prompt_tokens
+        self.requests = 0
+
+    def _chunks(self):
+        self.requests += 1
+        tokens = [w + " " for w in self.reply.split()]
+        for i, token in enumerate(tokens):
+            yield (self.ttft if i == 0 else self.delay), {"message": {"content": token}, "done": False}
+        yield 0.0, self._final(len(tokens))
+
+    def _final(self, n, content=""):
+        return {
+            "message": {"content": content},
+            "done": True,
+            "prompt_eval_count": self.prompt_tokens,
+            "eval_count": n,
+            "eval_duration": int(n * self.delay * 1e9),
+        }
+
+    def _total(self):
+        return self.ttft + self.delay * max(0, len(self.reply.split()) - 1)
+
+    def chat(self, stream=False, **kwargs):
+        if stream:
+            return self._stream()
+        self.requests += 1
+        time.sleep(self._total())
+        return self._final(len(self.reply.split()), self.reply)
+
+    def _stream(self):
+        for delay, chunk in self._chunks():
+            time.sleep(delay)
+            yield chunk
+
+
+class StubAsyncOllama(StubOllama):
+    """The same, as ollama.AsyncClient."""
+
+    async def chat(self, stream=False, **kwargs):
+        if stream:
+            return self._astream()
+        self.requests += 1
+        await asyncio.sleep(self._total())
+        return self._final(len(self.reply.split()), self.reply)
+
+    async def _astream(self):
+        for delay, chunk in self._chunks():
+            await asyncio.sleep(delay)
+            yield chunk
+
+
+# ─── Speech-to-text (faster-whisper) ────────────────────────────────────
+class StubWhisper:
+    """Transcribes any audio as `text`, `words_per_s` words per second of audio.
+
+    Decoding takes `overhead + rtf × audio seconds`. Fast (beam 1) partial
+    decodes only return the words "spoken" so far; the final beam search
+    returns the rest, so StreamingTranscriber commits partials as usual.
+    """
+
+    def __init__(self, text: str, rtf: float = 0.1, overhead: float = 0.03,
+                 words_per_s: float = 3.0, sample_rate: int = 16000):
+        self.words = text.split()
+        self.rtf = rtf
+        self.overhead = overhead
+        self.words_per_s = words_per_s
+        self.sample_rate = sample_rate
+        self.calls = 0
+
+    def transcribe(self, audio, beam_size=5, initial_prompt=None, **kwargs):
+        self.calls += 1
+        seconds = len(audio) / self.sample_rate
+        time.sleep(self.overhead + self.rtf * seconds)
+        done = len(initial_prompt.split()) if initial_prompt else 0
+        remaining = self.words[done:]
+        if beam_size == 1:
+            remaining = remaining[:int(seconds * self.words_per_s)]
+        words = [SimpleNamespace(word=" " + w, start=i / self.words_per_s, end=(i + 1) / self.words_per_s)
+                 for i, w in enumerate(remaining)]
+        segment = SimpleNamespace(text=" ".join(remaining), words=words)
+        return iter([segment]), SimpleNamespace(language="en", duration=seconds)
+
+
+def make_stt_engine(whisper: StubWhisper):
+    """A real STTEngine (stats, batching via the worker pool) whose model is `whisper`."""
+    from stt import STTEngine
+
+    engine = STTEngine(autotune=False)
+    engine._model = whisper
+    engine._pipeline = False
+    return engine
+
+
+# ─── Text-to-speech (Piper) ─────────────────────────────────────────────
+class StubVoice:
+    """A Piper voice that speaks `chars_per_s` characters per second of silence."""
+
+    def __init__(self, sample_rate: int = 22050, chars_per_s: float = 15.0, rtf: float = 0.05, overhead: float = 0.02):
+        self.config = SimpleNamespace(sample_rate=sample_rate)
+        self.chars_per_s = chars_per_s
+        self.rtf = rtf
+        self.overhead = overhead
+
+    def synthesize_stream_raw(self, text):
+        seconds = len(text) / self.chars_per_s
+        time.sleep(self.overhead + self.rtf * seconds)
+        yield bytes(2 * int(seconds * self.config.sample_rate))
+
+
+def make_tts_engine(voice: StubVoice):
+    """A real TTSEngine (worker pool, per-voice lock, stats) whose only voice is `voice`."""
+    from tts import TTSEngine
+
+    class StubTTSEngine(TTSEngine):
+        def _voice(self, model):
+            with self._lock:
+                lock = self._voice_locks.setdefault(model, threading.Lock())
+            return voice, lock
+
+    return StubTTSEngine()
+
+
+# ─── Embeddings ─────────────────────────────────────────────────────────
+def make_embedder(dim: int = 384):
+    """An EmbeddingService (cache, precision) that hashes words instead of running MiniLM."""
+    from embeddings import EmbeddingService
+
+    class StubEmbedder(EmbeddingService):
+        def _encode(self, texts):
+            vectors = np.zeros((len(texts), dim), dtype=np.float32)
+            for row, text in zip(vectors, texts):
+                for word in re.findall(r"\w+", text.lower()):
+                    row[int(hashlib.md5(word.encode()).hexdigest()[:8], 16) % dim] += 1.0
+                norm = np.linalg.norm(row)
+                if norm:
+                    row /= norm
+            return self._convert(vectors)
+
+    return StubEmbedder()
+
+
+# ─── Audio devices ──────────────────────────────────────────────────────
+def make_microphone(paths, sample_rate: int = 16000, speed: float = 1.0, gate: threading.Semaphore | None = None):
+    """A MicrophoneListener that replays `paths` (16-bit WAVs), one recording per listen().
+
+    Chunks arrive at `speed` × real time, followed by enough silence to end
+    the utterance. With a `gate`, each recording waits to acquire it first
+    (release it when a turn finishes, like a user waiting for the reply).
+    Once every recording has played, listen() blocks forever.
+    """
+    from audio_capture import MicrophoneListener, read_wav
+
+    class ReplayMicrophone(MicrophoneListener):
+        def __init__(self):
+            super().__init__(sample_rate)
+            self.recordings = deque(paths)
+            self.played = 0
+
+        def start(self):
+            pass
+
+        def drain(self):
+            super().drain()
+            if self.recordings:
+                threading.Thread(target=self._play, args=(self.recordings.popleft(),), daemon=True).start()
+
+        def _play(self, path):
+            if gate is not None:
+                gate.acquire()
+            pcm, rate = read_wav(path)
+            if rate != self.sample_rate:
+                raise ValueError(f"{path}: {rate} Hz, expected {self.sample_rate} Hz")
+            tail = np.zeros(int(rate * (VAD_HANGOVER_MS / 1000 + 0.3)), dtype=np.int16)
+            pcm = np.concatenate([pcm, tail])
+            step = self.detector.frame_len
+            for start in range(0, len(pcm), step):
+                time.sleep(step / rate / speed)
+                self._frames.put(pcm[start:start + step])
+            self.played += 1
+
+    return ReplayMicrophone()
+
+
+def stub_sounddevice(speed: float = 1.0) -> types.ModuleType:
+    """A `sounddevice` module whose play()/wait() just take the clip's duration / `speed`."""
+    sd = types.ModuleType("sounddevice")
+    state = {"until": 0.0}
+
+    def play(data, samplerate=None, **kwargs):
+        state["until"] = time.perf_counter() + len(data) / (samplerate or 1) / speed
+
+    def wait():
+        time.sleep(max(0.0, state["until"] - time.perf_counter()))
+
+    def stop():
+        state["until"] = 0.0
+
+    def input_stream(*args, **kwargs):
+        raise RuntimeError("no audio input in benchmarks; use make_microphone()")
+
+    sd.play, sd.wait, sd.stop, sd.InputStream = play, wait, stop, input_stream
+    return sd
+
+
+# ─── Wiring ─────────────────────────────────────────────────────────────
+def install(transcript: str, llm=None, whisper=None, voice=None, playback_speed: float = 1.0):
+    """Swap every backend for a stand-in; returns them by name.
+
+    Call before importing app / voice_jarvis (sounddevice is replaced in
+    sys.modules so they import without PortAudio).
+    """
+    sys.modules["sounddevice"] = stub_sounddevice(playback_speed)
+
+    import embeddings
+    import llm as llm_module
+    import stt
+    import tts
+
+    llm = llm or {}
+    session = llm_module.ModelSession(MODEL)
+    session.client = StubOllama(**llm)
+    session.aclient = StubAsyncOllama(**llm)
+    llm_module._sessions[MODEL] = session
+
+    whisper = whisper or StubWhisper(transcript)
+    stt._engine = make_stt_engine(whisper)
+    voice = voice or StubVoice()
+    tts._engine = make_tts_engine(voice)
+    tts._engine.load(VOICE_MODEL)
+    embeddings._service = make_embedder()
+    return {"llm": session, "whisper": whisper, "voice": voice}
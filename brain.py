@@ -1,5 +1,7 @@
-import ollama
 from rich import print
+from llm import get_session
+
+MODEL = "llama3:8b-instruct-q4_K_M"
 
 
 System_prompt='''
@@ -9,6 +11,7 @@ Be concise, clear, and intelligent.
 
 def chat():
     message = [{"role":"system","content":System_prompt}]
+    get_session(MODEL).warm(System_prompt)
     print("[bold green]Jarvis is online.Type exit to quite.[/bold green]")
 
     while True:
@@ -22,17 +25,11 @@ def chat():
         #     model = "llama3:8b-instruct-q4_K_M",
         #     messages=message
         # )
-        stream=ollama.chat(
-            model = "llama3:8b-instruct-q4_K_M",
-            messages=message,
-            stream=True
-        )
         full_reply=""
-        for chunk in stream:
-            token = chunk['message']['content'] 
+        for token in get_session(MODEL).stream(message):
             print(token, end="", flush=True)
             full_reply += token
-        message.append({"role":"assistant","contents":full_reply})
+        message.append({"role":"assistant","content":full_reply})
         print()
         # reply=response["message"]["content"]
         # message.append({"role":"assistant","content":reply})
@@ -1,2 +1,121 @@
+import os
+
 MODEL = "llama3:latest"
-VOICE_MODEL = "voices/en_US-lessac-medium.onnx"
\ No newline at end of file
+VOICE_MODEL = "voices/en_US-lessac-medium.onnx"
+EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+
+# LLM session (llm.py)
+LLM_KEEP_ALIVE = os.environ.get("JARVIS_KEEP_ALIVE", "1h")  # how long Ollama keeps the model loaded; "-1" = forever
+LLM_OPTIONS = {}             # Ollama options sent with every request (keep stable: some force a reload)
+LLM_TTFT_WARN_S = 3.0        # log a warning when time-to-first-token exceeds this
+
+# Embedding service (embeddings.py)
+EMBED_CACHE_SIZE = 2048      # query embeddings kept in the LRU cache
+EMBED_PRECISION = "float32"  # "float32", "float16" or "int8"
+EMBED_BATCH_SIZE = 64
+
+# Conversation context (conversation.py)
+CONTEXT_TOKEN_BUDGET = 2048  # history tokens before older turns are summarized
+CONTEXT_KEEP_TURNS = 4       # most recent user/assistant exchanges kept verbatim
+SUMMARY_MAX_WORDS = 150
+
+# Retrieval (retrieval.py)
+RETRIEVAL_DEADLINE_S = 1.0   # per-turn budget for embedding + memory + knowledge
+
+# Vector store (vectorstore.py)
+VECTOR_STORE_BACKEND = os.environ.get("JARVIS_VECTOR_STORE", "persistent")  # or "memory"
+VECTOR_STORE_DIR = os.environ.get("JARVIS_DATA_DIR", "data/chroma")
+STORE_SCHEMA_VERSION = 1  # bump when stored vectors/chunks change shape
+
+# TTS
+TTS_WORKERS = 2  # concurrent Piper synthesis threads
+
+# Voice activity detection (audio_capture.py)
+VAD_FRAME_MS = 30            # analysis frame length
+VAD_THRESHOLD = 500          # minimum int16 RMS counted as speech
+VAD_PRE_ROLL_MS = 300        # audio kept from before speech onset
+VAD_HANGOVER_MS = 700        # trailing silence that ends an utterance
+VAD_MIN_SPEECH_MS = 200      # shorter bursts are ignored as noise
+VAD_MAX_UTTERANCE_S = 20     # hard cap on a single utterance
+
+# Streaming speech-to-text (stt.py)
+STT_PARTIAL_INTERVAL_S = 0.8  # how often the in-progress utterance is re-decoded
+
+# Speech-to-text engine (stt.py)
+STT_MODEL = os.environ.get("JARVIS_STT_MODEL", "base")  # tiny, base, small, medium, large-v3 (".en" variants: English only, faster)
+STT_COMPUTE_TYPE = "int8"
+STT_CPU_THREADS = 0             # threads per decode (0 = all cores shared between the workers)
+STT_NUM_WORKERS = 1             # decodes that can run at once (batch fallback, concurrent callers)
+STT_BEAM_SIZE = 5               # final decode; partial decodes always use 1
+STT_VAD_FILTER = False          # run faster-whisper's Silero VAD to skip non-speech inside an utterance
+STT_BATCH_SIZE = 8              # queued utterances decoded together by STTEngine.submit
+STT_AUTOTUNE = os.environ.get("JARVIS_STT_AUTOTUNE") == "1"  # pick tier / threads / beam by benchmark at startup
+STT_TUNE_CLIP = "input.wav"     # sample utterance the auto-tune decodes (16 kHz, 16-bit mono)
+STT_TUNE_REFERENCE = None       # its transcript (None = the most accurate candidate's output)
+STT_TUNE_MAX_WER = 0.10         # candidates with a higher word error rate are rejected
+STT_TUNE_TIERS = ("tiny", "base", "small")  # ordered from fastest to most accurate
+STT_TUNE_BEAMS = (1, 5)
+STT_TUNING_PATH = os.path.join(VECTOR_STORE_DIR, "stt_tuning.json")  # last auto-tune result, reused while it matches
+
+# Knowledge indexing (knowledge/rag.py)
+KNOWLEDGE_EXTENSIONS = (".txt", ".md", ".pdf")
+KNOWLEDGE_MANIFEST = os.path.join(VECTOR_STORE_DIR, "knowledge_manifest.json")  # content hashes of indexed files
+CHUNK_WORDS = 180            # fits MiniLM's 256 word-piece window
+CHUNK_OVERLAP = 40
+PDF_WORKERS = 4              # processes used for PDF text extraction
+
+# Sessions (sessions.py)
+MAX_CONCURRENT_GENERATIONS = 2  # LLM streams running at once across all clients
+MAX_PENDING_TURNS = 3           # per client; further messages get a "busy" reply
+CANCEL_TIMEOUT_S = 1.0          # upper bound on waiting for a cancelled turn to unwind
+
+# Barge-in (app.py voice loop)
+BARGE_IN_ENABLED = True
+BARGE_IN_MIN_SPEECH_MS = 300    # speech needed before an in-flight reply is interrupted
+BARGE_IN_DURING_PLAYBACK = False  # the mic also hears Jarvis's own voice; enable with headphones / echo cancellation
+
+# Intent routing (intents.py)
+INTENT_MIN_CONFIDENCE = 0.75    # below this the utterance goes to the LLM instead
+INTENT_SEMANTIC_FALLBACK = False  # embedding-similarity fallback when no rule matches
+INTENT_SEMANTIC_THRESHOLD = 0.72  # cosine similarity needed for a semantic match
+
+# Tools (agent.py, tools.py)
+TOOL_WORKERS = 4                # tool calls running at once; further calls wait for a worker
+TOOL_TIMEOUT_S = 10.0           # default per-tool timeout
+COMMAND_TIMEOUT_S = 15.0        # run_command kills the command after this
+TOOL_OUTPUT_LIMIT = 500         # characters of command output read before the command is stopped
+
+# Memory (memory.py)
+MEMORY_BATCH_SIZE = 32          # writes embedded and upserted together
+MEMORY_FLUSH_INTERVAL_S = 2.0   # max time a write waits in the queue
+MEMORY_DEDUP_SIMILARITY = None  # e.g. 0.95: skip writes this similar to a stored memory (None = off)
+
+# Memory lifecycle (memory.py)
+MEMORY_RECENCY_WEIGHT = 0.2     # share of the recall score that comes from recency (0 = similarity only)
+MEMORY_HALF_LIFE_DAYS = 7.0     # a memory's recency score halves every this many days
+MEMORY_CANDIDATES = 4           # recall fetches k × this nearest memories, then re-ranks
+MEMORY_CONSOLIDATE_AFTER_H = 24.0  # turns older than this are summarized into episodes
+MEMORY_EPISODE_TURNS = 20       # turns per episode summary
+MEMORY_MAX_ITEMS = 50_000       # beyond this the oldest memories are evicted
+MEMORY_ARCHIVE_PATH = os.path.join(VECTOR_STORE_DIR, "memory_archive.jsonl")  # evicted/consolidated turns (None = discard)
+MEMORY_MAINTENANCE_INTERVAL_S = 600.0  # how often the writer runs consolidation + eviction
+
+# Knowledge search (knowledge/rag.py)
+KNOWLEDGE_CANDIDATES = 20       # results taken from each of BM25 and vector search before fusion
+RRF_K = 60                      # reciprocal-rank fusion constant
+KNOWLEDGE_TOKEN_BUDGET = 400    # max (estimated) tokens of passages added to the prompt
+KNOWLEDGE_RERANKER = None       # e.g. "cross-encoder/ms-marco-MiniLM-L-6-v2" to rerank fused results
+RERANK_CANDIDATES = 10          # fused results the reranker scores
+
+# Tracing and profiling (tracing.py)
+TRACE_PATH = os.environ.get("JARVIS_TRACE")  # append one JSON line per finished turn here (None = off)
+TRACE_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)  # histogram bounds, seconds
+PROFILE_INTERVAL_S = 0.01       # stack sampling period while the profiler is on
+PROFILE_DIR = os.path.join(VECTOR_STORE_DIR, "profiles")  # collapsed-stack profiles are written here
+
+# Response cache (response_cache.py)
+RESPONSE_CACHE_ENABLED = os.environ.get("JARVIS_RESPONSE_CACHE", "1") != "0"
+RESPONSE_CACHE_TTL_S = 3600.0   # cached replies expire after this (answers like "what's on my schedule" go stale)
+RESPONSE_CACHE_MAX_ITEMS = 500  # beyond this the least recently used replies (and their audio) are dropped
+RESPONSE_CACHE_SIMILARITY = None  # e.g. 0.95: also serve rephrased questions this cosine-similar (None = exact only)
+RESPONSE_CACHE_DIR = os.path.join(VECTOR_STORE_DIR, "response_cache")  # index.json + one WAV per reply
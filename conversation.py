@@ -0,0 +1,118 @@
+"""
+Token-budgeted conversation history.
+
+The stored history holds only what was actually said: the user's words and
+the assistant's replies. Retrieved memory/knowledge is attached to the
+outgoing copy of the latest user message in `build()` and never persisted,
+so it is sent once instead of on every later turn.
+
+When the history exceeds `budget` tokens, everything but the last
+`keep_recent` exchanges is moved out and folded into a rolling summary by a
+background worker. The prompt is therefore bounded by roughly system prompt
++ summary + budget + the current turn's context, no matter how long the
+session runs.
+"""
+
+import math
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from config import MODEL, CONTEXT_TOKEN_BUDGET, CONTEXT_KEEP_TURNS, SUMMARY_MAX_WORDS
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token for English with llama3)."""
+    return math.ceil(len(text) / 4)
+
+
+def summarize_with_ollama(summary: str, turns: list, model: str = MODEL) -> str:
+    """Fold `turns` into the running `summary` using the local LLM."""
+    from llm import get_session
+
+    transcript = "\n".join(f"{m['role']}: {m['content']}" for m in turns)
+    prompt = (
+        f"Update the summary of a conversation between a user and Jarvis.\n"
+        f"Keep facts, names, preferences, decisions and open requests. "
+        f"Use at most {SUMMARY_MAX_WORDS} words. Reply with the summary only.\n\n"
+        f"Current summary:\n{summary or '(none)'}\n\nNew messages:\n{transcript}"
+    )
+    return get_session(model).chat([{"role": "user", "content": prompt}]).strip()
+
+
+class Conversation:
+    def __init__(
+        self,
+        system_prompt: str,
+        budget: int = CONTEXT_TOKEN_BUDGET,
+        keep_recent: int = CONTEXT_KEEP_TURNS,
+        summarize=summarize_with_ollama,
+        count_tokens=estimate_tokens,
+    ):
+        self.system_prompt = system_prompt
+        self.budget = budget
+        self.keep_recent = keep_recent
+        self.summarize = summarize
+        self.count_tokens = count_tokens
+        self.history = []
+        self.summary = ""
+        self._pending = []          # turns waiting to be folded into the summary
+        self._summarizing = None    # Future of the latest summarization run
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="summarize")
+
+    def add_user(self, text: str):
+        with self._lock:
+            self.history.append({"role": "user", "content": text})
+
+    def add_assistant(self, text: str):
+        with self._lock:
+            self.history.append({"role": "assistant", "content": text})
+            self._maybe_compact()
+
+    def tokens(self, messages) -> int:
+        return sum(self.count_tokens(m["content"]) for m in messages)
+
+    def build(self, context: str = "") -> list:
+        """Messages for the next LLM call, with `context` attached to the latest user turn only."""
+        with self._lock:
+            messages = [{"role": "system", "content": self.system_prompt}]
+            if self.summary:
+                messages.append({"role": "system", "content": "Summary of the earlier conversation:\n" + self.summary})
+            history = list(self.history)
+
+        if context and history and history[-1]["role"] == "user":
+            history[-1] = {"role": "user", "content": history[-1]["content"] + context}
+        return messages + history
+
+    def _maybe_compact(self):
+        if self.tokens(self.history) <= self.budget:
+            return
+        cut = len(self.history) - 2 * self.keep_recent
+        if cut <= 0:
+            return
+        self._pending.extend(self.history[:cut])
+        self.history = self.history[cut:]
+        # Single worker: runs queue up and an extra one with nothing pending is a no-op
+        self._summarizing = self._pool.submit(self._summarize_pending)
+
+    def _summarize_pending(self):
+        while True:
+            with self._lock:
+                batch = list(self._pending)
+                summary = self.summary
+            if not batch:
+                return
+            try:
+                summary = self.summarize(summary, batch)
+            except Exception as e:
+                print(f"Summarization error: {e}")
+                return
+            with self._lock:
+                self.summary = summary
+                del self._pending[:len(batch)]
+
+    def wait(self):
+        """Block until background summarization has caught up."""
+        fut = self._summarizing
+        if fut is not None:
+            fut.result()
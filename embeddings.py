@@ -0,0 +1,135 @@
+"""
+Shared embedding service.
+
+One lazily loaded SentenceTransformer serves memory, knowledge and any other
+retrieval code, instead of each module loading its own copy at import time.
+Query embeddings go through a bounded LRU cache keyed by normalized text, so
+the same user utterance embedded for memory recall and for knowledge search
+is only encoded once.
+
+EMBED_PRECISION controls the dtype of returned vectors:
+  - "float32": model output as-is
+  - "float16": half the memory, same ranking for practical purposes
+  - "int8":    unit vectors scaled by 127 and rounded (a quarter of the
+               memory); distances are scaled too, so a store must not mix
+               int8 with float vectors — the vector store schema includes
+               the precision for that reason.
+"""
+
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from config import EMBEDDING_MODEL, EMBED_CACHE_SIZE, EMBED_PRECISION, EMBED_BATCH_SIZE
+
+
+def normalize(text: str) -> str:
+    # all-MiniLM-L6-v2 uses an uncased tokenizer, so case folding doesn't
+    # change the embedding.
+    return " ".join(text.lower().split())
+
+
+class EmbeddingService:
+    def __init__(self, model_name=EMBEDDING_MODEL, cache_size=EMBED_CACHE_SIZE, precision=EMBED_PRECISION):
+        self.model_name = model_name
+        self.cache_size = cache_size
+        self.precision = precision
+        self._model = None
+        self._load_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def model(self):
+        if self._model is None:
+            with self._load_lock:
+                if self._model is None:
+                    from sentence_transformers import SentenceTransformer
+
+                    print(f"⏳ Loading embedding model {self.model_name} …")
+                    self._model = SentenceTransformer(self.model_name)
+        return self._model
+
+    def load(self):
+        return self.model
+
+    def _convert(self, vectors: np.ndarray) -> np.ndarray:
+        if self.precision == "float16":
+            return vectors.astype(np.float16)
+        if self.precision == "int8":
+            return np.clip(np.rint(vectors * 127), -127, 127).astype(np.int8)
+        return vectors.astype(np.float32, copy=False)
+
+    def _encode(self, texts):
+        vectors = self.model.encode(
+            texts,
+            batch_size=EMBED_BATCH_SIZE,
+            show_progress_bar=False,
+            convert_to_numpy=True,
+        )
+        return self._convert(vectors)
+
+    def encode(self, text: str) -> np.ndarray:
+        """Embed a single query, served from the LRU cache when possible."""
+        return self.encode_batch([text])[0]
+
+    def encode_batch(self, texts, cache: bool = True) -> np.ndarray:
+        """Embed many texts in one model call.
+
+        With `cache=True` hits are served from the LRU cache and only misses
+        are encoded. Bulk indexing should pass `cache=False` so documents
+        don't evict the query embeddings the cache is meant for.
+        """
+        if not cache:
+            return self._encode(list(texts))
+
+        keys = [normalize(t) for t in texts]
+        found = {}
+        with self._lock:
+            for key in keys:
+                vec = self._cache.get(key)
+                if vec is not None:
+                    self._cache.move_to_end(key)
+                    found[key] = vec
+        missing = list(dict.fromkeys(k for k in keys if k not in found))
+
+        if missing:
+            vectors = self._encode(missing)
+            with self._lock:
+                for key, vec in zip(missing, vectors):
+                    found[key] = vec
+                    self._cache[key] = vec
+                    self._cache.move_to_end(key)
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+
+        with self._lock:
+            self.hits += len(keys) - len(missing)
+            self.misses += len(missing)
+        return np.stack([found[k] for k in keys])
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 3) if total else 0.0,
+                "cached": len(self._cache),
+                "precision": self.precision,
+            }
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_embedder() -> EmbeddingService:
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = EmbeddingService()
+        return _service
@@ -0,0 +1,227 @@
+"""
+Intent router: decides whether an utterance is a direct tool command.
+
+Replaces the substring if-chain that app.py and voice_jarvis.py each had,
+where any sentence containing "time" or "search" skipped the LLM and
+"what time is it in the terminal" opened Terminal.
+
+Rules are declarative (RULES below) and match the whole utterance, allowing
+polite filler around the command ("hey jarvis, could you open chrome
+please"). They are compiled into one regex with a named group per rule,
+ordered by confidence, so routing is a single `fullmatch` no matter how many
+rules there are. App names come from tools.APPS plus spoken aliases.
+
+When no rule matches, an optional fallback compares the utterance with
+example phrasings using the shared MiniLM embedder (INTENT_SEMANTIC_FALLBACK).
+It only covers intents whose argument can be recovered from the text
+(get_time, open_app with a known app name).
+
+Anything under INTENT_MIN_CONFIDENCE goes to the LLM, which can still
+answer with an ACTION line.
+"""
+
+import re
+import threading
+from dataclasses import dataclass
+
+import numpy as np
+
+from agent import execute_tool
+from config import INTENT_MIN_CONFIDENCE, INTENT_SEMANTIC_FALLBACK, INTENT_SEMANTIC_THRESHOLD
+from tools import APPS
+
+
+@dataclass
+class Rule:
+    tool: str
+    patterns: list[str]     # may use {polite}, {app} and {end}; at most one (?P<arg>…) group
+    confidence: float
+
+
+@dataclass
+class Intent:
+    tool: str
+    arg: str
+    confidence: float
+    source: str             # "rule" or "semantic"
+
+
+# Spoken names → tools.APPS keys
+APP_ALIASES = {
+    **{name: name for name in APPS},
+    "google chrome": "chrome",
+    "vs code": "vscode",
+    "visual studio code": "vscode",
+    "visual studio": "vscode",
+    "code": "vscode",
+    "you tube": "youtube",
+}
+
+_FILLER = {
+    # Optional lead-in, e.g. "hey jarvis, can you please "
+    "polite": r"(?:(?:hey|ok|okay|please|jarvis|can you|could you|would you|go ahead and)[,\s]+)*",
+    # Optional tail, e.g. " for me please."
+    "end": r"(?:[,\s]+(?:please|for me|now|right now|thanks))*[.!?]*",
+    # Words that show "google" / "look up" isn't a command with an object
+    # ("Google is a big company", "look up at the sky")
+    "not_object": r"(?!(?:is|was|are|were|has|had|does|did|will|can|could|and|or|but|at|to|into|from|over|there|here)\b)",
+}
+
+RULES = [
+    Rule("open_app", [r"{polite}(?:open|launch|start|fire up|bring up)\s+(?:up\s+)?(?:the\s+)?(?P<arg>{app})(?:\s+app)?{end}"], 0.95),
+    Rule("get_time", [
+        r"{polite}what(?:'s|\s+is)\s+the\s+(?:current\s+)?time{end}",
+        r"{polite}what\s+time\s+is\s+it{end}",
+        r"{polite}tell\s+me\s+the\s+(?:current\s+)?time{end}",
+        r"{polite}(?:the\s+)?(?:current\s+)?time{end}",
+    ], 0.95),
+    Rule("run_command", [r"{polite}run\s+(?:the\s+)?command\s+(?P<arg>.+?)[.!?]?"], 0.95),
+    # Searching needs an explicit object: "search (the web) for …", "google …", "look up …"
+    Rule("search_google", [
+        r"{polite}search\s+(?:(?:google|the\s+web|the\s+internet|online)\s+)?for\s+(?P<arg>.+?)[.!?]*",
+        r"{polite}google(?:\s+for)?\s+{not_object}(?P<arg>.+?)[.!?]*",
+        r"{polite}look\s+up\s+{not_object}(?P<arg>.+?)[.!?]*",
+    ], 0.9),
+    Rule("open_app", [r"{polite}(?:the\s+)?(?P<arg>{app}){end}"], 0.8),
+]
+
+# Example phrasings for the embedding fallback
+SEMANTIC_EXAMPLES = {
+    "get_time": [
+        "what time is it",
+        "do you know what time it is",
+        "what's the time right now",
+        "can you check the clock",
+        "how late is it",
+    ],
+    "open_app": [
+        "open chrome",
+        "launch the browser",
+        "pull up the terminal",
+        "start visual studio code",
+        "put youtube on",
+    ],
+}
+
+
+def _app_pattern() -> str:
+    names = sorted(APP_ALIASES, key=len, reverse=True)
+    return "|".join(r"\s+".join(map(re.escape, name.split())) for name in names)
+
+
+def _clean_arg(arg: str) -> str:
+    return " ".join(arg.split()).strip(" ,")
+
+
+class IntentRouter:
+    def __init__(self, rules=RULES, min_confidence: float = INTENT_MIN_CONFIDENCE,
+                 semantic: bool = INTENT_SEMANTIC_FALLBACK,
+                 semantic_threshold: float = INTENT_SEMANTIC_THRESHOLD):
+        self.min_confidence = min_confidence
+        self.semantic = semantic
+        self.semantic_threshold = semantic_threshold
+        self._rules = []
+        self._pattern = self._compile(rules)
+        self._app_finder = re.compile(rf"\b(?:{_app_pattern()})\b", re.IGNORECASE)
+        self._examples = None   # (tools, unit vectors), built on first semantic lookup
+        self._examples_lock = threading.Lock()
+
+    def _compile(self, rules):
+        fills = {**_FILLER, "app": _app_pattern()}
+        alternatives = []
+        for rule in sorted(rules, key=lambda r: r.confidence, reverse=True):
+            for pattern in rule.patterns:
+                name = f"r{len(self._rules)}"
+                body = pattern.format(**fills).replace("(?P<arg>", f"(?P<{name}_arg>")
+                alternatives.append(f"(?P<{name}>{body})")
+                self._rules.append((name, rule))
+        return re.compile("|".join(alternatives), re.IGNORECASE)
+
+    def route(self, text: str) -> Intent | None:
+        """Best tool intent for `text`, or None if it should go to the LLM."""
+        text = " ".join(text.split())
+        if not text:
+            return None
+
+        intent = self._match_rules(text)
+        if intent is None and self.semantic:
+            intent = self._match_semantic(text)
+        if intent is None or intent.confidence < self.min_confidence:
+            return None
+        return intent
+
+    def _match_rules(self, text: str) -> Intent | None:
+        m = self._pattern.fullmatch(text)
+        if m is None:
+            return None
+        groups = m.groupdict()
+        for name, rule in self._rules:
+            if groups[name] is not None:
+                arg = _clean_arg(groups.get(f"{name}_arg") or "")
+                if rule.tool == "open_app":
+                    arg = APP_ALIASES[" ".join(arg.lower().split())]
+                return Intent(rule.tool, arg, rule.confidence, "rule")
+        return None
+
+    def _example_vectors(self):
+        if self._examples is None:
+            with self._examples_lock:
+                if self._examples is None:
+                    from embeddings import get_embedder
+
+                    tools, texts = [], []
+                    for tool, examples in SEMANTIC_EXAMPLES.items():
+                        tools += [tool] * len(examples)
+                        texts += examples
+                    vectors = get_embedder().encode_batch(texts).astype(np.float32)
+                    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+                    self._examples = (tools, vectors)
+        return self._examples
+
+    def _match_semantic(self, text: str) -> Intent | None:
+        from embeddings import get_embedder
+
+        tools, vectors = self._example_vectors()
+        query = get_embedder().encode(text).astype(np.float32)
+        query /= np.linalg.norm(query)
+        scores = vectors @ query
+        best = int(np.argmax(scores))
+        score, tool = float(scores[best]), tools[best]
+        if score < self.semantic_threshold:
+            return None
+
+        arg = ""
+        if tool == "open_app":
+            m = self._app_finder.search(text)
+            if m is None:
+                return None
+            arg = APP_ALIASES[" ".join(m.group(0).lower().split())]
+        return Intent(tool, arg, score, "semantic")
+
+
+_router = None
+_router_lock = threading.Lock()
+
+
+def get_router() -> IntentRouter:
+    global _router
+    if _router is None:
+        with _router_lock:
+            if _router is None:
+                _router = IntentRouter()
+    return _router
+
+
+def route_intent(user_text: str) -> Intent | None:
+    intent = get_router().route(user_text)
+    if intent is not None:
+        print(f"🧭 Intent {intent.tool}({intent.arg!r}) via {intent.source}, confidence {intent.confidence:.2f}")
+    return intent
+
+
+def try_tools(user_text: str):
+    """Run the tool `user_text` asks for directly; returns its result, or None to use the LLM."""
+    intent = route_intent(user_text)
+    if intent is None:
+        return None
+    return execute_tool(intent.tool, intent.arg)
@@ -0,0 +1,84 @@
+"""
+In-memory BM25 inverted index over knowledge chunks.
+
+The lexical half of hybrid search: exact identifiers, file names and code
+terms that a MiniLM embedding blurs together score highly here. Tokens keep
+identifiers whole ("max_pending_turns", "app.py") and also index their parts
+("max", "pending", "turns", "app", "py"), so either form of a query matches.
+"""
+
+import math
+import re
+import threading
+from collections import Counter, defaultdict
+
+_TOKEN = re.compile(r"[a-z0-9_]+(?:[.\-][a-z0-9_]+)*")
+_PART = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> list[str]:
+    tokens = []
+    for tok in _TOKEN.findall(text.lower()):
+        tokens.append(tok)
+        parts = _PART.findall(tok)
+        if len(parts) > 1:
+            tokens.extend(parts)
+    return tokens
+
+
+class BM25Index:
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._postings = defaultdict(dict)   # term -> {doc id: term frequency}
+        self._lengths = {}                   # doc id -> token count
+        self._terms = {}                     # doc id -> its distinct terms
+        self._total = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._lengths)
+
+    def add(self, doc_id: str, text: str):
+        counts = Counter(tokenize(text))
+        with self._lock:
+            self._remove(doc_id)
+            for term, tf in counts.items():
+                self._postings[term][doc_id] = tf
+            self._lengths[doc_id] = sum(counts.values())
+            self._terms[doc_id] = list(counts)
+            self._total += self._lengths[doc_id]
+
+    def remove(self, doc_id: str):
+        with self._lock:
+            self._remove(doc_id)
+
+    def _remove(self, doc_id):
+        length = self._lengths.pop(doc_id, None)
+        if length is None:
+            return
+        self._total -= length
+        for term in self._terms.pop(doc_id):
+            postings = self._postings[term]
+            del postings[doc_id]
+            if not postings:
+                del self._postings[term]
+
+    def search(self, query: str, k: int = 10) -> list[tuple[str, float]]:
+        """Top `k` (doc id, score) pairs, best first."""
+        terms = set(tokenize(query))
+        with self._lock:
+            n = len(self._lengths)
+            if n == 0:
+                return []
+            avg = self._total / n
+            scores = defaultdict(float)
+            for term in terms:
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+                for doc_id, tf in postings.items():
+                    norm = tf + self.k1 * (1 - self.b + self.b * self._lengths[doc_id] / avg)
+                    scores[doc_id] += idf * tf * (self.k1 + 1) / norm
+        return sorted(scores.items(), key=lambda x: x[1], reverse=True)[:k]
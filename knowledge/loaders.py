@@ -0,0 +1,15 @@
+# Kept free of heavy imports: PDF extraction runs in worker processes, which
+# re-import this module on spawn-based platforms (macOS).
+from pypdf import PdfReader
+
+
+def read_file(path):
+    if path.endswith(".pdf"):
+        text = ""
+        reader = PdfReader(path)
+        for p in reader.pages:
+            text += p.extract_text() or ""
+        return text
+
+    with open(path, "r", encoding="utf-8", errors="ignore") as f:
+        return f.read()
@@ -1,37 +1,273 @@
 import os
-import chromadb
-from sentence_transformers import SentenceTransformer
-from pypdf import PdfReader
+import json
+import hashlib
+import threading
+from concurrent.futures import ProcessPoolExecutor
 
-client = chromadb.Client()
-collection = client.get_or_create_collection("jarvis_knowledge")
-embedder = SentenceTransformer("all-MiniLM-L6-v2")
+from config import (
+    KNOWLEDGE_EXTENSIONS,
+    KNOWLEDGE_MANIFEST,
+    CHUNK_WORDS,
+    CHUNK_OVERLAP,
+    PDF_WORKERS,
+    KNOWLEDGE_CANDIDATES,
+    RRF_K,
+    KNOWLEDGE_TOKEN_BUDGET,
+    KNOWLEDGE_RERANKER,
+    RERANK_CANDIDATES,
+)
+from conversation import estimate_tokens
+from embeddings import get_embedder
+from knowledge.bm25 import BM25Index
+from knowledge.loaders import read_file
+from vectorstore import LazyCollection
 
+collection = LazyCollection("jarvis_knowledge")
 
-def read_file(path):
-    if path.endswith(".pdf"):
-        text = ""
-        reader = PdfReader(path)
-        for p in reader.pages:
-            text += p.extract_text() or ""
-        return text
 
-    with open(path, "r", encoding="utf-8", errors="ignore") as f:
-        return f.read()
+def chunk_text(text, size=CHUNK_WORDS, overlap=CHUNK_OVERLAP):
+    """Split text into overlapping windows of `size` words.
 
+    MiniLM truncates input at 256 word pieces, so a whole document embedded
+    as one vector only represents its beginning; chunks keep every part of
+    the document searchable.
+    """
+    words = text.split()
+    if not words:
+        return []
+    step = max(1, size - overlap)
+    return [" ".join(words[i:i + size]) for i in range(0, max(1, len(words) - overlap), step)]
 
-def index_knowledge(folder="knowledge"):
-    for f in os.listdir(folder):
-        path = os.path.join(folder, f)
-        text = read_file(path)
-        if not text.strip():
-            continue
 
-        emb = embedder.encode(text).tolist()
-        collection.add(embeddings=[emb], documents=[text], ids=[f])
+def file_hash(path):
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
 
 
-def search_knowledge(q, k=2):
-    emb = embedder.encode(q).tolist()
-    res = collection.query(query_embeddings=[emb], n_results=k)
-    return "\n".join(res["documents"][0]) if res["documents"] else ""
\ No newline at end of file
+def load_manifest(path=KNOWLEDGE_MANIFEST):
+    # A manifest describing vectors the collection no longer holds (an
+    # in-memory store after a restart, or a store reset on schema change)
+    # is useless: start over.
+    if collection.count() == 0 or not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_manifest(manifest, path=KNOWLEDGE_MANIFEST):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1)
+    os.replace(tmp, path)
+
+
+def list_documents(folder):
+    docs = []
+    for root, _, files in os.walk(folder):
+        for name in files:
+            if os.path.splitext(name)[1].lower() in KNOWLEDGE_EXTENSIONS:
+                docs.append(os.path.join(root, name))
+    return sorted(docs)
+
+
+def read_files(paths, workers=PDF_WORKERS):
+    """Read documents, extracting PDFs in parallel across a process pool."""
+    pdfs = [p for p in paths if p.endswith(".pdf")]
+    texts = {p: read_file(p) for p in paths if not p.endswith(".pdf")}
+    if len(pdfs) > 1 and workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            texts.update(zip(pdfs, pool.map(read_file, pdfs, chunksize=4)))
+    else:
+        texts.update((p, read_file(p)) for p in pdfs)
+    return texts
+
+
+def _flush(ids, docs, metas):
+    embs = get_embedder().encode_batch(docs, cache=False)
+    # Under the BM25 lock so a concurrent get_bm25() build either sees these
+    # chunks in the store or is already in place to receive them
+    with _bm25_lock:
+        collection.upsert(ids=ids, embeddings=embs.tolist(), documents=docs, metadatas=metas)
+        if _bm25 is not None:
+            for cid, doc, meta in zip(ids, docs, metas):
+                _bm25.add(cid, _lexical_text(meta, doc))
+
+
+def index_knowledge(folder="knowledge", manifest_path=KNOWLEDGE_MANIFEST, batch_chunks=1024):
+    """Incrementally (re)index `folder`; returns counts of what changed.
+
+    Unchanged files (same content hash as in the manifest) are skipped,
+    modified files have their old chunks replaced, and files that vanished
+    have their chunks deleted. New chunks are embedded and written in
+    batches of `batch_chunks`.
+    """
+    manifest = load_manifest(manifest_path)
+    paths = list_documents(folder)
+    current = {os.path.relpath(p, folder): p for p in paths}
+
+    stale_ids = []
+    for rel in set(manifest) - set(current):
+        stale_ids.extend(manifest.pop(rel)["ids"])
+
+    hashes = {rel: file_hash(p) for rel, p in current.items()}
+    changed = [rel for rel in current if manifest.get(rel, {}).get("hash") != hashes[rel]]
+    for rel in changed:
+        if rel in manifest:
+            stale_ids.extend(manifest.pop(rel)["ids"])
+    if stale_ids:
+        with _bm25_lock:
+            collection.delete(ids=stale_ids)
+            if _bm25 is not None:
+                for cid in stale_ids:
+                    _bm25.remove(cid)
+
+    texts = read_files([current[rel] for rel in changed])
+
+    ids, docs, metas = [], [], []
+    n_chunks = 0
+    for rel in changed:
+        chunks = chunk_text(texts[current[rel]])
+        chunk_ids = [f"{rel}::{i}" for i in range(len(chunks))]
+        manifest[rel] = {"hash": hashes[rel], "ids": chunk_ids}
+        for i, (cid, chunk) in enumerate(zip(chunk_ids, chunks)):
+            ids.append(cid)
+            docs.append(chunk)
+            metas.append({"source": rel, "chunk": i})
+        if len(ids) >= batch_chunks:
+            _flush(ids, docs, metas)
+            n_chunks += len(ids)
+            ids, docs, metas = [], [], []
+    if ids:
+        _flush(ids, docs, metas)
+        n_chunks += len(ids)
+
+    save_manifest(manifest, manifest_path)
+    return {"files": len(current), "indexed": len(changed), "chunks": n_chunks, "deleted": len(stale_ids)}
+
+
+# ─── Search ─────────────────────────────────────────────────────────────
+# Hybrid retrieval: BM25 (exact terms, identifiers, file names) and vector
+# search (paraphrases) each return KNOWLEDGE_CANDIDATES chunks, merged by
+# reciprocal-rank fusion. An optional cross-encoder then reranks the top of
+# the fused list, and the passages handed to the prompt are capped at
+# KNOWLEDGE_TOKEN_BUDGET so long documents don't inflate prefill.
+_bm25 = None
+_bm25_lock = threading.Lock()
+_reranker = None
+_reranker_lock = threading.Lock()
+
+
+def _lexical_text(meta, doc):
+    # The file name is searchable too ("what's in setup_notes.txt")
+    return f"{(meta or {}).get('source', '')} {doc}"
+
+
+def get_bm25() -> BM25Index:
+    """BM25 index over the knowledge collection, built from the store on first use."""
+    global _bm25
+    if _bm25 is None:
+        with _bm25_lock:
+            if _bm25 is None:
+                index = BM25Index()
+                offset = 0
+                while True:
+                    res = collection.get(include=["documents", "metadatas"], limit=5000, offset=offset)
+                    if not res["ids"]:
+                        break
+                    for cid, doc, meta in zip(res["ids"], res["documents"], res["metadatas"]):
+                        index.add(cid, _lexical_text(meta, doc))
+                    offset += len(res["ids"])
+                _bm25 = index
+    return _bm25
+
+
+def get_reranker(model=None):
+    """The cross-encoder named by KNOWLEDGE_RERANKER (or `model`), or None if disabled."""
+    global _reranker
+    model = model or KNOWLEDGE_RERANKER
+    if not model:
+        return None
+    if _reranker is None:
+        with _reranker_lock:
+            if _reranker is None:
+                from sentence_transformers import CrossEncoder
+
+                print(f"⏳ Loading reranker {model} …")
+                _reranker = CrossEncoder(model)
+    return _reranker
+
+
+def reciprocal_rank_fusion(rankings, k=RRF_K):
+    scores = {}
+    for ranking in rankings:
+        for rank, cid in enumerate(ranking):
+            scores[cid] = scores.get(cid, 0.0) + 1.0 / (k + rank + 1)
+    return sorted(scores.items(), key=lambda x: x[1], reverse=True)
+
+
+def search_passages(q, k=3, embedding=None, mode="hybrid", rerank=True, candidates=KNOWLEDGE_CANDIDATES):
+    """Best `k` chunks for `q` as dicts with id, source, text and score.
+
+    `mode` is "hybrid", "dense" or "bm25"; the single-retriever modes exist
+    for evaluation.
+    """
+    texts = {}
+    rankings = []
+    if mode in ("hybrid", "dense"):
+        n = min(candidates, collection.count())
+        if n:
+            if embedding is None:
+                embedding = get_embedder().encode(q)
+            res = collection.query(query_embeddings=[embedding.tolist()], n_results=n,
+                                   include=["documents", "metadatas"])
+            ids = res["ids"][0] if res["ids"] else []
+            for cid, doc, meta in zip(ids, res["documents"][0], res["metadatas"][0]):
+                texts[cid] = (doc, meta)
+            rankings.append(ids)
+    if mode in ("hybrid", "bm25"):
+        rankings.append([cid for cid, _ in get_bm25().search(q, candidates)])
+
+    fused = reciprocal_rank_fusion(rankings)
+    reranker = get_reranker() if rerank else None
+    top = fused[:max(k, RERANK_CANDIDATES) if reranker else k]
+
+    missing = [cid for cid, _ in top if cid not in texts]
+    if missing:
+        res = collection.get(ids=missing, include=["documents", "metadatas"])
+        for cid, doc, meta in zip(res["ids"], res["documents"], res["metadatas"]):
+            texts[cid] = (doc, meta)
+
+    passages = [
+        {"id": cid, "source": (texts[cid][1] or {}).get("source", ""), "text": texts[cid][0], "score": score}
+        for cid, score in top if cid in texts
+    ]
+    if reranker and passages:
+        scores = reranker.predict([(q, p["text"]) for p in passages])
+        for p, score in zip(passages, scores):
+            p["score"] = float(score)
+        passages.sort(key=lambda p: p["score"], reverse=True)
+    return passages[:k]
+
+
+def search_knowledge(q, k=3, embedding=None, token_budget=KNOWLEDGE_TOKEN_BUDGET):
+    """Prompt-ready knowledge: the best passages, labelled by source, within `token_budget`."""
+    out, used = [], 0
+    for p in search_passages(q, k, embedding):
+        text = f"[{p['source']}] {p['text']}"
+        cost = estimate_tokens(text)
+        if used + cost > token_budget:
+            if not out:
+                # Always return something: cut the best passage down to the budget
+                out.append(" ".join(text.split()[:max(1, token_budget * 3 // 4)]))
+            break
+        out.append(text)
+        used += cost
+    return "\n".join(out)
+
+
+if __name__ == "__main__":
+    print(index_knowledge())
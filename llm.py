@@ -0,0 +1,156 @@
+"""
+Ollama model session.
+
+Every chat request goes through one ModelSession so that:
+  - the model is pinned with the same `keep_alive` on every call and never
+    unloaded between voice turns;
+  - request `options` are identical across calls (changing e.g. num_ctx
+    makes Ollama reload the model);
+  - the model can be preloaded at startup with the system prompt, which
+    fills the server's prompt cache for the prefix every turn starts with;
+  - time-to-first-token and tokens/sec are measured per request and a
+    warning is logged when TTFT regresses.
+
+Prefix reuse only works if the start of the prompt is byte-identical between
+calls, which is why the system prompt always comes first and per-turn
+retrieved context is attached to the last user message (see conversation.py).
+"""
+
+import statistics
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+
+from config import MODEL, LLM_KEEP_ALIVE, LLM_OPTIONS, LLM_TTFT_WARN_S
+
+
+def _field(chunk, name):
+    try:
+        return chunk[name]
+    except Exception:
+        return None
+
+
+@dataclass
+class RequestStats:
+    model: str
+    ttft: float = 0.0             # seconds until the first content token
+    total: float = 0.0
+    prompt_tokens: int = 0        # prompt tokens evaluated (cached prefix excluded)
+    eval_tokens: int = 0
+    tokens_per_s: float = 0.0
+    load_s: float = 0.0           # > 0 means the model had to be (re)loaded
+
+
+class _Meter:
+    def __init__(self, session, model):
+        self.session = session
+        self.stats = RequestStats(model)
+        self.start = time.perf_counter()
+        self.first = None
+
+    def token(self, text):
+        if self.first is None and text:
+            self.first = time.perf_counter()
+            self.stats.ttft = self.first - self.start
+
+    def done(self, chunk):
+        s = self.stats
+        s.total = time.perf_counter() - self.start
+        s.prompt_tokens = _field(chunk, "prompt_eval_count") or 0
+        s.eval_tokens = _field(chunk, "eval_count") or 0
+        eval_ns = _field(chunk, "eval_duration") or 0
+        s.tokens_per_s = s.eval_tokens / (eval_ns / 1e9) if eval_ns else 0.0
+        s.load_s = (_field(chunk, "load_duration") or 0) / 1e9
+        self.session._record(s)
+
+
+class ModelSession:
+    def __init__(self, model: str = MODEL, keep_alive=LLM_KEEP_ALIVE, options: dict | None = None):
+        self.model = model
+        self.keep_alive = keep_alive
+        self.options = dict(LLM_OPTIONS if options is None else options)
+        import ollama  # deferred: httpx & co. aren't needed until the first request
+
+        self.client = ollama.Client()
+        self.aclient = ollama.AsyncClient()
+        self.last = None
+        self._ttfts = deque(maxlen=20)
+        self._lock = threading.Lock()
+
+    def _kwargs(self, messages, stream):
+        kwargs = {"model": self.model, "messages": messages, "stream": stream, "keep_alive": self.keep_alive}
+        if self.options:
+            kwargs["options"] = self.options
+        return kwargs
+
+    def _record(self, stats: RequestStats):
+        with self._lock:
+            baseline = statistics.median(self._ttfts) if len(self._ttfts) >= 5 else None
+            self._ttfts.append(stats.ttft)
+            self.last = stats
+        print(
+            f"🧠 {stats.model} TTFT {stats.ttft:.2f}s · {stats.prompt_tokens} prompt tok · "
+            f"{stats.eval_tokens} tok @ {stats.tokens_per_s:.1f} tok/s"
+            + (f" · load {stats.load_s:.2f}s" if stats.load_s > 0.05 else "")
+        )
+        if stats.ttft > LLM_TTFT_WARN_S or (baseline and stats.ttft > 2 * baseline):
+            ref = f" (median {baseline:.2f}s)" if baseline else ""
+            print(f"⚠️  TTFT regression: {stats.ttft:.2f}s{ref}")
+
+    # ── Streaming ──
+    def stream(self, messages):
+        """Yield content tokens (blocking client)."""
+        meter = _Meter(self, self.model)
+        for chunk in self.client.chat(**self._kwargs(messages, True)):
+            token = chunk["message"]["content"]
+            meter.token(token)
+            if _field(chunk, "done"):
+                meter.done(chunk)
+            yield token
+
+    async def astream(self, messages):
+        """Yield content tokens (async client; never blocks the event loop)."""
+        meter = _Meter(self, self.model)
+        async for chunk in await self.aclient.chat(**self._kwargs(messages, True)):
+            token = chunk["message"]["content"]
+            meter.token(token)
+            if _field(chunk, "done"):
+                meter.done(chunk)
+            yield token
+
+    def chat(self, messages) -> str:
+        """Single non-streaming request; returns the reply text."""
+        meter = _Meter(self, self.model)
+        res = self.client.chat(**self._kwargs(messages, False))
+        meter.token(res["message"]["content"])
+        meter.done(res)
+        return res["message"]["content"]
+
+    # ── Warmup ──
+    def warm(self, system_prompt: str | None = None):
+        """Load the model and prefill the prompt cache with the system prompt; False if Ollama failed."""
+        start = time.perf_counter()
+        messages = [{"role": "system", "content": system_prompt}] if system_prompt else []
+        kwargs = self._kwargs(messages, False)
+        # Same options as real requests (otherwise the model reloads), plus a one-token cap
+        kwargs["options"] = {**self.options, "num_predict": 1}
+        try:
+            self.client.chat(**kwargs)
+            print(f"🔥 {self.model} warm in {time.perf_counter() - start:.2f}s (keep_alive={self.keep_alive})")
+            return True
+        except Exception as e:
+            print(f"Model warmup failed: {e}")
+            return False
+
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+def get_session(model: str = MODEL) -> ModelSession:
+    with _sessions_lock:
+        if model not in _sessions:
+            _sessions[model] = ModelSession(model)
+        return _sessions[model]
@@ -1,22 +1,323 @@
-import chromadb
-from sentence_transformers import SentenceTransformer
+"""
+Conversation memory.
 
-client = chromadb.Client()
-collection = client.get_or_create_collection("jarvis_memory")
+Writes go through a write-behind queue: `store_memory` only enqueues, and a
+background thread embeds and upserts queued texts in batches once
+MEMORY_BATCH_SIZE are waiting or MEMORY_FLUSH_INTERVAL_S has passed. Memory
+writes are therefore off the turn's critical path. The queue is flushed at
+interpreter exit, and `flush_memory()` forces it.
 
-embedder = SentenceTransformer("all-MiniLM-L6-v2")
+Ids are a hash of the normalized text, so they are stable across restarts
+and storing the same line twice is an upsert rather than a duplicate-id
+error. With MEMORY_DEDUP_SIMILARITY set, texts nearly identical to a stored
+memory (cosine similarity at or above the threshold) are skipped.
 
+Lifecycle:
+  - every memory carries metadata: `ts` (unix time), `kind` ("turn" or
+    "episode") and `role`
+  - recall fetches k × MEMORY_CANDIDATES neighbours and ranks them by a
+    blend of similarity and recency (exponential decay, MEMORY_HALF_LIFE_DAYS)
+  - `maintain()` runs in the writer thread every MEMORY_MAINTENANCE_INTERVAL_S:
+    turns older than MEMORY_CONSOLIDATE_AFTER_H are summarized, in groups of
+    MEMORY_EPISODE_TURNS, into one "episode" memory each, and beyond
+    MEMORY_MAX_ITEMS the oldest memories are evicted. Raw turns that leave the
+    store are appended to MEMORY_ARCHIVE_PATH.
+Memories stored before metadata existed count as the oldest.
+"""
 
-def store_memory(text):
-    emb = embedder.encode(text).tolist()
-    collection.add(
-        embeddings=[emb],
-        documents=[text],
-        ids=[str(hash(text))]
+import atexit
+import hashlib
+import heapq
+import json
+import math
+import os
+import queue
+import threading
+import time
+
+import numpy as np
+
+from config import (
+    MEMORY_BATCH_SIZE, MEMORY_FLUSH_INTERVAL_S, MEMORY_DEDUP_SIMILARITY,
+    MEMORY_RECENCY_WEIGHT, MEMORY_HALF_LIFE_DAYS, MEMORY_CANDIDATES,
+    MEMORY_CONSOLIDATE_AFTER_H, MEMORY_EPISODE_TURNS, MEMORY_MAX_ITEMS,
+    MEMORY_ARCHIVE_PATH, MEMORY_MAINTENANCE_INTERVAL_S, EMBED_PRECISION,
+)
+from conversation import summarize_with_ollama
+from embeddings import get_embedder, normalize
+from vectorstore import LazyCollection
+
+collection = LazyCollection("jarvis_memory")
+
+
+def memory_id(text: str) -> str:
+    return "m-" + hashlib.sha1(normalize(text).encode()).hexdigest()[:20]
+
+
+def _role(text: str) -> str:
+    head = text.split(":", 1)[0].strip().lower()
+    return {"user": "user", "jarvis": "assistant"}.get(head, "note")
+
+
+def _unit(vectors) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+class MemoryWriter:
+    def __init__(self, batch_size=MEMORY_BATCH_SIZE, interval=MEMORY_FLUSH_INTERVAL_S,
+                 dedup_similarity=MEMORY_DEDUP_SIMILARITY):
+        self.batch_size = batch_size
+        self.interval = interval
+        self.dedup_similarity = dedup_similarity
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self.written = 0
+        self.skipped = 0
+        self.batches = 0
+        self._last_maintenance = time.monotonic()
+
+    def put(self, text: str, metadata: dict | None = None):
+        meta = {"ts": time.time(), "kind": "turn", "role": _role(text), **(metadata or {})}
+        self._ensure_started()
+        self._queue.put((text, meta))
+
+    def _ensure_started(self):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="memory-writer", daemon=True)
+                    self._thread.start()
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Block until everything queued so far is written; False on timeout."""
+        if self._thread is None:
+            return True
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def _run(self):
+        while True:
+            batch, waiters = [], []
+            deadline = None
+            while len(batch) < self.batch_size:
+                try:
+                    timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if isinstance(item, threading.Event):
+                    waiters.append(item)
+                    break
+                batch.append(item)
+                if deadline is None:
+                    deadline = time.monotonic() + self.interval
+            try:
+                if batch:
+                    self._write(batch)
+            except Exception as e:
+                print(f"⚠️  Memory write failed ({len(batch)} items): {e}")
+            for done in waiters:
+                done.set()
+
+            # Maintenance shares this thread so it never races with writes
+            if time.monotonic() - self._last_maintenance >= MEMORY_MAINTENANCE_INTERVAL_S:
+                self._last_maintenance = time.monotonic()
+                try:
+                    maintain()
+                except Exception as e:
+                    print(f"⚠️  Memory maintenance failed: {e}")
+
+    def _write(self, items):
+        # Same text twice in one batch: keep the latest
+        unique = {}
+        for text, meta in items:
+            unique[memory_id(text)] = (text, meta)
+        ids = list(unique)
+        docs = [text for text, _ in unique.values()]
+        metas = [meta for _, meta in unique.values()]
+
+        start = time.perf_counter()
+        embs = get_embedder().encode_batch(docs, cache=False)
+
+        if self.dedup_similarity is not None and collection.count() > 0:
+            keep = self._novel(ids, embs)
+            self.skipped += len(ids) - len(keep)
+            ids, docs, metas, embs = [ids[i] for i in keep], [docs[i] for i in keep], [metas[i] for i in keep], embs[keep]
+        if not ids:
+            return
+
+        collection.upsert(ids=ids, embeddings=embs.tolist(), documents=docs, metadatas=metas)
+        self.written += len(ids)
+        self.batches += 1
+        print(f"💾 Memory: stored {len(ids)} in {time.perf_counter() - start:.2f}s")
+
+    def _novel(self, ids, embs) -> list[int]:
+        """Indexes of texts with no near-duplicate in the store or earlier in the batch.
+
+        An exact id match is an update of the same memory, not a duplicate.
+        """
+        res = collection.query(query_embeddings=embs.tolist(), n_results=1, include=["embeddings"])
+        queries = _unit(embs)
+        keep = []
+        for i, (hit_ids, hit_embs) in enumerate(zip(res["ids"], res["embeddings"])):
+            if hit_ids and hit_ids[0] != ids[i]:
+                if float(_unit(hit_embs[0]) @ queries[i]) >= self.dedup_similarity:
+                    continue
+            if keep and float(np.max(queries[keep] @ queries[i])) >= self.dedup_similarity:
+                continue
+            keep.append(i)
+        return keep
+
+    def stats(self) -> dict:
+        return {
+            "queued": self._queue.qsize(),
+            "written": self.written,
+            "skipped": self.skipped,
+            "batches": self.batches,
+        }
+
+
+writer = MemoryWriter()
+atexit.register(writer.flush, 10.0)
+
+
+def store_memory(text, metadata: dict | None = None):
+    """Queue `text` for storage; returns immediately."""
+    writer.put(text, metadata)
+
+
+def flush_memory(timeout: float | None = None) -> bool:
+    return writer.flush(timeout)
+
+
+# ─── Recall ─────────────────────────────────────────────────────────────
+# Chroma's default space is squared L2; on unit vectors that is 2 - 2·cos.
+# int8 embeddings are unit vectors scaled by 127, so distances are too.
+_DIST_SCALE = 127.0 ** 2 if EMBED_PRECISION == "int8" else 1.0
+
+
+def recency(ts, now: float, half_life_days: float = MEMORY_HALF_LIFE_DAYS) -> float:
+    if not ts:
+        return 0.0
+    age_days = max(0.0, now - ts) / 86400
+    return math.exp(-math.log(2) * age_days / half_life_days)
+
+
+def rank_memories(docs, metas, distances, now=None, recency_weight=MEMORY_RECENCY_WEIGHT):
+    """[(score, doc)] best first; score blends cosine similarity with recency."""
+    now = time.time() if now is None else now
+    scored = []
+    for doc, meta, dist in zip(docs, metas, distances):
+        similarity = 1.0 - dist / (2 * _DIST_SCALE)
+        ts = (meta or {}).get("ts")
+        score = (1 - recency_weight) * similarity + recency_weight * recency(ts, now)
+        scored.append((score, doc))
+    scored.sort(key=lambda x: x[0], reverse=True)
+    return scored
+
+
+def recall_memory(query, k=3, embedding=None, now=None, recency_weight=MEMORY_RECENCY_WEIGHT):
+    if embedding is None:
+        embedding = get_embedder().encode(query)
+    emb = embedding.tolist()
+    n = min(k * MEMORY_CANDIDATES, collection.count())
+    if n == 0:
+        return []
+    res = collection.query(query_embeddings=[emb], n_results=n,
+                           include=["documents", "metadatas", "distances"])
+    if not res["documents"]:
+        return []
+    ranked = rank_memories(res["documents"][0], res["metadatas"][0], res["distances"][0], now, recency_weight)
+    return [doc for _, doc in ranked[:k]]
+
+
+# ─── Maintenance ────────────────────────────────────────────────────────
+def _archive(ids, docs, metas, reason):
+    if not MEMORY_ARCHIVE_PATH or not ids:
+        return
+    os.makedirs(os.path.dirname(MEMORY_ARCHIVE_PATH) or ".", exist_ok=True)
+    with open(MEMORY_ARCHIVE_PATH, "a", encoding="utf-8") as f:
+        for id_, doc, meta in zip(ids, docs, metas):
+            f.write(json.dumps({"id": id_, "text": doc, "meta": meta, "reason": reason}) + "\n")
+
+
+def consolidate(now=None, summarize=summarize_with_ollama,
+                older_than_h=MEMORY_CONSOLIDATE_AFTER_H, turns_per_episode=MEMORY_EPISODE_TURNS) -> int:
+    """Summarize old turns into episode memories; returns the number of episodes written."""
+    now = time.time() if now is None else now
+    cutoff = now - older_than_h * 3600
+    res = collection.get(
+        where={"$and": [{"kind": "turn"}, {"ts": {"$lt": cutoff}}]},
+        include=["documents", "metadatas"],
+        limit=turns_per_episode * 10,
     )
+    turns = sorted(zip(res["ids"], res["documents"], res["metadatas"]), key=lambda t: t[2]["ts"])
+
+    episodes = 0
+    for start in range(0, len(turns) - turns_per_episode + 1, turns_per_episode):
+        group = turns[start:start + turns_per_episode]
+        ids, docs, metas = (list(x) for x in zip(*group))
+        messages = [
+            {"role": meta.get("role", "user"), "content": doc.split(":", 1)[-1].strip()}
+            for doc, meta in zip(docs, metas)
+        ]
+        summary = summarize("", messages)
+        if not summary:
+            continue
+
+        text = "Earlier conversation: " + summary
+        emb = get_embedder().encode_batch([text], cache=False)
+        collection.upsert(
+            ids=[memory_id("episode " + ids[0] + " " + ids[-1])],
+            embeddings=emb.tolist(),
+            documents=[text],
+            metadatas=[{"ts": metas[-1]["ts"], "start_ts": metas[0]["ts"], "kind": "episode",
+                        "role": "summary", "turns": len(ids)}],
+        )
+        _archive(ids, docs, metas, "consolidated")
+        collection.delete(ids=ids)
+        episodes += 1
+    return episodes
+
+
+def evict(max_items=MEMORY_MAX_ITEMS, page=5000) -> int:
+    """Remove the oldest memories beyond `max_items`; returns how many were removed."""
+    excess = collection.count() - max_items
+    if excess <= 0:
+        return 0
+
+    oldest = []   # max-heap (negated ts) of the `excess` oldest seen so far
+    offset = 0
+    while True:
+        res = collection.get(include=["metadatas"], limit=page, offset=offset)
+        if not res["ids"]:
+            break
+        for id_, meta in zip(res["ids"], res["metadatas"]):
+            item = (-(meta or {}).get("ts", 0.0), id_)
+            if len(oldest) < excess:
+                heapq.heappush(oldest, item)
+            elif item > oldest[0]:
+                heapq.heapreplace(oldest, item)
+        offset += page
+
+    ids = [id_ for _, id_ in oldest]
+    for i in range(0, len(ids), page):
+        batch = ids[i:i + page]
+        if MEMORY_ARCHIVE_PATH:
+            res = collection.get(ids=batch, include=["documents", "metadatas"])
+            _archive(res["ids"], res["documents"], res["metadatas"], "evicted")
+        collection.delete(ids=batch)
+    return len(ids)
 
 
-def recall_memory(query, k=3):
-    emb = embedder.encode(query).tolist()
-    res = collection.query(query_embeddings=[emb], n_results=k)
-    return res["documents"][0] if res["documents"] else []
\ No newline at end of file
+def maintain(now=None, summarize=summarize_with_ollama) -> dict:
+    start = time.perf_counter()
+    stats = {"episodes": consolidate(now, summarize), "evicted": evict()}
+    if stats["episodes"] or stats["evicted"]:
+        print(f"💾 Memory maintenance: {stats['episodes']} episodes, {stats['evicted']} evicted "
+              f"in {time.perf_counter() - start:.2f}s")
+    return stats
@@ -0,0 +1,266 @@
+"""
+Response cache for repeated questions.
+
+A reply is stored under the normalized question plus a hash of the
+knowledge context retrieved for it and of the exchange that preceded it
+(so a follow-up like "and tomorrow?" is only reused after the same
+question), together with the speech synthesized for it, so asking the
+same thing again replays the answer straight away instead of running the
+LLM and Piper. With RESPONSE_CACHE_SIMILARITY set, a question whose MiniLM
+embedding is at least that similar to a cached one (under the same
+context) is served too, which catches rephrasings.
+
+Entries expire after RESPONSE_CACHE_TTL_S; beyond RESPONSE_CACHE_MAX_ITEMS
+the least recently used go first. The index (index.json) and the audio
+(one WAV per entry) live in RESPONSE_CACHE_DIR and survive restarts.
+Replies that called tools are never cached, since their answer depends on
+the moment.
+
+stats() reports hits, misses, the hit rate and the latency hits saved: the
+original generation + synthesis time minus the time the replay took.
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import wave
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+
+import numpy as np
+
+from config import (
+    RESPONSE_CACHE_ENABLED, RESPONSE_CACHE_TTL_S, RESPONSE_CACHE_MAX_ITEMS,
+    RESPONSE_CACHE_SIMILARITY, RESPONSE_CACHE_DIR,
+)
+from tts import Synthesis, to_wav
+
+INDEX_VERSION = 2
+
+
+def normalize_query(text: str) -> str:
+    return " ".join(re.findall(r"[\w']+", text.lower()))
+
+
+def context_hash(knowledge: str, history=()) -> str:
+    """Hash of the retrieved knowledge and the last user/assistant exchange in `history`."""
+    prior = "\n".join(f"{m['role']}: {normalize_query(m['content'])}" for m in list(history)[-2:])
+    return hashlib.sha1(f"{knowledge.strip()}\n{prior}".encode("utf-8")).hexdigest()[:16]
+
+
+def _key(query: str, context: str) -> str:
+    return hashlib.sha1(f"{context}\n{query}".encode("utf-8")).hexdigest()[:20]
+
+
+@dataclass
+class CachedReply:
+    key: str
+    query: str            # normalized question
+    context: str          # context_hash() of the knowledge and prior exchange it was answered with
+    reply: str
+    seconds: float        # time it took to generate and synthesize
+    created: float
+    used: float
+    hits: int = 0
+    audio: str | None = None   # WAV file in the cache directory (None = text only)
+
+
+class ResponseCache:
+    def __init__(self, directory=RESPONSE_CACHE_DIR, ttl=RESPONSE_CACHE_TTL_S, max_items=RESPONSE_CACHE_MAX_ITEMS,
+                 similarity=RESPONSE_CACHE_SIMILARITY, enabled=RESPONSE_CACHE_ENABLED):
+        self.directory = directory
+        self.ttl = ttl
+        self.max_items = max_items
+        self.similarity = similarity
+        self.enabled = enabled
+        self._entries = OrderedDict()   # key -> CachedReply, least recently used first
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()   # one index write at a time (puts run in executor threads)
+        self._loaded = False
+        self.hits = 0
+        self.misses = 0
+        self.saved_seconds = 0.0
+
+    @property
+    def _index_path(self):
+        return os.path.join(self.directory, "index.json")
+
+    def _load(self):
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            self._loaded = True
+            try:
+                with open(self._index_path, encoding="utf-8") as f:
+                    data = json.load(f)
+                if data.get("version") != INDEX_VERSION:
+                    return
+                for item in data["entries"]:
+                    entry = CachedReply(**item)
+                    if entry.audio and not os.path.exists(os.path.join(self.directory, entry.audio)):
+                        entry.audio = None
+                    self._entries[entry.key] = entry
+            except FileNotFoundError:
+                return
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                print(f"⚠️  Response cache index unreadable, starting empty: {e}")
+                self._entries.clear()
+                return
+        removed = self._expire(time.time())
+        print(f"💬 Response cache: {len(self._entries)} cached replies")
+        if removed:
+            self._save(removed=removed)
+
+    def _expire(self, now: float) -> list:
+        with self._lock:
+            stale = [e for e in self._entries.values() if now - e.created > self.ttl]
+            for entry in stale:
+                del self._entries[entry.key]
+        return stale
+
+    def get(self, query: str, knowledge: str = "", history=()) -> CachedReply | None:
+        """The cached reply to `query` under this knowledge context and conversation `history`, or None."""
+        if not self.enabled:
+            return None
+        self._load()
+        now = time.time()
+        removed = self._expire(now)
+        if removed:
+            self._save(removed=removed)
+        q, ctx = normalize_query(query), context_hash(knowledge, history)
+        with self._lock:
+            entry = self._entries.get(_key(q, ctx))
+        if entry is None and self.similarity is not None and q:
+            entry = self._similar(q, ctx)
+        with self._lock:
+            if entry is None or entry.key not in self._entries:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(entry.key)
+            entry.hits += 1
+            entry.used = now
+            self.hits += 1
+        return entry
+
+    def _similar(self, query: str, context: str) -> CachedReply | None:
+        from embeddings import get_embedder
+        from startup import startup
+
+        if not startup.ready("embedder"):
+            return None
+        with self._lock:
+            candidates = [e for e in self._entries.values() if e.context == context]
+        if not candidates:
+            return None
+        # Query embeddings go through the embedder's LRU cache, so cached
+        # questions are only encoded once
+        vectors = get_embedder().encode_batch([query] + [e.query for e in candidates]).astype(np.float32)
+        vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-9)
+        scores = vectors[1:] @ vectors[0]
+        best = int(np.argmax(scores))
+        if scores[best] < self.similarity:
+            return None
+        return candidates[best]
+
+    def synthesis(self, entry: CachedReply) -> Synthesis | None:
+        """The stored speech for `entry` (None if it was cached as text only)."""
+        if not entry.audio:
+            return None
+        try:
+            with wave.open(os.path.join(self.directory, entry.audio), "rb") as w:
+                return Synthesis(entry.reply, w.readframes(w.getnframes()), w.getframerate(), 0.0)
+        except (OSError, EOFError, wave.Error) as e:
+            print(f"⚠️  Cached audio unreadable: {e}")
+            return None
+
+    def replayed(self, entry: CachedReply, seconds: float):
+        """Record that a hit on `entry` was delivered in `seconds`."""
+        with self._lock:
+            self.saved_seconds += max(0.0, entry.seconds - seconds)
+
+    def put(self, query: str, knowledge: str, reply: str, synths=(), seconds: float = 0.0, history=()):
+        """Cache `reply` and its speech (`synths`, in order; empty = text only).
+
+        `history` is the conversation as it was before `query` was asked.
+        """
+        if not self.enabled or not reply.strip():
+            return
+        self._load()
+        q, ctx = normalize_query(query), context_hash(knowledge, history)
+        if not q:
+            return
+        now = time.time()
+        entry = CachedReply(_key(q, ctx), q, ctx, reply, round(seconds, 3), now, now)
+        if synths:
+            pcm = b"".join(s.pcm for s in synths)
+            entry.audio = f"{entry.key}.wav"
+            try:
+                os.makedirs(self.directory, exist_ok=True)
+                with open(os.path.join(self.directory, entry.audio), "wb") as f:
+                    f.write(to_wav(Synthesis(reply, pcm, synths[0].sample_rate, 0.0)))
+            except OSError as e:
+                print(f"⚠️  Response cache audio write failed: {e}")
+                entry.audio = None
+        with self._lock:
+            self._entries[entry.key] = entry
+            self._entries.move_to_end(entry.key)
+            removed = []
+            while len(self._entries) > self.max_items:
+                removed.append(self._entries.popitem(last=False)[1])
+        self._save(removed=removed)
+
+    def _save(self, removed=()):
+        for entry in removed:
+            if entry.audio:
+                try:
+                    os.remove(os.path.join(self.directory, entry.audio))
+                except OSError:
+                    pass
+        with self._save_lock:
+            # Snapshot inside the save lock so the last write has the newest entries
+            with self._lock:
+                data = {"version": INDEX_VERSION, "entries": [asdict(e) for e in self._entries.values()]}
+            try:
+                os.makedirs(self.directory, exist_ok=True)
+                tmp = self._index_path + ".tmp"
+                with open(tmp, "w", encoding="utf-8") as f:
+                    json.dump(data, f)
+                os.replace(tmp, self._index_path)
+            except OSError as e:
+                print(f"⚠️  Response cache index write failed: {e}")
+
+    def clear(self):
+        self._load()
+        with self._lock:
+            removed = list(self._entries.values())
+            self._entries.clear()
+        self._save(removed=removed)
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 3) if total else 0.0,
+                "saved_seconds": round(self.saved_seconds, 3),
+            }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache:
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResponseCache()
+        return _cache
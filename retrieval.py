@@ -0,0 +1,85 @@
+"""
+Per-turn context retrieval.
+
+The query is embedded once, then memory recall and knowledge search run
+concurrently on a small thread pool with that shared embedding. The whole
+lookup is bounded by a deadline: a store that hasn't answered in time is
+skipped for this turn (its call keeps running in the background) and the
+turn goes ahead with whatever context arrived. Stage timings are recorded on
+the returned RetrievedContext.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+
+from config import RETRIEVAL_DEADLINE_S
+from embeddings import get_embedder
+from memory import recall_memory
+from knowledge.rag import search_knowledge
+
+_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="retrieval")
+
+
+@dataclass
+class RetrievedContext:
+    memories: list = field(default_factory=list)
+    knowledge: str = ""
+    timings: dict = field(default_factory=dict)   # stage -> seconds
+    missed: list = field(default_factory=list)    # stages that blew the deadline
+
+    def render(self) -> str:
+        ctx = ""
+        if self.memories:
+            ctx += "\nRelevant past memory:\n" + "\n".join(self.memories)
+        if self.knowledge:
+            ctx += "\nRelevant knowledge:\n" + self.knowledge
+        return ctx
+
+
+def _timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def retrieve(text: str, deadline: float = RETRIEVAL_DEADLINE_S) -> RetrievedContext:
+    """Embed `text` once and query memory and knowledge concurrently within `deadline` seconds."""
+    start = time.perf_counter()
+    ctx = RetrievedContext()
+
+    embed = _pool.submit(_timed, get_embedder().encode, text)
+    done, _ = wait([embed], timeout=deadline)
+    if not done:
+        ctx.missed = ["embed", "memory", "knowledge"]
+        ctx.timings["total"] = time.perf_counter() - start
+        print(f"⚠️  Retrieval skipped: embedding exceeded {deadline:.2f}s")
+        return ctx
+    emb, ctx.timings["embed"] = embed.result()
+
+    stages = {
+        "memory": _pool.submit(_timed, recall_memory, text, embedding=emb),
+        "knowledge": _pool.submit(_timed, search_knowledge, text, embedding=emb),
+    }
+    remaining = max(0.0, deadline - (time.perf_counter() - start))
+    wait(stages.values(), timeout=remaining)
+
+    for name, fut in stages.items():
+        if not fut.done():
+            ctx.missed.append(name)
+            continue
+        try:
+            result, ctx.timings[name] = fut.result()
+        except Exception as e:
+            print(f"Retrieval error ({name}): {e}")
+            continue
+        if name == "memory":
+            ctx.memories = result
+        else:
+            ctx.knowledge = result
+
+    ctx.timings["total"] = time.perf_counter() - start
+    stages_str = ", ".join(f"{k} {v * 1000:.0f}ms" for k, v in ctx.timings.items())
+    missed_str = f" (missed: {', '.join(ctx.missed)})" if ctx.missed else ""
+    print(f"⏱️  Retrieval: {stages_str}{missed_str}")
+    return ctx
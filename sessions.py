@@ -0,0 +1,197 @@
+"""
+Per-connection client sessions and the shared LLM generation scheduler.
+
+Each WebSocket gets a ClientSession with its own conversation history, voice
+toggle and in-flight turn tasks, so windows no longer steal each other's
+socket or share one history. Turns within a session run one at a time, in
+order; a session with too many turns waiting is told it's busy instead of
+queueing without bound.
+
+GenerationScheduler caps how many LLM generations run at once across all
+sessions. Waiting sessions are served round-robin (one queue per session),
+so one chatty client can't starve the others, and each waiter is told its
+queue position.
+"""
+
+import asyncio
+import itertools
+import json
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+
+from config import MAX_CONCURRENT_GENERATIONS, MAX_PENDING_TURNS, CANCEL_TIMEOUT_S
+from conversation import Conversation
+from tracing import span
+
+_ids = itertools.count(1)
+
+
+class ClientSession:
+    def __init__(self, ws, system_prompt: str):
+        self.id = next(_ids)
+        self.ws = ws
+        self.conversation = Conversation(system_prompt)
+        self.voice_enabled = True
+        self.playing = False   # the client reports while it is playing reply audio
+        self.last_active = time.monotonic()
+        self._turn_lock = asyncio.Lock()
+        self._send_lock = asyncio.Lock()
+        self._tasks = set()
+        self.pending_turns = 0
+        self.last_cancel_latency = None
+        self.turn_id = 0
+
+    async def send(self, msg: dict):
+        with span("ws_send"):
+            async with self._send_lock:
+                await self.ws.send_text(json.dumps(msg))
+
+    async def send_bytes(self, data: bytes):
+        with span("ws_send"):
+            async with self._send_lock:
+                await self.ws.send_bytes(data)
+
+    def next_turn_id(self) -> int:
+        """Id for a new reply; binary audio frames carry it so stale audio can be dropped."""
+        self.turn_id += 1
+        return self.turn_id
+
+    async def run_turn(self, coro):
+        """Run `coro` after this session's earlier turns; returns False if rejected."""
+        if self.pending_turns >= MAX_PENDING_TURNS:
+            coro.close()
+            await self.send({"type": "busy", "text": "Still working on your earlier messages — try again in a moment."})
+            return False
+
+        self.pending_turns += 1
+        task = asyncio.current_task()
+        self._tasks.add(task)
+        try:
+            async with self._turn_lock:
+                self.last_active = time.monotonic()
+                await coro
+            return True
+        except Exception as e:
+            print(f"Turn error (session {self.id}): {e}")
+            return False
+        finally:
+            coro.close()  # no-op unless cancelled before it started
+            self.pending_turns -= 1
+            self._tasks.discard(task)
+
+    def start_turn(self, coro):
+        """Schedule `coro` as a turn without waiting for it."""
+        return asyncio.create_task(self.run_turn(coro))
+
+    @property
+    def busy(self) -> bool:
+        return any(not t.done() for t in self._tasks)
+
+    def cancel(self):
+        """Cancel every in-flight or waiting turn of this session."""
+        for task in list(self._tasks):
+            task.cancel()
+
+    async def interrupt(self) -> float | None:
+        """Barge-in: cancel all turns, wait (bounded) for them to unwind and tell the client.
+
+        Cancelling a turn closes the Ollama stream, which makes the server
+        stop generating, and drops TTS that hasn't been delivered. Returns
+        the cancellation latency in seconds, or None if nothing was running.
+        """
+        tasks = [t for t in self._tasks if not t.done() and t is not asyncio.current_task()]
+        if not tasks:
+            return None
+        start = time.perf_counter()
+        for task in tasks:
+            task.cancel()
+        await asyncio.wait(tasks, timeout=CANCEL_TIMEOUT_S)
+        latency = time.perf_counter() - start
+        self.last_cancel_latency = latency
+        print(f"⏹️  Turn cancelled (session {self.id}) in {latency * 1000:.0f}ms")
+        try:
+            await self.send({"type": "cancelled"})
+        except Exception:
+            pass
+        return latency
+
+
+class SessionRegistry:
+    def __init__(self):
+        self._sessions = {}
+
+    def add(self, session: ClientSession):
+        self._sessions[session.id] = session
+
+    def remove(self, session: ClientSession):
+        self._sessions.pop(session.id, None)
+
+    def __len__(self):
+        return len(self._sessions)
+
+    async def broadcast(self, msg: dict):
+        """Send `msg` to every open session; sockets that fail are skipped."""
+        await asyncio.gather(*(s.send(msg) for s in list(self._sessions.values())), return_exceptions=True)
+
+    def voice_target(self) -> ClientSession | None:
+        """The session voice input belongs to: the most recently active one with voice on."""
+        candidates = [s for s in self._sessions.values() if s.voice_enabled]
+        return max(candidates, key=lambda s: s.last_active, default=None)
+
+
+class GenerationScheduler:
+    def __init__(self, max_concurrent: int = MAX_CONCURRENT_GENERATIONS):
+        self.max_concurrent = max_concurrent
+        self.active = 0
+        self._queues = OrderedDict()   # session id -> deque of waiter futures
+
+    def waiting(self) -> int:
+        return sum(len(q) for q in self._queues.values())
+
+    def _position(self, session_id) -> int:
+        # Sessions are served round-robin, so position is the session's place in that rotation
+        ids = list(self._queues)
+        return ids.index(session_id) + 1 if session_id in self._queues else 0
+
+    @asynccontextmanager
+    async def slot(self, session: ClientSession):
+        await self._acquire(session)
+        try:
+            yield
+        finally:
+            self._release()
+
+    async def _acquire(self, session: ClientSession):
+        if self.active < self.max_concurrent and not self._queues:
+            self.active += 1
+            return
+
+        fut = asyncio.get_running_loop().create_future()
+        self._queues.setdefault(session.id, deque()).append(fut)
+        try:
+            await session.send({"type": "queued", "position": self._position(session.id)})
+            await fut
+        except BaseException:  # cancelled, or the socket went away
+            if fut.done() and not fut.cancelled():
+                self._release()  # we were handed a slot but won't use it
+            else:
+                q = self._queues.get(session.id)
+                if q and fut in q:
+                    q.remove(fut)
+                    if not q:
+                        del self._queues[session.id]
+            raise
+
+    def _release(self):
+        while self._queues:
+            session_id, q = next(iter(self._queues.items()))
+            fut = q.popleft()
+            if q:
+                self._queues.move_to_end(session_id)
+            else:
+                del self._queues[session_id]
+            if not fut.done():
+                fut.set_result(None)  # hand our slot straight to the next waiter
+                return
+        self.active -= 1
@@ -0,0 +1,151 @@
+"""
+Sentence-level streaming TTS.
+
+Tokens from the LLM are split into sentences as they arrive, each sentence is
+handed to the TTS worker pool straight away, and finished audio is delivered
+strictly in order while later sentences are still being generated and
+synthesized. Time-to-first-audio is measured from pipeline creation (i.e. the
+start of the turn) to the moment the first sentence is delivered.
+"""
+
+import asyncio
+import queue
+import re
+import threading
+import time
+
+from config import VOICE_MODEL
+from tts import get_engine
+
+# End of sentence: terminal punctuation (plus closing quotes/brackets) followed
+# by whitespace, or a newline. "3.5" and "e.g.x" don't match.
+_SENTENCE_END = re.compile(r"[.!?]+[\"')\]]*\s+|\n+")
+
+
+class SentenceSplitter:
+    """Incrementally split a token stream into speakable sentences.
+
+    Fragments shorter than `min_chars` are held back and merged with the
+    next sentence so tiny pieces like "Sure." don't each pay TTS overhead.
+    """
+
+    def __init__(self, min_chars: int = 12):
+        self.min_chars = min_chars
+        self._buf = ""
+
+    def feed(self, token: str) -> list[str]:
+        self._buf += token
+        out = []
+        start = 0
+        for m in _SENTENCE_END.finditer(self._buf):
+            sentence = self._buf[start:m.end()].strip()
+            if len(sentence) >= self.min_chars:
+                out.append(sentence)
+                start = m.end()
+        self._buf = self._buf[start:]
+        return out
+
+    def flush(self) -> str:
+        rest, self._buf = self._buf.strip(), ""
+        return rest
+
+
+class _PipelineBase:
+    def __init__(self, model: str = VOICE_MODEL, min_chars: int = 12):
+        self.model = model
+        self.splitter = SentenceSplitter(min_chars)
+        self.started = time.perf_counter()
+        self.time_to_first_audio = None
+        self.sentences = 0
+
+    def _mark_delivered(self):
+        if self.time_to_first_audio is None:
+            self.time_to_first_audio = time.perf_counter() - self.started
+            print(f"⏱️  Time to first audio: {self.time_to_first_audio:.2f}s")
+
+
+class AsyncSpeechPipeline(_PipelineBase):
+    """Pipeline for the event loop: `send` is an async callable taking a Synthesis."""
+
+    def __init__(self, send, model: str = VOICE_MODEL, min_chars: int = 12):
+        super().__init__(model, min_chars)
+        self._send = send
+        self._pending = asyncio.Queue()
+        self._task = asyncio.create_task(self._deliver())
+
+    def feed(self, token: str):
+        for sentence in self.splitter.feed(token):
+            self._enqueue(sentence)
+
+    def _enqueue(self, sentence: str):
+        self.sentences += 1
+        fut = asyncio.wrap_future(get_engine().submit(sentence, self.model))
+        self._pending.put_nowait(fut)
+
+    async def _deliver(self):
+        while True:
+            fut = await self._pending.get()
+            if fut is None:
+                return
+            try:
+                synth = await fut
+            except Exception as e:
+                print(f"TTS error: {e}")
+                continue
+            self._mark_delivered()
+            await self._send(synth)
+
+    def cancel(self):
+        """Drop everything not yet delivered: queued syntheses are cancelled, delivery stops."""
+        self._task.cancel()
+        while not self._pending.empty():
+            fut = self._pending.get_nowait()
+            if fut is not None:
+                fut.cancel()
+
+    async def finish(self):
+        """Speak whatever is left in the buffer and wait for delivery to drain."""
+        rest = self.splitter.flush()
+        if rest:
+            self._enqueue(rest)
+        self._pending.put_nowait(None)
+        await self._task
+
+
+class SpeechPipeline(_PipelineBase):
+    """Thread-based pipeline for blocking callers: `play` is called with each Synthesis."""
+
+    def __init__(self, play, model: str = VOICE_MODEL, min_chars: int = 12):
+        super().__init__(model, min_chars)
+        self._play = play
+        self._pending = queue.Queue()
+        self._thread = threading.Thread(target=self._deliver, daemon=True)
+        self._thread.start()
+
+    def feed(self, token: str):
+        for sentence in self.splitter.feed(token):
+            self._enqueue(sentence)
+
+    def _enqueue(self, sentence: str):
+        self.sentences += 1
+        self._pending.put(get_engine().submit(sentence, self.model))
+
+    def _deliver(self):
+        while True:
+            fut = self._pending.get()
+            if fut is None:
+                return
+            try:
+                synth = fut.result()
+            except Exception as e:
+                print("TTS Error:", e)
+                continue
+            self._mark_delivered()
+            self._play(synth)
+
+    def finish(self):
+        rest = self.splitter.flush()
+        if rest:
+            self._enqueue(rest)
+        self._pending.put(None)
+        self._thread.join()
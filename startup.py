@@ -0,0 +1,125 @@
+"""
+Background model loading and readiness tracking.
+
+The desktop window should appear as soon as the web server is up, not after
+every model has loaded. Startup loads each heavy component on its own thread
+(LLM warmup, embedder, Whisper, the Piper voice, the knowledge index), in
+parallel except where one declares it needs another, and tracks a state for
+each: pending → loading → ready (or failed), with its load time.
+
+Features list the components they need (FEATURES). Listeners get a snapshot
+on every change; app.py forwards it to connected windows as a `readiness`
+message and static/app.js shows what is still warming up. Code that can do
+without a component checks `ready()` and degrades instead of blocking: text
+chat skips memory/knowledge lookup until the embedder is loaded, and the
+voice loop waits for Whisper and the voice.
+
+A component nobody registered counts as ready, so scripts and benchmarks
+that don't run the orchestrator behave as before.
+"""
+
+import threading
+import time
+from dataclasses import dataclass
+
+FEATURES = {
+    "text": ("llm",),
+    "context": ("embedder",),
+    "voice": ("whisper", "tts"),
+}
+
+
+@dataclass
+class Component:
+    name: str
+    load: callable
+    after: tuple = ()
+    state: str = "pending"
+    seconds: float | None = None
+    error: str | None = None
+
+
+class Startup:
+    def __init__(self, features=FEATURES):
+        self.features = features
+        self._components = {}
+        self._done = {}
+        self._listeners = []
+        self._lock = threading.Lock()
+        self.started = None
+
+    def add(self, name: str, load, after=()):
+        """Register `load()` as component `name`, run once every component in `after` is done."""
+        self._components[name] = Component(name, load, tuple(after))
+        self._done[name] = threading.Event()
+
+    def subscribe(self, listener):
+        """Call `listener(snapshot)` on every state change (from loader threads)."""
+        self._listeners.append(listener)
+
+    def start(self):
+        self.started = time.perf_counter()
+        for comp in self._components.values():
+            threading.Thread(target=self._run, args=(comp,), name=f"load-{comp.name}", daemon=True).start()
+
+    def _run(self, comp: Component):
+        for dep in comp.after:
+            if dep in self._done:
+                self._done[dep].wait()
+        self._set(comp, "loading")
+        start = time.perf_counter()
+        try:
+            comp.load()
+            state = "ready"
+        except Exception as e:
+            comp.error = str(e)
+            state = "failed"
+        comp.seconds = time.perf_counter() - start
+        if state == "ready":
+            print(f"✅ {comp.name} ready in {comp.seconds:.2f}s")
+        else:
+            print(f"⚠️  {comp.name} failed to load after {comp.seconds:.2f}s: {comp.error}")
+        self._set(comp, state)
+        self._done[comp.name].set()
+        if all(e.is_set() for e in self._done.values()):
+            print(f"🚀 Startup complete in {time.perf_counter() - self.started:.2f}s")
+
+    def _set(self, comp: Component, state: str):
+        with self._lock:
+            comp.state = state
+        snapshot = self.snapshot()
+        for listener in self._listeners:
+            try:
+                listener(snapshot)
+            except Exception as e:
+                print(f"Readiness listener error: {e}")
+
+    def ready(self, name: str) -> bool:
+        comp = self._components.get(name)
+        return comp is None or comp.state == "ready"
+
+    def wait(self, name: str, timeout: float | None = None) -> bool:
+        """Block until `name` has finished loading; True if it is ready."""
+        done = self._done.get(name)
+        if done is not None:
+            done.wait(timeout)
+        return self.ready(name)
+
+    def feature_ready(self, feature: str) -> bool:
+        return all(self.ready(name) for name in self.features.get(feature, ()))
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            components = {
+                c.name: {"state": c.state, "seconds": None if c.seconds is None else round(c.seconds, 2),
+                         **({"error": c.error} if c.error else {})}
+                for c in self._components.values()
+            }
+        return {
+            "type": "readiness",
+            "components": components,
+            "features": {f: self.feature_ready(f) for f in self.features},
+        }
+
+
+startup = Startup()
@@ -23,11 +23,20 @@ const toVoiceBtn = document.getElementById('toVoiceBtn');
 // ─── State ──────────────────────────────────────────────────────────────
 let ws = null;
 let currentStreamEl = null;
+let partialInputEl = null;
+let toolOutputEl = null;
 let isStreaming = false;
-let audioQueue = [];
-let isPlayingAudio = false;
+let audioCtx = null;
+let playhead = 0;              // AudioContext time at which the next frame starts
+let scheduledSources = new Set();
+let playbackActive = false;    // last playback state reported to the server
+let latestTurn = 0;            // highest turn id seen from the server
+let droppedTurn = 0;           // frames from this turn or older are ignored
+let turnStartedAt = null;      // for time-to-first-sample logging
 let inputMode = 'voice';
 let voiceEnabled = true;
+let readiness = null;          // latest model-loading snapshot from the server
+let currentState = 'online';
 
 // ─── Mode Toggle ────────────────────────────────────────────────────────
 toTextBtn.addEventListener('click', () => {
@@ -66,7 +75,7 @@ function toggleVoice(enabled) {
         micToggle.classList.remove('paused');
         micOnIcon.style.display = 'block';
         micOffIcon.style.display = 'none';
-        micLabel.textContent = 'LISTENING…';
+        micLabel.textContent = voiceReady() ? 'LISTENING…' : 'VOICE WARMING UP…';
     } else {
         micToggle.classList.remove('active-listening');
         micToggle.classList.add('paused');
@@ -77,15 +86,31 @@ function toggleVoice(enabled) {
 }
 
 // ─── Status Helpers ─────────────────────────────────────────────────────
+// While models are still loading in the background the idle status names
+// them; text chat works meanwhile, voice once Whisper and the voice are in.
+function voiceReady() {
+    return !readiness || readiness.features.voice;
+}
+
+function onlineLabel() {
+    if (!readiness) return 'SYSTEM ONLINE';
+    const components = Object.entries(readiness.components);
+    const loading = components.filter(([, c]) => c.state === 'pending' || c.state === 'loading');
+    const failed = components.filter(([, c]) => c.state === 'failed');
+    if (loading.length) return `WARMING UP · ${loading.map(([name]) => name.toUpperCase()).join(', ')}`;
+    if (failed.length) return `DEGRADED · ${failed.map(([name]) => name.toUpperCase()).join(', ')} FAILED`;
+    return 'SYSTEM ONLINE';
+}
+
 function setStatus(state) {
     const labels = {
-        online: 'SYSTEM ONLINE',
         listening: 'LISTENING…',
         thinking: 'PROCESSING…',
         speaking: 'SPEAKING…',
         error: 'DISCONNECTED',
     };
-    statusText.textContent = labels[state] || 'SYSTEM ONLINE';
+    currentState = state;
+    statusText.textContent = labels[state] || onlineLabel();
     statusDot.classList.toggle('active', state !== 'error');
     statusText.classList.toggle('active', state !== 'error');
 
@@ -99,10 +124,15 @@ function setStatus(state) {
 function connectWS() {
     const proto = location.protocol === 'https:' ? 'wss' : 'ws';
     ws = new WebSocket(`${proto}://${location.host}/ws/chat`);
+    ws.binaryType = 'arraybuffer';
 
     ws.onopen = () => {
         setStatus('online');
         console.log('[WS] connected');
+        // A new connection is a new server session: its turn ids start from 1 again
+        latestTurn = 0;
+        droppedTurn = 0;
+        playbackActive = false;
         // Tell server voice is enabled
         ws.send(JSON.stringify({ type: 'voice_toggle', enabled: voiceEnabled }));
     };
@@ -116,12 +146,42 @@ function connectWS() {
     ws.onerror = (e) => console.error('[WS] error', e);
 
     ws.onmessage = (event) => {
+        // Binary messages are speech (see audio_protocol.py)
+        if (event.data instanceof ArrayBuffer) {
+            handleAudioFrame(event.data);
+            return;
+        }
         const msg = JSON.parse(event.data);
 
         switch (msg.type) {
+            // Live transcript while the user is still speaking
+            case 'voice_input_partial':
+                if (!partialInputEl) {
+                    partialInputEl = addMessage('user', '');
+                    partialInputEl.parentElement.classList.add('partial');
+                }
+                partialInputEl.textContent = msg.text;
+                break;
+
             // Server detected voice input
             case 'voice_input':
-                addMessage('user', msg.text);
+                turnStartedAt = performance.now();
+                if (partialInputEl) {
+                    partialInputEl.textContent = msg.text;
+                    partialInputEl.parentElement.classList.remove('partial');
+                    partialInputEl = null;
+                } else {
+                    addMessage('user', msg.text);
+                }
+                break;
+
+            // Background model loading progress
+            case 'readiness':
+                readiness = msg;
+                if (currentState === 'online') setStatus('online');
+                if (voiceEnabled) {
+                    micLabel.textContent = voiceReady() ? 'LISTENING…' : 'VOICE WARMING UP…';
+                }
                 break;
 
             // Server status updates (listening/thinking)
@@ -133,6 +193,7 @@ function connectWS() {
                 break;
 
             case 'stream_start':
+                latestTurn = Math.max(latestTurn, msg.turn || 0);
                 isStreaming = true;
                 setStatus('thinking');
                 currentStreamEl = addMessage('jarvis', '', true);
@@ -150,12 +211,44 @@ function connectWS() {
                 }
                 break;
 
+            // Tool output streamed while the tool is still running
+            case 'tool_output':
+                if (!toolOutputEl) toolOutputEl = addMessage('tool', '', true);
+                appendToken(toolOutputEl, msg.text);
+                break;
+
             case 'tool_result':
+                if (msg.turn) latestTurn = Math.max(latestTurn, msg.turn);
+                if (toolOutputEl) {
+                    toolOutputEl.textContent = msg.text;
+                    finishStream(toolOutputEl);
+                    toolOutputEl = null;
+                } else {
+                    addMessage('tool', msg.text);
+                }
+                break;
+
+            // Backpressure from the server's generation scheduler
+            case 'queued':
+                statusText.textContent = `QUEUED #${msg.position}…`;
+                break;
+
+            case 'busy':
                 addMessage('tool', msg.text);
                 break;
 
-            case 'audio':
-                queueAudio(msg.data);
+            // Reply interrupted (barge-in or Esc): drop its audio and close the bubble
+            case 'cancelled':
+                isStreaming = false;
+                if (currentStreamEl) {
+                    finishStream(currentStreamEl);
+                    currentStreamEl = null;
+                }
+                if (toolOutputEl) {
+                    finishStream(toolOutputEl);
+                    toolOutputEl = null;
+                }
+                stopAudio();
                 break;
         }
     };
@@ -204,32 +297,101 @@ function finishStream(el) {
 }
 
 // ─── Audio Playback ─────────────────────────────────────────────────────
-function queueAudio(b64) {
-    audioQueue.push(b64);
-    if (!isPlayingAudio) playNextAudio();
+// Each binary frame: 16-byte little-endian header (version, codec, flags,
+// turn id, sequence, sample rate) followed by 16-bit mono PCM. Frames are
+// scheduled back to back on a Web Audio timeline as they arrive, so speech
+// starts with the first frame instead of after a whole clip.
+const FRAME_HEADER_BYTES = 16;
+const FLAG_LAST = 1;
+
+function getAudioContext() {
+    if (!audioCtx) audioCtx = new (window.AudioContext || window.webkitAudioContext)();
+    if (audioCtx.state === 'suspended') audioCtx.resume();
+    return audioCtx;
 }
 
-function playNextAudio() {
-    if (audioQueue.length === 0) {
-        isPlayingAudio = false;
-        setStatus('online');
-        return;
+function handleAudioFrame(buf) {
+    const view = new DataView(buf);
+    const flags = view.getUint16(2, true);
+    const turn = view.getUint32(4, true);
+    const sampleRate = view.getUint32(12, true);
+
+    if (turn <= droppedTurn) return;   // audio from a cancelled reply
+    latestTurn = Math.max(latestTurn, turn);
+    if ((flags & FLAG_LAST) || buf.byteLength <= FRAME_HEADER_BYTES) return;
+
+    const pcm = new Int16Array(buf, FRAME_HEADER_BYTES);
+    const ctx = getAudioContext();
+    const buffer = ctx.createBuffer(1, pcm.length, sampleRate);
+    const channel = buffer.getChannelData(0);
+    for (let i = 0; i < pcm.length; i++) channel[i] = pcm[i] / 32768;
+
+    const source = ctx.createBufferSource();
+    source.buffer = buffer;
+    source.connect(ctx.destination);
+    const startAt = Math.max(playhead, ctx.currentTime + 0.02);
+    source.start(startAt);
+    playhead = startAt + buffer.duration;
+
+    if (turnStartedAt !== null) {
+        const ms = performance.now() - turnStartedAt + (startAt - ctx.currentTime) * 1000;
+        console.log(`[audio] time to first sample: ${ms.toFixed(0)}ms`);
+        turnStartedAt = null;
     }
-    isPlayingAudio = true;
+
+    scheduledSources.add(source);
+    source.onended = () => {
+        scheduledSources.delete(source);
+        if (scheduledSources.size === 0) {
+            setStatus('online');
+            reportPlayback(false);
+        }
+    };
     setStatus('speaking');
+    reportPlayback(true);
+}
+
+// The server ignores barge-in while the speakers play, so the mic picking
+// up Jarvis's own voice doesn't cut the reply off
+function reportPlayback(active) {
+    if (active === playbackActive) return;
+    playbackActive = active;
+    if (ws && ws.readyState === WebSocket.OPEN) {
+        ws.send(JSON.stringify({ type: 'playback', active }));
+    }
+}
+
+function stopAudio() {
+    droppedTurn = latestTurn;
+    for (const source of scheduledSources) {
+        source.onended = null;
+        try { source.stop(); } catch (e) { /* not started yet */ }
+    }
+    scheduledSources.clear();
+    playhead = 0;
+    setStatus('online');
+    reportPlayback(false);
+}
 
-    const b64 = audioQueue.shift();
-    const audio = new Audio('data:audio/wav;base64,' + b64);
-    audio.onended = () => playNextAudio();
-    audio.onerror = () => playNextAudio();
-    audio.play().catch(() => playNextAudio());
+// ─── Cancel (Esc) ───────────────────────────────────────────────────────
+function cancelReply() {
+    if (ws && ws.readyState === WebSocket.OPEN) {
+        ws.send(JSON.stringify({ type: 'cancel' }));
+    }
+    stopAudio();
 }
 
+document.addEventListener('keydown', (e) => {
+    if (e.key === 'Escape') cancelReply();
+});
+
 // ─── Send Text ──────────────────────────────────────────────────────────
 function sendText() {
     const text = msgInput.value.trim();
     if (!text || !ws || ws.readyState !== WebSocket.OPEN) return;
     addMessage('user', text);
+    getAudioContext();   // created inside a user gesture so playback is allowed
+    turnStartedAt = performance.now();
     ws.send(JSON.stringify({ text }));
     msgInput.value = '';
 }
@@ -0,0 +1,430 @@
+"""
+Incremental speech-to-text on top of faster-whisper.
+
+While an utterance is still being captured, `StreamingTranscriber.update`
+re-decodes the not-yet-committed tail of the audio every `interval_s`
+seconds. Words that two consecutive decodes agree on (LocalAgreement) are
+committed: they become the stable partial hypothesis, and the audio they
+cover is dropped from later windows, with the committed text passed as the
+prompt so the next window keeps its context. `finalize` only has to decode
+the remaining tail once the utterance ends.
+
+STTEngine is the one faster-whisper model both apps share. Its tier,
+compute type, CPU threads, workers, final beam size and the built-in VAD
+filter come from config.py (STTConfig). With STT_AUTOTUNE, `load()` first
+decodes a sample clip with every candidate tier / thread count / beam size
+and keeps the fastest setting whose word error rate stays under
+STT_TUNE_MAX_WER; the result is saved and reused until the candidates, the
+clip or the machine change. `python stt.py` reruns the tuning.
+
+`transcribe_batch` decodes several utterances in one batched call
+(faster-whisper's BatchedInferencePipeline, or the worker pool on versions
+without it or if the batched call fails), and `submit` queues an utterance
+for the batcher thread: every utterance that arrives while a batch is
+decoding goes into the next one.
+"""
+
+import hashlib
+import json
+import os
+import queue
+import re
+import threading
+import time
+from bisect import bisect_right
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import asdict, dataclass, replace
+
+import numpy as np
+
+from config import (
+    STT_PARTIAL_INTERVAL_S, STT_MODEL, STT_COMPUTE_TYPE, STT_CPU_THREADS, STT_NUM_WORKERS,
+    STT_BEAM_SIZE, STT_VAD_FILTER, STT_BATCH_SIZE, STT_AUTOTUNE, STT_TUNE_CLIP,
+    STT_TUNE_REFERENCE, STT_TUNE_MAX_WER, STT_TUNE_TIERS, STT_TUNE_BEAMS, STT_TUNING_PATH,
+)
+
+SAMPLE_RATE = 16000
+
+
+def _norm(word: str) -> str:
+    return re.sub(r"[^\w']", "", word.lower())
+
+
+class StreamingTranscriber:
+    def __init__(self, model, sample_rate: int = 16000, interval_s: float = STT_PARTIAL_INTERVAL_S):
+        self.model = model
+        self.sample_rate = sample_rate
+        self.interval = int(interval_s * sample_rate)
+        self.reset()
+
+    def reset(self):
+        self._committed = []        # stable words
+        self._committed_until = 0   # sample offset covered by committed words
+        self._hypothesis = []       # (word, end_sample) from the previous decode
+        self._decoded_len = 0
+
+    @property
+    def text(self) -> str:
+        """Stable (committed) text so far."""
+        return " ".join(self._committed)
+
+    @property
+    def hypothesis(self) -> str:
+        """Best guess so far: committed text plus the latest unconfirmed words."""
+        return " ".join(self._committed + [w for w, _ in self._hypothesis])
+
+    def _decode(self, audio: np.ndarray, fast: bool):
+        window = audio[self._committed_until:]
+        segments, _ = self.model.transcribe(
+            window,
+            beam_size=1 if fast else getattr(self.model, "beam_size", STT_BEAM_SIZE),
+            word_timestamps=True,
+            condition_on_previous_text=False,
+            initial_prompt=" ".join(self._committed[-30:]) or None,
+        )
+        words = []
+        for seg in segments:
+            for w in seg.words or []:
+                word = w.word.strip()
+                if word:
+                    end = self._committed_until + int(w.end * self.sample_rate)
+                    words.append((word, end))
+        return words
+
+    def update(self, audio: np.ndarray) -> str | None:
+        """Feed the utterance captured so far; returns new stable text, or None."""
+        if len(audio) - self._decoded_len < self.interval:
+            return None
+        self._decoded_len = len(audio)
+
+        words = self._decode(audio, fast=True)
+        agreed = 0
+        for (prev, _), (cur, _) in zip(self._hypothesis, words):
+            if _norm(prev) != _norm(cur):
+                break
+            agreed += 1
+
+        if agreed:
+            self._committed.extend(w for w, _ in words[:agreed])
+            self._committed_until = words[agreed - 1][1]
+        # Remaining words are compared against the next decode
+        self._hypothesis = words[agreed:]
+        return self.text if agreed else None
+
+    def finalize(self, audio: np.ndarray) -> str:
+        """Decode the uncommitted tail of the finished utterance and return the full text."""
+        tail = [w for w, _ in self._decode(audio, fast=False)] if len(audio) > self._committed_until else []
+        text = " ".join(self._committed + tail).strip()
+        self.reset()
+        return text
+
+
+def wer(reference: str, hypothesis: str) -> float:
+    """Word error rate of `hypothesis` against `reference` (case and punctuation ignored)."""
+    ref = [w for w in map(_norm, reference.split()) if w]
+    hyp = [w for w in map(_norm, hypothesis.split()) if w]
+    row = list(range(len(hyp) + 1))
+    for i, r in enumerate(ref, 1):
+        diag, row[0] = row[0], i
+        for j, h in enumerate(hyp, 1):
+            diag, row[j] = row[j], min(row[j] + 1, row[j - 1] + 1, diag + (r != h))
+    return row[-1] / max(1, len(ref))
+
+
+# ─── Engine ─────────────────────────────────────────────────────────────
+@dataclass(frozen=True)
+class STTConfig:
+    model: str = STT_MODEL
+    compute_type: str = STT_COMPUTE_TYPE
+    cpu_threads: int = STT_CPU_THREADS
+    num_workers: int = STT_NUM_WORKERS
+    beam_size: int = STT_BEAM_SIZE
+    vad_filter: bool = STT_VAD_FILTER
+
+    @property
+    def threads(self) -> int:
+        """Threads per decode; 0 in the config splits all cores between the workers."""
+        return self.cpu_threads or max(1, (os.cpu_count() or 4) // self.num_workers)
+
+
+def load_model(config: STTConfig):
+    from faster_whisper import WhisperModel
+
+    print(f"⏳ Loading Whisper {config.model} ({config.compute_type}, "
+          f"{config.threads} threads × {config.num_workers} workers) …")
+    return WhisperModel(config.model, device="cpu", compute_type=config.compute_type,
+                        cpu_threads=config.threads, num_workers=config.num_workers)
+
+
+class STTEngine:
+    """The shared Whisper model: lazy load, optional auto-tune, batched decoding.
+
+    `transcribe` has WhisperModel's signature, with the configured beam size
+    and VAD filter as defaults, so the engine can stand in for the model
+    (StreamingTranscriber takes it as its `model`).
+    """
+
+    def __init__(self, config: STTConfig | None = None, autotune: bool = STT_AUTOTUNE,
+                 batch_size: int = STT_BATCH_SIZE):
+        self.config = config or STTConfig()
+        self.autotune = autotune
+        self.batch_size = batch_size
+        self._model = None
+        self._pipeline = None
+        self._clip_seconds = True   # faster-whisper 1.2+ takes clip_timestamps in seconds, 1.1 in samples
+        self._load_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._pool = None
+        self._queue = queue.Queue()
+        self._thread = None
+        self.calls = 0
+        self.batches = 0
+        self.audio_seconds = 0.0
+        self.decode_seconds = 0.0
+
+    @property
+    def beam_size(self) -> int:
+        return self.config.beam_size
+
+    @property
+    def model(self):
+        if self._model is None:
+            with self._load_lock:
+                if self._model is None:
+                    if self.autotune:
+                        self.config = autotune()
+                    self._model = load_model(self.config)
+        return self._model
+
+    def load(self):
+        return self.model
+
+    def _count(self, audio_seconds: float, seconds: float, utterances: int = 1):
+        with self._lock:
+            self.calls += utterances
+            self.audio_seconds += audio_seconds
+            self.decode_seconds += seconds
+
+    def transcribe(self, audio: np.ndarray, beam_size: int | None = None, **kwargs):
+        """Decode `audio` (float32, 16 kHz); returns (segments, info) like WhisperModel."""
+        kwargs.setdefault("vad_filter", self.config.vad_filter)
+        start = time.perf_counter()
+        segments, info = self.model.transcribe(audio, beam_size=beam_size or self.config.beam_size, **kwargs)
+        # Decoding happens while the segments are consumed
+        segments = list(segments)
+        self._count(len(audio) / SAMPLE_RATE, time.perf_counter() - start)
+        return segments, info
+
+    def transcribe_text(self, audio: np.ndarray, **kwargs) -> str:
+        segments, _ = self.transcribe(audio, **kwargs)
+        return " ".join(seg.text.strip() for seg in segments).strip()
+
+    # Batching
+    def _batched(self):
+        """BatchedInferencePipeline over the model, or None if faster-whisper predates it."""
+        if self._pipeline is None:
+            try:
+                from faster_whisper import BatchedInferencePipeline, __version__
+            except ImportError:
+                self._pipeline = False
+            else:
+                version = tuple(int(p) for p in re.findall(r"\d+", __version__)[:2])
+                self._clip_seconds = version >= (1, 2)
+                self._pipeline = BatchedInferencePipeline(model=self.model)
+        return self._pipeline or None
+
+    def _pooled(self, audios) -> list[str]:
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.config.num_workers, thread_name_prefix="stt")
+        with self._lock:
+            self.batches += 1
+        return list(self._pool.map(self.transcribe_text, audios))
+
+    def transcribe_batch(self, audios) -> list[str]:
+        """Transcribe several utterances (each at most 30 s) together; one text per utterance."""
+        audios = [np.asarray(a, dtype=np.float32) for a in audios]
+        if len(audios) <= 1:
+            return [self.transcribe_text(a) for a in audios]
+        pipeline = self._batched()
+        if pipeline is None:
+            return self._pooled(audios)
+
+        # One clip per utterance, laid end to end; each segment comes back
+        # with its clip's offset, which maps it to its utterance.
+        starts, clips, offset = [], [], 0
+        for audio in audios:
+            starts.append(offset / SAMPLE_RATE)
+            end = offset + len(audio)
+            if self._clip_seconds:
+                clips.append({"start": offset / SAMPLE_RATE, "end": end / SAMPLE_RATE})
+            else:
+                clips.append({"start": offset, "end": end})
+            offset = end
+        start = time.perf_counter()
+        texts = [[] for _ in audios]
+        try:
+            segments, _ = pipeline.transcribe(
+                np.concatenate(audios), clip_timestamps=clips, batch_size=len(audios),
+                beam_size=self.config.beam_size, vad_filter=False,
+            )
+            for seg in segments:
+                texts[bisect_right(starts, seg.start + 1e-3) - 1].append(seg.text.strip())
+        except (TypeError, ValueError) as e:
+            # A faster-whisper whose batched API doesn't take these arguments
+            print(f"⚠️  Batched transcription unavailable, using the worker pool: {e}")
+            self._pipeline = False
+            return self._pooled(audios)
+        self._count(offset / SAMPLE_RATE, time.perf_counter() - start, len(audios))
+        with self._lock:
+            self.batches += 1
+        return [" ".join(t).strip() for t in texts]
+
+    def submit(self, audio: np.ndarray) -> Future:
+        """Queue an utterance for batched decoding; returns a Future[str]."""
+        fut = Future()
+        self._ensure_started()
+        self._queue.put((audio, fut))
+        return fut
+
+    def _ensure_started(self):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="stt-batcher", daemon=True)
+                    self._thread.start()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            # No waiting: whatever queued up during the last batch joins this one
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                texts = self.transcribe_batch([audio for audio, _ in batch])
+            except Exception as e:
+                for _, fut in batch:
+                    fut.set_exception(e)
+                continue
+            for (_, fut), text in zip(batch, texts):
+                fut.set_result(text)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                **asdict(self.config),
+                "utterances": self.calls,
+                "batches": self.batches,
+                "queued": self._queue.qsize(),
+                "rtf": round(self.decode_seconds / self.audio_seconds, 3) if self.audio_seconds else 0.0,
+            }
+
+
+# ─── Auto-tune ──────────────────────────────────────────────────────────
+def read_clip(path) -> np.ndarray:
+    """A 16 kHz 16-bit WAV (path or file object) as float32 samples, as Whisper takes them."""
+    from audio_capture import read_wav
+
+    pcm, rate = read_wav(path)
+    if rate != SAMPLE_RATE:
+        raise ValueError(f"{path}: {rate} Hz, expected {SAMPLE_RATE} Hz")
+    return pcm.astype(np.float32) / 32768.0
+
+
+def autotune(clip: str = STT_TUNE_CLIP, reference: str | None = STT_TUNE_REFERENCE,
+             max_wer: float = STT_TUNE_MAX_WER, tiers=STT_TUNE_TIERS, beams=STT_TUNE_BEAMS,
+             threads=None, repeats: int = 2, path: str | None = STT_TUNING_PATH,
+             force: bool = False) -> STTConfig:
+    """Benchmark candidate settings on `clip` and return the fastest within `max_wer`.
+
+    Every tier is loaded once per thread count and decodes the clip with each
+    beam size (after one warmup decode); the median of `repeats` runs counts.
+    Without a `reference` transcript, the most accurate candidate's output
+    (last tier, widest beam, most threads) is the reference. The result is
+    stored at `path` and returned directly while the inputs stay the same.
+    """
+    base = STTConfig(num_workers=1)
+    cores = os.cpu_count() or 4
+    threads = tuple(threads or sorted({max(1, cores // 4), max(1, cores // 2), cores}))
+    audio = read_clip(clip)
+    key = {
+        "clip": hashlib.sha1(audio.tobytes()).hexdigest(),
+        "cores": cores,
+        "tiers": list(tiers),
+        "beams": list(beams),
+        "threads": list(threads),
+        "compute_type": base.compute_type,
+        "reference": reference,
+        "max_wer": max_wer,
+    }
+    if path and not force and os.path.exists(path):
+        try:
+            with open(path, encoding="utf-8") as f:
+                saved = json.load(f)
+            if saved.get("key") == key:
+                config = replace(STTConfig(), **saved["config"])
+                print(f"🎛️  Whisper settings from {path}: {config.model}, "
+                      f"{config.cpu_threads} threads, beam {config.beam_size}")
+                return config
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"⚠️  Ignoring {path}: {e}")
+
+    print(f"🎛️  Tuning Whisper on {clip} ({len(audio) / SAMPLE_RATE:.1f}s): "
+          f"tiers {', '.join(tiers)} × threads {threads} × beams {beams}")
+    results = []
+    for tier in tiers:
+        for n in threads:
+            engine = STTEngine(replace(base, model=tier, cpu_threads=n), autotune=False)
+            engine.transcribe_text(audio)
+            for beam in beams:
+                times, text = [], ""
+                for _ in range(repeats):
+                    start = time.perf_counter()
+                    text = engine.transcribe_text(audio, beam_size=beam)
+                    times.append(time.perf_counter() - start)
+                times.sort()
+                results.append({"model": tier, "cpu_threads": n, "beam_size": beam,
+                                "seconds": round(times[len(times) // 2], 4), "text": text})
+            del engine
+
+    if reference is None:
+        best = [r for r in results if r["model"] == tiers[-1] and r["beam_size"] == max(beams)]
+        reference = max(best, key=lambda r: r["cpu_threads"])["text"]
+    for r in results:
+        r["wer"] = round(wer(reference, r["text"]), 3)
+    accepted = [r for r in results if r["wer"] <= max_wer]
+    pick = (min(accepted, key=lambda r: r["seconds"]) if accepted
+            else min(results, key=lambda r: (r["wer"], r["seconds"])))
+
+    print(f"{'model':<10} {'threads':>7} {'beam':>4} {'seconds':>8} {'WER':>6}")
+    for r in sorted(results, key=lambda r: r["seconds"]):
+        flag = "  ←" if r is pick else ("" if r["wer"] <= max_wer else "  (WER)")
+        print(f"{r['model']:<10} {r['cpu_threads']:>7} {r['beam_size']:>4} {r['seconds']:8.3f} {r['wer']:6.1%}{flag}")
+    if not accepted:
+        print(f"⚠️  No candidate reached WER ≤ {max_wer:.0%}; using the most accurate")
+
+    config = replace(STTConfig(), model=pick["model"], cpu_threads=pick["cpu_threads"],
+                     beam_size=pick["beam_size"])
+    if path:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"key": key, "config": asdict(config), "reference": reference, "results": results}, f, indent=2)
+    return config
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_stt() -> STTEngine:
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = STTEngine()
+        return _engine
+
+
+if __name__ == "__main__":
+    autotune(force=True)
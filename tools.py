@@ -1,18 +1,24 @@
 import os
+import codecs
+import signal
 import datetime
+import threading
 import webbrowser
 import subprocess
 
+from config import COMMAND_TIMEOUT_S, TOOL_OUTPUT_LIMIT
+
+APPS = {
+    "chrome": "open -a 'Google Chrome'",
+    "safari": "open -a Safari",
+    "vscode": "open -a 'Visual Studio Code'",
+    "terminal": "open -a Terminal",
+    "youtube": "open https://youtube.com",
+}
+
 
 def open_app(name):
-    apps = {
-        "chrome": "open -a 'Google Chrome'",
-        "safari": "open -a Safari",
-        "vscode": "open -a 'Visual Studio Code'",
-        "terminal": "open -a Terminal",
-        "youtube": "open https://youtube.com",
-    }
-    cmd = apps.get(name.lower())
+    cmd = APPS.get(name.lower())
     if cmd:
         os.system(cmd)
         return f"Opened {name}"
@@ -28,8 +34,62 @@ def search_google(q):
     return f"Searching {q}"
 
 
-def run_command(cmd):
+def _kill(proc):
+    try:
+        if hasattr(os, "killpg"):
+            os.killpg(proc.pid, signal.SIGKILL)  # the shell and everything it started
+        else:
+            proc.kill()
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+def run_command(cmd, timeout=COMMAND_TIMEOUT_S, limit=TOOL_OUTPUT_LIMIT, on_output=None):
+    """Run a shell command, streaming its output to `on_output` as it arrives.
+
+    At most `limit` characters are read: once reached, or once `timeout`
+    seconds pass, the command is killed instead of being left to run and
+    buffer output nobody will see.
+    """
     try:
-        return subprocess.check_output(cmd, shell=True, text=True)[:500]
+        proc = subprocess.Popen(
+            cmd, shell=True, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+            stdin=subprocess.DEVNULL, start_new_session=True,
+        )
     except Exception as e:
-        return str(e)
\ No newline at end of file
+        return str(e)
+
+    timed_out = threading.Event()
+
+    def on_timeout():
+        timed_out.set()
+        _kill(proc)
+
+    timer = threading.Timer(timeout, on_timeout)
+    timer.start()
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    output, truncated = "", False
+    try:
+        while True:
+            chunk = os.read(proc.stdout.fileno(), 4096)
+            if not chunk:
+                break
+            text = decoder.decode(chunk)
+            if len(output) + len(text) >= limit:
+                text, truncated = text[:limit - len(output)], True
+            output += text
+            if on_output and text:
+                on_output(text)
+            if truncated:
+                _kill(proc)
+                break
+    finally:
+        timer.cancel()
+        proc.stdout.close()
+        proc.wait()
+
+    if timed_out.is_set():
+        output += f"\n[timed out after {timeout:g}s]"
+    elif truncated:
+        output += "\n[output truncated]"
+    return output
@@ -0,0 +1,305 @@
+"""
+Per-turn latency tracing, Prometheus metrics and a runtime profiler.
+
+Every turn gets a TurnTrace whose id ("<session>.<turn>" in the app,
+"voice.<n>" in voice_jarvis.py) is carried through all of its stages:
+recording, transcription, intent routing and tools, retrieval (embed /
+memory / knowledge), waiting for a generation slot, LLM prefill and decode,
+TTS, WebSocket sends and playback. The trace of the running turn lives in a
+ContextVar, so code deeper down (session sends, tool runs) records spans with
+the module-level span()/record() without being handed the trace; asyncio
+tasks and to_thread calls started from the turn inherit it.
+
+Each span is observed into a per-stage histogram exported in Prometheus text
+format (the /metrics route in app.py). With TRACE_PATH set, every finished
+turn is also appended to that file as one JSON line.
+
+The profiler samples the stacks of all threads (Whisper, Piper, retrieval,
+the event loop) and can be switched on and off while Jarvis runs: via
+/debug/profile in the app or SIGUSR1 in voice_jarvis.py. Stacks are written
+in the collapsed format flamegraph.pl and speedscope read.
+"""
+
+import contextvars
+import itertools
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+from config import TRACE_PATH, TRACE_BUCKETS, PROFILE_INTERVAL_S, PROFILE_DIR
+
+_current = contextvars.ContextVar("turn_trace", default=None)
+_voice_ids = itertools.count(1)
+
+
+# ─── Metrics ────────────────────────────────────────────────────────────
+class Histogram:
+    def __init__(self, buckets=TRACE_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * len(self.buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        for i, le in enumerate(self.buckets):
+            if value <= le:
+                self.counts[i] += 1
+                break
+        self.sum += value
+        self.count += 1
+
+    def lines(self, name, labels):
+        out, cumulative = [], 0
+        for le, n in zip(self.buckets, self.counts):
+            cumulative += n
+            out.append(f'{name}_bucket{{{labels},le="{le:g}"}} {cumulative}')
+        out.append(f'{name}_bucket{{{labels},le="+Inf"}} {self.count}')
+        out.append(f"{name}_sum{{{labels}}} {self.sum:.6f}")
+        out.append(f"{name}_count{{{labels}}} {self.count}")
+        return out
+
+
+class Metrics:
+    """Stage and turn histograms plus turn counters, rendered for Prometheus."""
+
+    def __init__(self):
+        self._stages = {}     # stage -> Histogram
+        self._events = {}     # "first_token" / "first_audio" / "end" -> Histogram
+        self._turns = Counter()
+        self._lock = threading.Lock()
+
+    def observe_stage(self, stage: str, seconds: float):
+        with self._lock:
+            self._stages.setdefault(stage, Histogram()).observe(seconds)
+
+    def observe_event(self, event: str, seconds: float):
+        with self._lock:
+            self._events.setdefault(event, Histogram()).observe(seconds)
+
+    def count_turn(self, source: str, status: str):
+        with self._lock:
+            self._turns[source, status] += 1
+
+    def render(self) -> str:
+        with self._lock:
+            lines = [
+                "# HELP jarvis_stage_seconds Time spent in each stage of a turn.",
+                "# TYPE jarvis_stage_seconds histogram",
+            ]
+            for stage, hist in sorted(self._stages.items()):
+                lines += hist.lines("jarvis_stage_seconds", f'stage="{stage}"')
+            lines += [
+                "# HELP jarvis_turn_seconds Time from the start of a turn to first token, first audio and the end.",
+                "# TYPE jarvis_turn_seconds histogram",
+            ]
+            for event, hist in sorted(self._events.items()):
+                lines += hist.lines("jarvis_turn_seconds", f'event="{event}"')
+            lines += [
+                "# HELP jarvis_turns_total Finished turns by source and outcome.",
+                "# TYPE jarvis_turns_total counter",
+            ]
+            for (source, status), n in sorted(self._turns.items()):
+                lines.append(f'jarvis_turns_total{{source="{source}",status="{status}"}} {n}')
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
+
+
+# ─── Turn traces ────────────────────────────────────────────────────────
+class TurnTrace:
+    def __init__(self, turn_id=None, source="app", started=None):
+        self.id = turn_id
+        self.source = source
+        self.t0 = started if started is not None else time.perf_counter()
+        self.wall = time.time() - (time.perf_counter() - self.t0)
+        self.stages = {}      # stage -> {"first": offset s, "total": s, "count": n}
+        self.events = {}      # event -> offset s
+        self.finished = False
+        self._lock = threading.Lock()
+
+    def record(self, stage: str, seconds: float, start: float | None = None):
+        """Add a span of `seconds` to `stage`; `start` is its perf_counter start if known."""
+        offset = None if start is None else start - self.t0
+        with self._lock:
+            s = self.stages.get(stage)
+            if s is None:
+                s = self.stages[stage] = {"first": offset, "total": 0.0, "count": 0}
+            s["total"] += seconds
+            s["count"] += 1
+        metrics.observe_stage(stage, seconds)
+
+    @contextmanager
+    def span(self, stage: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - start, start)
+
+    def mark(self, event: str):
+        """Note the first time `event` happened in this turn (later calls are ignored)."""
+        with self._lock:
+            if event in self.events:
+                return
+            self.events[event] = offset = time.perf_counter() - self.t0
+        metrics.observe_event(event, offset)
+
+    def finish(self, status: str = "ok"):
+        if self.finished:
+            return
+        self.finished = True
+        self.mark("end")
+        metrics.count_turn(self.source, status)
+        summary = ", ".join(f"{k} {v['total'] * 1000:.0f}ms" for k, v in self.stages.items())
+        print(f"⏱️  Turn {self.id} ({status}) {self.events['end']:.2f}s: {summary}")
+        if TRACE_PATH:
+            _write_trace(self.to_dict(status))
+
+    def to_dict(self, status="ok") -> dict:
+        with self._lock:
+            return {
+                "turn": self.id,
+                "source": self.source,
+                "status": status,
+                "ts": round(self.wall, 3),
+                "events": {k: round(v, 4) for k, v in self.events.items()},
+                "stages": {
+                    k: {"first": None if v["first"] is None else round(v["first"], 4),
+                        "total": round(v["total"], 4), "count": v["count"]}
+                    for k, v in self.stages.items()
+                },
+            }
+
+
+_trace_lock = threading.Lock()
+
+
+def _write_trace(record):
+    try:
+        with _trace_lock, open(TRACE_PATH, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+    except OSError as e:
+        print(f"⚠️  Trace write failed: {e}")
+
+
+def voice_turn(started=None) -> TurnTrace:
+    """A trace for a voice_jarvis.py turn, numbered per process."""
+    return TurnTrace(f"voice.{next(_voice_ids)}", source="voice", started=started)
+
+
+def bind(trace: TurnTrace | None):
+    """Make `trace` the current turn for this task/thread context."""
+    _current.set(trace)
+
+
+def current() -> TurnTrace | None:
+    return _current.get()
+
+
+@contextmanager
+def span(stage: str):
+    """Time a block as `stage` of the current turn (a no-op outside a turn)."""
+    trace = _current.get()
+    if trace is None:
+        yield
+        return
+    with trace.span(stage):
+        yield
+
+
+def record(stage: str, seconds: float, start: float | None = None):
+    trace = _current.get()
+    if trace is not None:
+        trace.record(stage, seconds, start)
+
+
+def mark(event: str):
+    trace = _current.get()
+    if trace is not None:
+        trace.mark(event)
+
+
+# ─── Sampling profiler ──────────────────────────────────────────────────
+class SamplingProfiler:
+    """Samples every thread's stack every `interval` seconds while running."""
+
+    def __init__(self, interval: float = PROFILE_INTERVAL_S):
+        self.interval = interval
+        self._stacks = Counter()
+        self._samples = 0
+        self._thread = None
+        self._stop = threading.Event()
+        self._started = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def start(self):
+        if self.running:
+            return
+        self._stacks.clear()
+        self._samples = 0
+        self._stop.clear()
+        self._started = time.time()
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+        self._thread.start()
+        print(f"🔬 Profiler on (every {self.interval * 1000:g}ms)")
+
+    def _run(self):
+        me = threading.get_ident()
+        names = {}
+        while not self._stop.wait(self.interval):
+            for t in threading.enumerate():
+                names[t.ident] = t.name
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                    frame = frame.f_back
+                stack.append(names.get(ident, str(ident)))
+                self._stacks[";".join(reversed(stack))] += 1
+            self._samples += 1
+
+    def stop(self, top: int = 15) -> dict:
+        """Stop sampling, write the collapsed stacks to PROFILE_DIR and summarize them."""
+        if not self.running:
+            return {"running": False}
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        path = os.path.join(PROFILE_DIR, time.strftime("profile-%Y%m%d-%H%M%S.folded", time.localtime(self._started)))
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, n in self._stacks.most_common():
+                f.write(f"{stack} {n}\n")
+
+        leaves = Counter()
+        for stack, n in self._stacks.items():
+            leaves[stack.rsplit(";", 1)[-1]] += n
+        total = sum(leaves.values()) or 1
+        print(f"🔬 Profiler off: {self._samples} samples → {path}")
+        return {
+            "running": False,
+            "samples": self._samples,
+            "path": path,
+            "top": [{"frame": frame, "share": round(n / total, 4)} for frame, n in leaves.most_common(top)],
+        }
+
+    def toggle(self) -> dict:
+        if self.running:
+            return self.stop()
+        self.start()
+        return {"running": True}
+
+
+profiler = SamplingProfiler()
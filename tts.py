@@ -0,0 +1,122 @@
+"""
+Resident Piper TTS engine.
+
+Loads each voice model once and keeps it in-process, so a spoken sentence
+costs only the synthesis itself instead of a fresh `python -m piper`
+interpreter, onnxruntime import and model load. Audio stays in memory as
+16-bit mono PCM; `to_wav` wraps it in a WAV container when a file format is
+needed (e.g. for the browser).
+"""
+
+import io
+import threading
+import time
+import wave
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+from config import VOICE_MODEL, TTS_WORKERS
+
+
+@dataclass
+class Synthesis:
+    text: str
+    pcm: bytes          # int16 mono little-endian
+    sample_rate: int
+    seconds: float      # wall time spent synthesizing
+
+    @property
+    def duration(self) -> float:
+        return len(self.pcm) / 2 / self.sample_rate
+
+
+def to_wav(synth: Synthesis) -> bytes:
+    """Wrap raw PCM in an in-memory WAV container."""
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(synth.sample_rate)
+        w.writeframes(synth.pcm)
+    return buf.getvalue()
+
+
+class TTSEngine:
+    """Long-lived Piper engine with a small worker pool.
+
+    Voices are loaded on first use and cached by model path. The espeak
+    phonemizer inside Piper is not thread-safe, so calls on the same voice
+    are serialized; different voices synthesize in parallel and callers
+    never block on each other's queueing thanks to the pool.
+    """
+
+    def __init__(self, workers: int = TTS_WORKERS):
+        self._voices = {}
+        self._voice_locks = {}
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="tts")
+        self.calls = 0
+        self.total_seconds = 0.0
+        self.last_seconds = 0.0
+
+    def _voice(self, model: str):
+        with self._lock:
+            voice = self._voices.get(model)
+            if voice is None:
+                from piper.voice import PiperVoice
+
+                print(f"⏳ Loading Piper voice {model} …")
+                voice = PiperVoice.load(model)
+                self._voices[model] = voice
+                self._voice_locks[model] = threading.Lock()
+            return voice, self._voice_locks[model]
+
+    def load(self, model: str = VOICE_MODEL):
+        """Load a voice ahead of time so the first reply doesn't pay for it."""
+        self._voice(model)
+
+    def synthesize(self, text: str, model: str = VOICE_MODEL) -> Synthesis:
+        """Synthesize `text` on the calling thread and return PCM audio."""
+        voice, voice_lock = self._voice(model)
+        start = time.perf_counter()
+        with voice_lock:
+            if hasattr(voice, "synthesize_stream_raw"):
+                # piper-tts 1.2.x
+                pcm = b"".join(voice.synthesize_stream_raw(text))
+            else:
+                # piper-tts >= 1.3 yields AudioChunk objects
+                pcm = b"".join(c.audio_int16_bytes for c in voice.synthesize(text))
+        elapsed = time.perf_counter() - start
+
+        with self._lock:
+            self.calls += 1
+            self.total_seconds += elapsed
+            self.last_seconds = elapsed
+        print(f"🔊 TTS {elapsed:.2f}s for {len(text)} chars")
+        return Synthesis(text, pcm, voice.config.sample_rate, elapsed)
+
+    def submit(self, text: str, model: str = VOICE_MODEL):
+        """Queue a synthesis on the worker pool; returns a Future[Synthesis]."""
+        return self._pool.submit(self.synthesize, text, model)
+
+    def stats(self) -> dict:
+        with self._lock:
+            avg = self.total_seconds / self.calls if self.calls else 0.0
+            return {
+                "calls": self.calls,
+                "total_seconds": round(self.total_seconds, 3),
+                "avg_seconds": round(avg, 3),
+                "last_seconds": round(self.last_seconds, 3),
+            }
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_engine() -> TTSEngine:
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = TTSEngine()
+        return _engine
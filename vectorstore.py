@@ -0,0 +1,93 @@
+"""
+Shared Chroma client for memory and knowledge.
+
+With VECTOR_STORE_BACKEND = "persistent" (the default) collections live on
+disk under VECTOR_STORE_DIR and are simply reopened on the next launch, so
+nothing is re-embedded. "memory" keeps the old in-process behaviour.
+
+The store carries a schema version in VECTOR_STORE_DIR/schema.json. When it
+doesn't match STORE_SCHEMA_VERSION, EMBEDDING_MODEL or EMBED_PRECISION (the
+stored vectors would no longer be comparable with new ones), the old
+directory is moved aside to `<dir>.v<old>.bak` rather than deleted, and a
+fresh store is created.
+
+chromadb is imported, and the client opened, on first use: memory and
+knowledge hold LazyCollection handles, so importing them costs nothing and
+the store opens on whichever thread touches it first.
+"""
+
+import json
+import os
+import shutil
+import threading
+import time
+
+from config import VECTOR_STORE_BACKEND, VECTOR_STORE_DIR, STORE_SCHEMA_VERSION, EMBEDDING_MODEL, EMBED_PRECISION
+
+_client = None
+_lock = threading.Lock()
+
+
+def _schema_path():
+    return os.path.join(VECTOR_STORE_DIR, "schema.json")
+
+
+def _schema():
+    return {"version": STORE_SCHEMA_VERSION, "embedding_model": EMBEDDING_MODEL, "precision": EMBED_PRECISION}
+
+
+def _check_schema():
+    path = _schema_path()
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            stored = json.load(f)
+        if stored == _schema():
+            return
+        backup = f"{VECTOR_STORE_DIR}.v{stored.get('version')}.bak"
+        if os.path.exists(backup):
+            backup += f".{int(time.time())}"
+        print(f"⚠️  Vector store schema changed, moving old store to {backup}")
+        shutil.move(VECTOR_STORE_DIR, backup)
+
+    os.makedirs(VECTOR_STORE_DIR, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(_schema(), f)
+
+
+def get_client():
+    global _client
+    with _lock:
+        if _client is None:
+            import chromadb
+
+            start = time.perf_counter()
+            if VECTOR_STORE_BACKEND == "persistent":
+                _check_schema()
+                _client = chromadb.PersistentClient(path=VECTOR_STORE_DIR)
+            else:
+                _client = chromadb.Client()
+            print(f"🗄️  Vector store ({VECTOR_STORE_BACKEND}) opened in {time.perf_counter() - start:.2f}s")
+        return _client
+
+
+def get_collection(name):
+    return get_client().get_or_create_collection(name, metadata={"schema_version": STORE_SCHEMA_VERSION})
+
+
+class LazyCollection:
+    """A collection handle that opens the store on first use."""
+
+    def __init__(self, name):
+        self.name = name
+        self._collection = None
+        self._lock = threading.Lock()
+
+    def _open(self):
+        if self._collection is None:
+            with self._lock:
+                if self._collection is None:
+                    self._collection = get_collection(self.name)
+        return self._collection
+
+    def __getattr__(self, attr):
+        return getattr(self._open(), attr)
@@ -1,14 +1,24 @@
-import ollama
+import signal
+import time
 import sounddevice as sd
 import numpy as np
-import scipy.io.wavfile as wav
-import subprocess
-import os
-from faster_whisper import WhisperModel
-from memory import store_memory, recall_memory
-from tools import open_app, get_time, search_google, run_command
+from contextlib import closing, nullcontext
+from memory import store_memory
 from agent import execute_tool
-from knowledge.rag import search_knowledge
+from actions import ActionStream
+from intents import route_intent
+from knowledge.rag import index_knowledge
+from retrieval import retrieve
+from embeddings import get_embedder
+from response_cache import get_response_cache
+from conversation import Conversation
+from llm import get_session
+from tts import get_engine
+from speech_pipeline import SpeechPipeline
+from audio_capture import MicrophoneListener
+from stt import StreamingTranscriber, get_stt
+import tracing
+from startup import startup
 
 
 
@@ -16,16 +26,6 @@ from knowledge.rag import search_knowledge
 MODEL_NAME = "llama3:latest"
 VOICE_MODEL = "voices/en_US-lessac-medium.onnx"
 SAMPLE_RATE = 16000
-DURATION = 4 
-
-whisper = None
-
-def _get_whisper():
-    global whisper
-    if whisper is None:
-        print("Loading Whisper Model")
-        whisper = WhisperModel("base", compute_type="int8")
-    return whisper
 
 SYSTEM_PROMPT = """
 You are Jarvis, a smart, calm, and helpful AI voice assistant.
@@ -50,104 +50,105 @@ Do NOT say "I will open chrome".
 Just output the ACTION line when needed.
 """
 
-messages = [{"role": "system", "content": SYSTEM_PROMPT}]
+conversation = Conversation(SYSTEM_PROMPT)
+
+mic = MicrophoneListener(SAMPLE_RATE)
+transcriber = None
 
 def record_audio():
+    """Record the next utterance; also starts (and binds) its turn trace at speech onset."""
+    global transcriber
     print("\n Listening..")
-    audio=sd.rec(int(SAMPLE_RATE*DURATION),samplerate=SAMPLE_RATE,channels=1,dtype=np.int16)
-    sd.wait()
-    wav.write("input.wav",SAMPLE_RATE,audio)
-    return "input.wav"
-def transcribe(audio_path):
-    segments, _ = _get_whisper().transcribe(audio_path)
-    text=""
-    for j in segments:
-        text+=j.text
-    return text.strip()
-def parse_action(text):
-    if not text.startswith("ACTION:"):
-        return None, None
-
-    try:
-        action = text.replace("ACTION:", "").strip()
-        tool, arg = action.split("|", 1)
-        return tool.strip(), arg.strip()
-    except:
-        return None, None
-
-def try_tools(user_text):
-    text = user_text.lower()
-
-    if "open chrome" in text or "chrome" in text:
-        return open_app("chrome")
-    
-    if "open safari" in text or "safari" in text:
-        return open_app("safari")
-
-    if "open vscode" in text or "open code" in text or "visual studio" in text:
-        return open_app("vscode")
-    
-    if "open terminal" in text or "terminal" in text:
-        return open_app("terminal")
-    
-    if "open youtube" in text or "youtube" in text:
-        return open_app("youtube")
-
-    if "time" in text:
-        return get_time()
-
-    if "search" in text:
-        query = text.replace("search", "").strip()
-        return search_google(query)
-
-    if text.startswith("run"):
-        cmd = text.replace("run", "", 1).strip()
-        return run_command(cmd)
-
-    return None
-
-
+    if transcriber is None:
+        transcriber = StreamingTranscriber(get_stt(), SAMPLE_RATE)
+    transcriber.reset()
+    onset = []
+
+    def on_audio(audio):
+        if not onset:
+            onset.append(time.perf_counter())
+        partial = transcriber.update(audio)
+        if partial:
+            print(f"\r ... {partial}", end="", flush=True)
+
+    audio = mic.listen(on_audio=on_audio)
+    heard = time.perf_counter()
+    trace = tracing.voice_turn(started=onset[0] if onset else heard - len(audio) / SAMPLE_RATE)
+    trace.record("record", heard - trace.t0, trace.t0)
+    tracing.bind(trace)
+    return audio
+def transcribe(audio):
+    with tracing.span("transcribe"):
+        return transcriber.finalize(audio)
 def jarvis(text):
-    memories=recall_memory(text)
-    memory_context=""
-    if memories:
-        memory_context = "\nRelevant past memory:\n" + "\n".join(memories)
-    knowledge = search_knowledge(user_text)
-
-    knowledge_context = ""
-    if knowledge:
-        knowledge_context = "\nRelevant knowledge:\n" + knowledge
-    messages.append({
-    "role": "user",
-    "content": text + knowledge_context
-})
+    trace = tracing.current()
+    with tracing.span("retrieve"):
+        context = retrieve(text)
+    for stage, seconds in context.timings.items():
+        if stage != "total":
+            tracing.record(stage, seconds)
+    cache = get_response_cache()
+    prior = conversation.history[-2:]   # the exchange this question follows
+    with tracing.span("cache"):
+        cached = cache.get(text, context.knowledge, prior)
+    if cached is not None:
+        replay(cached, trace)
+        conversation.add_user(text)
+        conversation.add_assistant(cached.reply)
+        store_memory("User: " + text)
+        store_memory("Jarvis: " + cached.reply)
+        return
+    conversation.add_user(text)
+    messages = conversation.build(context.render())
 
     # messages.append({"role":"user","content":text})
 
-    stream=ollama.chat(
-        model=MODEL_NAME,
-        messages=messages,
-        stream=True
-    )
     reply=""
-    buffer=""
-    for chunk in stream:
-        token = chunk["message"]["content"]
-        print(token, end="", flush=True)
-        reply+=token
-        buffer+=token
-        if token in [".", "!", "?", "\n"]:
-            speak(buffer.strip())
-            buffer = ""
-    if buffer.strip():
-        speak(buffer.strip())
-    tool, arg = parse_action(reply)
-
-    if tool:
-        print(f"\n[Agent executing] {tool} -> {arg}")
-        result = execute_tool(tool, arg)
-        print("Tool result:", result)
-        speak(result)
+    spoken = []
+
+    def deliver(synth):
+        spoken.append(synth)
+        play(synth, trace)
+
+    pipeline = SpeechPipeline(deliver, VOICE_MODEL)
+    actions = ActionStream()
+    results = []
+
+    def forward(text):
+        if text:
+            print(text, end="", flush=True)
+            pipeline.feed(text)
+
+    def dispatch():
+        # tool calls are cut out of the stream (not spoken) and run right away
+        for call in actions.pop():
+            print(f"\n[Agent executing] {call.tool} -> {call.arg}")
+            with tracing.span("tool"):
+                results.append(execute_tool(call.tool, call.arg))
+            print("Tool result:", results[-1])
+
+    started, first = time.perf_counter(), None
+    with closing(get_session(MODEL_NAME).stream(messages)) as stream:
+        for token in stream:
+            if first is None:
+                first = time.perf_counter()
+                tracing.record("llm_prefill", first - started, started)
+                tracing.mark("first_token")
+            reply+=token
+            forward(actions.feed(token))
+            dispatch()
+            if actions.done:
+                break
+    if first is not None:
+        tracing.record("llm_decode", time.perf_counter() - first, first)
+    forward(actions.flush())
+    dispatch()
+    pipeline.finish()
+    generated = time.perf_counter() - started
+
+    if actions.calls:
+        for result in results:
+            speak(result, trace)
         return
 
 
@@ -156,41 +157,92 @@ def jarvis(text):
     #     messages=messages
     # )
     # reply= response["message"]["content"]
-    messages.append({"role":"assistant","content":reply})
+    conversation.add_assistant(reply)
     store_memory("User: " + text)
     store_memory("Jarvis: " + reply)
+    # Audio is kept only if every sentence was synthesized; the time includes playback
+    cache.put(text, context.knowledge, reply, spoken if len(spoken) == pipeline.sentences else [], generated, prior)
 
     # return reply
-def speak(text):
+def play(synth, trace=None):
+    # called from the speech pipeline's thread, so the trace is passed in
+    if trace is not None:
+        trace.record("tts", synth.seconds)
+        trace.mark("first_audio")
+        span = trace.span("playback")
+    else:
+        span = nullcontext()
+    with span:
+        audio = np.frombuffer(synth.pcm, dtype=np.int16)
+        sd.play(audio, synth.sample_rate)
+        sd.wait()
+
+def replay(cached, trace=None):
+    """Speak a cached reply from its stored audio (synthesized now if there is none)."""
+    cache = get_response_cache()
+    start = time.perf_counter()
+    print("Jarvis (cached):", cached.reply)
+    if trace is not None:
+        trace.mark("first_token")
+    synth = cache.synthesis(cached)
+    if synth is not None:
+        play(synth, trace)
+    else:
+        speak(cached.reply, trace)
+    cache.replayed(cached, time.perf_counter() - start)
+    stats = cache.stats()
+    print(f"💬 Cache hit rate {stats['hit_rate']:.0%}, {stats['saved_seconds']:.1f}s saved so far")
+
+def speak(text, trace=None):
     try:
-        subprocess.run([
-            "python", "-m", "piper",
-            "--model", VOICE_MODEL,
-            "--output-file", "output.wav"
-        ], input=text.encode(), check=True)
-
-        if os.path.exists("output.wav"):
-            subprocess.run(["afplay", "output.wav"])
+        play(get_engine().synthesize(text, VOICE_MODEL), trace)
     except Exception as e:
         print("TTS Error:", e)
 
+def listen_once():
+    """One voice turn: wait for an utterance, then run the tool or answer it."""
+    audio=record_audio()
+    user_text=transcribe(audio)
+    if not user_text:
+        return
+    print(f"\nYou said: {user_text}")
+    trace = tracing.current()
+    with trace.span("intent"):
+        intent = route_intent(user_text)
+
+    if intent:
+        with trace.span("tool"):
+            tool_result = execute_tool(intent.tool, intent.arg)
+        print("Jarvis:", tool_result)
+        speak(tool_result, trace)
+    else:
+        jarvis(user_text)
+    trace.finish()
+
 print("\n Jarvis voice Assistant Read,press ctrl+c to stop")
 
+
+def warm_llm():
+    if not get_session(MODEL_NAME).warm(SYSTEM_PROMPT):
+        raise RuntimeError("Ollama did not answer the warmup request")
+
+
 if __name__ == "__main__":
+    # Load everything in parallel; listening starts once Whisper and the voice are in
+    startup.add("llm", warm_llm)
+    startup.add("embedder", lambda: get_embedder().load())
+    startup.add("whisper", lambda: get_stt().load())
+    startup.add("tts", lambda: get_engine().load(VOICE_MODEL))
+    # Indexing encodes with the embedder, so it waits for that to load
+    startup.add("knowledge", lambda: print("Knowledge index:", index_knowledge()), after=("embedder",))
+    startup.start()
+    startup.wait("whisper")
+    startup.wait("tts")
+    # kill -USR1 <pid> switches the sampling profiler on and off
+    signal.signal(signal.SIGUSR1, lambda *_: print(tracing.profiler.toggle()))
     try:
         while True:
-            audio_file=record_audio()
-            user_text=transcribe(audio_file)
-            if not user_text:
-                continue
-            print(f"\nYou said: {user_text}")
-            tool_result = try_tools(user_text)
-
-            if tool_result:
-                print("Jarvis:", tool_result)
-                speak(tool_result)
-                continue
-            jarvis(user_text)
+            listen_once()
        
     except KeyboardInterrupt:
         print("\nJarvis stopped.")